@@ -0,0 +1,112 @@
+"""Measure how long it takes to import python-makemkv and to start its CLI.
+
+Each statement is run in a fresh interpreter with ``-X importtime``. The
+median of the cumulative import time of the top-level modules is reported,
+together with the slowest modules of the last run, and compared to a baseline
+that is stored in ``importtime_baseline.json`` next to this script. The
+baseline depends on the machine, so update it before comparing changes on
+another machine.
+
+Usage: python benchmarks/importtime.py [--runs N] [--max-ms MS]
+                                       [--update-baseline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+BASELINE = Path(__file__).with_name("importtime_baseline.json")
+
+STATEMENTS = {
+    "import makemkv": "import makemkv",
+    "from makemkv import MakeMKV": "from makemkv import MakeMKV",
+    "import makemkv.__main__": "import makemkv.__main__",
+}
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Parse the output of ``python -X importtime``."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        imports.append(ImportTime(module, int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def measure(statement: str) -> list[ImportTime]:
+    """Run `statement` in a new interpreter and return its imports."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stderr
+    return parse_importtime(stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="fail if the median import time of a statement exceeds this",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative regression compared to the baseline",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    args = parser.parse_args()
+
+    baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failed = False
+    for label, statement in STATEMENTS.items():
+        totals = []
+        for _ in range(args.runs):
+            imports = measure(statement)
+            totals.append(sum(i.cumulative_us for i in imports if i.depth == 0))
+        median_ms = statistics.median(totals) / 1000
+        print(f"{label:<32} {median_ms:8.1f} ms")
+        for i in sorted(imports, key=lambda i: i.self_us, reverse=True)[:5]:
+            print(f"    {i.module:<28} {i.self_us / 1000:8.1f} ms")
+        if args.update_baseline:
+            baselines[label] = round(median_ms, 1)
+        elif (baseline := baselines.get(label)) is None:
+            print("    no baseline for this statement")
+        elif median_ms > baseline * (1 + args.tolerance):
+            print(f"    regression: baseline is {baseline:.1f} ms")
+            failed = True
+        if args.max_ms is not None and median_ms > args.max_ms:
+            failed = True
+
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Measure how fast python-makemkv parses makemkvcon's output.
+
+A synthetic robot log of an obfuscated Blu-ray with many playlists is parsed
+by ``MakeMKV._parse_makemkv_log``. The best throughput in lines per second
+and the peak memory usage are compared to a baseline that is stored in
+``parser_baseline.json`` next to this script. The baseline depends on the
+machine, so update it before comparing changes on another machine.
+
+Usage: python benchmarks/parser.py [--titles N] [--streams N] [--progress N]
+                                   [--runs N] [--update-baseline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+from makemkv import MakeMKV
+
+BASELINE = Path(__file__).with_name("parser_baseline.json")
+
+LANGUAGES = [
+    ("eng", "English"),
+    ("ger", "German"),
+    ("fre", "French"),
+    ("spa", "Spanish"),
+    ("ita", "Italian"),
+    ("jpn", "Japanese"),
+    ("chi", "Chinese"),
+    ("und", "Undetermined"),
+    ("qaa", "Original"),
+]
+
+
+def synthetic_log(
+    titles: int = 2000, streams: int = 50, progress: int = 100_000, seed: int = 0
+) -> Iterator[str]:
+    """Generate the robot output of `makemkvcon info` for a large disc.
+
+    Args:
+        titles: Number of titles, eg. playlists of an obfuscated Blu-ray.
+        streams: Number of streams of each title.
+        progress: Number of progress updates.
+        seed: Seed of the random values.
+    """
+    rnd = random.Random(seed)
+    yield (
+        'MSG:1005,0,1,"MakeMKV v1.17.5 linux(x64-release) started",'
+        '"%1 started","MakeMKV v1.17.5 linux(x64-release)"'
+    )
+    yield 'DRV:0,2,999,12,"BD-RE HL-DT-ST BD-RE WH16NS60","OBFUSCATED","/dev/sr0"'
+    for index in range(1, 16):
+        yield f'DRV:{index},256,999,0,"","",""'
+
+    yield 'PRGT:5018,0,"Opening Blu-ray disc"'
+    yield 'PRGC:5018,0,"Processing title sets"'
+    for i in range(progress // 2):
+        yield f"PRGV:{i % 65536},{i * 65536 // progress},65536"
+
+    yield f"TCOUNT:{titles}"
+    yield 'CINFO:1,6209,"Blu-ray disc"'
+    yield 'CINFO:2,0,"OBFUSCATED"'
+    yield 'CINFO:28,0,"eng"'
+    yield 'CINFO:30,0,"OBFUSCATED"'
+    yield 'CINFO:32,0,"OBFUSCATED"'
+
+    for t in range(titles):
+        segments = rnd.randint(1, 300)
+        size = rnd.randint(10**8, 5 * 10**10)
+        yield f'TINFO:{t},2,0,"Title {t}"'
+        yield f'TINFO:{t},8,0,"{rnd.randint(1, 99)}"'
+        yield f'TINFO:{t},9,0,"{rnd.randint(0, 3)}:{rnd.randint(0, 59):02}:00"'
+        yield f'TINFO:{t},10,0,"{size / 10**9:.1f} GB"'
+        yield f'TINFO:{t},11,0,"{size}"'
+        yield f'TINFO:{t},16,0,"{t:05}.mpls"'
+        yield f'TINFO:{t},25,0,"{segments}"'
+        # pathological: a long quoted field full of commas
+        segments_map = ",".join(str(rnd.randint(0, 999)) for _ in range(segments))
+        yield f'TINFO:{t},26,0,"{segments_map}"'
+        yield f'TINFO:{t},27,0,"OBFUSCATED_t{t:04}.mkv"'
+        yield f'TINFO:{t},28,0,"eng"'
+        yield f'TINFO:{t},29,0,"English"'
+        yield f'TINFO:{t},30,0,"OBFUSCATED - {segments} chapter(s) , {size} B"'
+        # pathological: a very long comment with quotes and commas
+        comment = 'a, b "c" d, ' * rnd.randint(0, 200)
+        yield f'TINFO:{t},49,0,"{comment}"'
+
+        for s in range(streams):
+            langcode, language = rnd.choice(LANGUAGES)
+            if s == 0:
+                yield f'SINFO:{t},{s},1,6201,"Video"'
+                yield f'SINFO:{t},{s},5,0,"V_MPEGH/ISO/HEVC"'
+                yield f'SINFO:{t},{s},6,0,"MpegH"'
+                yield f'SINFO:{t},{s},7,0,"MpegH HEVC Main10@L5.1"'
+                yield f'SINFO:{t},{s},19,0,"3840x2160"'
+                yield f'SINFO:{t},{s},20,0,"16:9"'
+                yield f'SINFO:{t},{s},21,0,"23.976 (24000/1001)"'
+            elif s % 2:
+                yield f'SINFO:{t},{s},1,6202,"Audio"'
+                yield f'SINFO:{t},{s},2,0,"Surround 7.1"'
+                yield f'SINFO:{t},{s},3,0,"{langcode}"'
+                yield f'SINFO:{t},{s},4,0,"{language}"'
+                yield f'SINFO:{t},{s},5,0,"A_TRUEHD"'
+                yield f'SINFO:{t},{s},6,0,"TrueHD"'
+                yield f'SINFO:{t},{s},13,0,"{rnd.randint(192, 5000)} Kb/s"'
+                yield f'SINFO:{t},{s},17,0,"48000"'
+                yield f'SINFO:{t},{s},30,0,"TrueHD Surround 7.1 {language}"'
+            else:
+                yield f'SINFO:{t},{s},1,6203,"Subtitles"'
+                yield f'SINFO:{t},{s},3,0,"{langcode}"'
+                yield f'SINFO:{t},{s},4,0,"{language}"'
+                yield f'SINFO:{t},{s},5,0,"S_HDMV/PGS"'
+                yield f'SINFO:{t},{s},6,0,"PGS"'
+                yield f'SINFO:{t},{s},30,0,"PGS {language}"'
+
+    yield 'PRGT:5017,0,"Saving to MKV file"'
+    yield 'PRGC:5017,0,"Saving to MKV file"'
+    for i in range(progress - progress // 2):
+        yield f"PRGV:{i % 65536},{i * 65536 // progress},65536"
+    yield 'MSG:5036,0,1,"Copy complete. 1 titles saved.","Copy complete. %1 titles saved.","1"'  # noqa: B950
+
+
+def measure(lines: list[str], runs: int) -> tuple[float, int]:
+    """Return the best throughput in lines per second and the peak memory."""
+    makemkv = MakeMKV(0)
+    best = 0.0
+    for _ in range(runs):
+        start = time.perf_counter()
+        makemkv._parse_makemkv_log(lines)
+        best = max(best, len(lines) / (time.perf_counter() - start))
+
+    tracemalloc.start()
+    makemkv._parse_makemkv_log(lines)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--progress", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative regression compared to the baseline",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    args = parser.parse_args()
+
+    lines = list(synthetic_log(args.titles, args.streams, args.progress))
+    lines_per_second, peak = measure(lines, args.runs)
+    print(f"{len(lines)} lines")
+    print(f"{lines_per_second:,.0f} lines/s")
+    print(f"{peak / 2**20:.1f} MiB peak memory")
+
+    key = f"{args.titles}x{args.streams}+{args.progress}"
+    baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    if args.update_baseline:
+        baselines[key] = {"lines_per_second": round(lines_per_second), "peak": peak}
+        BASELINE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return 0
+    if (baseline := baselines.get(key)) is None:
+        print("no baseline for these parameters")
+        return 0
+
+    failed = False
+    if lines_per_second < baseline["lines_per_second"] * (1 - args.tolerance):
+        print(f"regression: baseline is {baseline['lines_per_second']:,.0f} lines/s")
+        failed = True
+    if peak > baseline["peak"] * (1 + args.tolerance):
+        print(f"regression: baseline is {baseline['peak'] / 2**20:.1f} MiB")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Measure how fast python-makemkv indexes the segments of many titles.
+
+Obfuscated Blu-rays contain hundreds of playlists that play random clips of
+the same pool. Synthetic titles like these are indexed by
+``makemkv.SegmentIndex``, and the best time of indexing them and querying
+their duplicates, candidates and overlaps is reported.
+
+Usage: python benchmarks/segments.py [--titles N] [--segments N] [--clips N]
+                                     [--runs N] [--max-seconds S]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from makemkv import SegmentIndex
+from makemkv.types import Title
+
+
+def synthetic_titles(count: int, segments: int, clips: int) -> list[Title]:
+    """Create titles that play `segments` random clips of `clips`."""
+    rng = random.Random(0)
+    return [
+        Title(
+            streams=[],
+            segments_map=",".join(
+                str(clip) for clip in rng.sample(range(clips), segments)
+            ),
+        )
+        for _ in range(count)
+    ]
+
+
+def measure(titles: list[Title], runs: int) -> float:
+    """Return the best time of indexing and querying `titles` in seconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        index = SegmentIndex(titles)
+        index.duplicates()
+        index.candidates()
+        index.overlapping(0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--segments", type=int, default=20)
+    parser.add_argument("--clips", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="fail if indexing and querying the titles takes longer than this",
+    )
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.titles, args.segments, args.clips)
+    seconds = measure(titles, args.runs)
+    print(f"{args.titles} titles with {args.segments} segments")
+    print(f"{seconds * 1000:.1f} ms")
+    if args.max_seconds is not None and seconds > args.max_seconds:
+        print(f"regression: took longer than {args.max_seconds:g} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,182 @@
 """python-makemkv is a simple python wrapper for MakeMKV."""
 
-from .makemkv import MakeMKV, MakeMKVError
-from .types import Disc, Drive, MakeMKVOutput, ProgressUpdateHandlerType, Stream, Title
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .aio import AsyncMakeMKV
+    from .autotune import CacheAutotuner
+    from .cache import DiscInfoCache
+    from .compact import CompactDisc, CompactOutput, CompactStream, CompactTitle
+    from .filters import OutputFilter
+    from .jobs import Job, JobQueue, JobState
+    from .makemkv import MakeMKV, MakeMKVError, MakeMKVStallError, list_drives
+    from .metrics import Metrics
+    from .orchestrator import DriveResult, Orchestrator
+    from .pipeline import PipelineResult, RemuxPipeline, TitleResult
+    from .probe import MakeMKVConInfo, probe_makemkvcon
+    from .progress import ProgressParser  # noqa: F401
+    from .segments import SegmentIndex, SegmentRange, parse_segments_map
+    from .telemetry import PhaseTiming, ProgressTelemetry, TelemetrySnapshot
+    from .types import (
+        AsyncProgressUpdateHandlerType,
+        Disc,
+        DiscAttributeEvent,
+        DiscFsFlags,
+        Drive,
+        DriveEvent,
+        DriveState,
+        DriveStatus,
+        MakeMKVEvent,
+        MakeMKVOutput,
+        MessageEvent,
+        ProgressTitleEvent,
+        ProgressUpdateHandlerType,
+        ProgressValueEvent,
+        Stream,
+        StreamAttributeEvent,
+        Title,
+        TitleAttributeEvent,
+        TitleCountEvent,
+    )
+    from .watchdog import Watchdog
+    from .watcher import (
+        DeviceSource,
+        DriveWatcher,
+        LinuxDeviceSource,
+        MakeMKVDeviceSource,
+    )
+
+# exported names are imported from these submodules on first access
+_exports = {
+    "AsyncMakeMKV": ".aio",
+    "AsyncProgressUpdateHandlerType": ".types",
+    "CacheAutotuner": ".autotune",
+    "CompactDisc": ".compact",
+    "CompactOutput": ".compact",
+    "CompactStream": ".compact",
+    "CompactTitle": ".compact",
+    "DeviceSource": ".watcher",
+    "Disc": ".types",
+    "DiscAttributeEvent": ".types",
+    "DiscFsFlags": ".types",
+    "DiscInfoCache": ".cache",
+    "Drive": ".types",
+    "DriveEvent": ".types",
+    "DriveResult": ".orchestrator",
+    "DriveState": ".types",
+    "DriveStatus": ".types",
+    "DriveWatcher": ".watcher",
+    "Job": ".jobs",
+    "JobQueue": ".jobs",
+    "JobState": ".jobs",
+    "LinuxDeviceSource": ".watcher",
+    "MakeMKV": ".makemkv",
+    "MakeMKVConInfo": ".probe",
+    "MakeMKVDeviceSource": ".watcher",
+    "MakeMKVError": ".makemkv",
+    "MakeMKVEvent": ".types",
+    "MakeMKVOutput": ".types",
+    "MakeMKVStallError": ".makemkv",
+    "MessageEvent": ".types",
+    "Metrics": ".metrics",
+    "Orchestrator": ".orchestrator",
+    "OutputFilter": ".filters",
+    "ProgressParser": ".progress",
+    "PhaseTiming": ".telemetry",
+    "PipelineResult": ".pipeline",
+    "ProgressTelemetry": ".telemetry",
+    "ProgressTitleEvent": ".types",
+    "ProgressUpdateHandlerType": ".types",
+    "ProgressValueEvent": ".types",
+    "RemuxPipeline": ".pipeline",
+    "SegmentIndex": ".segments",
+    "SegmentRange": ".segments",
+    "Stream": ".types",
+    "StreamAttributeEvent": ".types",
+    "TelemetrySnapshot": ".telemetry",
+    "Title": ".types",
+    "TitleAttributeEvent": ".types",
+    "TitleCountEvent": ".types",
+    "TitleResult": ".pipeline",
+    "Watchdog": ".watchdog",
+    "list_drives": ".makemkv",
+    "parse_segments_map": ".segments",
+    "probe_makemkvcon": ".probe",
+}
 
 __all__ = [
+    "AsyncMakeMKV",
+    "AsyncProgressUpdateHandlerType",
+    "CacheAutotuner",
+    "CompactDisc",
+    "CompactOutput",
+    "CompactStream",
+    "CompactTitle",
+    "DeviceSource",
     "Disc",
+    "DiscAttributeEvent",
+    "DiscFsFlags",
+    "DiscInfoCache",
     "Drive",
+    "DriveEvent",
+    "DriveResult",
+    "DriveState",
+    "DriveStatus",
+    "DriveWatcher",
+    "Job",
+    "JobQueue",
+    "JobState",
+    "LinuxDeviceSource",
     "MakeMKV",
+    "MakeMKVConInfo",
+    "MakeMKVDeviceSource",
     "MakeMKVError",
+    "MakeMKVEvent",
     "MakeMKVOutput",
+    "MakeMKVStallError",
+    "MessageEvent",
+    "Metrics",
+    "Orchestrator",
+    "OutputFilter",
+    "PhaseTiming",
+    "PipelineResult",
+    "ProgressTelemetry",
+    "ProgressTitleEvent",
     "ProgressUpdateHandlerType",
+    "ProgressValueEvent",
+    "RemuxPipeline",
+    "SegmentIndex",
+    "SegmentRange",
     "Stream",
+    "StreamAttributeEvent",
+    "TelemetrySnapshot",
     "Title",
+    "TitleAttributeEvent",
+    "TitleCountEvent",
+    "TitleResult",
+    "Watchdog",
+    "list_drives",
+    "parse_segments_map",
+    "probe_makemkvcon",
 ]
 
-try:
-    from .progress import ProgressParser  # noqa: F401
-except ImportError:
-    pass
-else:
-    __all__.extend(["ProgressParser"])
+if importlib.util.find_spec("rich") is not None:
+    __all__.append("ProgressParser")
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _exports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
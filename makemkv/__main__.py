@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import contextlib
+import importlib.util
 import json
 import logging
 from pathlib import Path
-from typing import Any, List, Mapping, TypedDict, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Iterable,
+    List,
+    Mapping,
+    TypedDict,
+    Union,
+    cast,
+)
 
 try:
     import click
-    from rich import print
-    from rich.logging import RichHandler
-    from rich.tree import Tree
+
+    # rich is imported when it is needed, but it should be installed anyway
+    if importlib.util.find_spec("rich") is None:
+        raise ImportError("No module named 'rich'", name="rich")
 except ImportError as exc:
     raise ImportError(
         "pymakemkv requires 'rich' and 'click' to be installed. You can "
@@ -27,23 +40,24 @@ from ._cli_params import (
     add_params,
 )
 from .makemkv import MakeMKV, MakeMKVError
-from .progress import ProgressParser
 from .types import MakeMKVOutput, ProgressUpdateHandlerType
 
+if TYPE_CHECKING:
+    from rich.tree import Tree
+
+    from .progress import ProgressParser
+    from .telemetry import ProgressTelemetry
+
 
 class MakeMKVArgs(TypedDict, total=False):
     input: int | Path
     progress_handler: ProgressUpdateHandlerType
-    cache: int
+    progress_interval: float
+    telemetry: ProgressTelemetry | None
+    cache: int | str
     minlength: int
 
 
-rich_handler = RichHandler(level=logging.INFO)
-logging.basicConfig(
-    format="%(message)s",
-    handlers=[rich_handler],
-    level=logging.NOTSET,
-)
 logger = logging.getLogger()
 
 
@@ -58,9 +72,9 @@ def info(**_params: Any) -> None:
     """Display information about a disc."""
     params = cast(InfoCliParams, _params)
 
-    set_log_level(params)
+    setup_logging(params)
 
-    with ProgressParser() as bar:
+    with progress_bar(params) as bar:
         makemkv = MakeMKV(**extract_makemkv_args(params, bar))
         try:
             disc_info = makemkv.info()
@@ -83,9 +97,10 @@ def mkv(**_params: Any) -> None:
     """Copy titles from disc."""
     params = cast(MKVCliParams, _params)
 
-    set_log_level(params)
+    setup_logging(params)
 
-    with ProgressParser() as bar:
+    titles = None if params["title"] == "all" else [int(params["title"])]
+    with progress_bar(params, titles) as bar:
         makemkv = MakeMKV(**extract_makemkv_args(params, bar))
         try:
             disc_info = makemkv.mkv(params["title"], params["output"])
@@ -108,9 +123,9 @@ def backup(**_params: Any) -> None:
     """Backup whole disc."""
     params = cast(BackupCliParams, _params)
 
-    set_log_level(params)
+    setup_logging(params)
 
-    with ProgressParser() as bar:
+    with progress_bar(params) as bar:
         makemkv = MakeMKV(**extract_makemkv_args(params, bar))
         try:
             disc_info = makemkv.backup(params["output"], decrypt=params["decrypt"])
@@ -127,14 +142,43 @@ def backup(**_params: Any) -> None:
     return_info(disc_info, params)
 
 
-def set_log_level(params: InfoCliParams) -> None:
+def setup_logging(params: InfoCliParams) -> None:
+    handler: logging.Handler
+    if params["json"]:
+        # rich would write to stdout
+        handler = logging.StreamHandler()
+        handler.setLevel(logging.INFO)
+    else:
+        from rich.logging import RichHandler
+
+        handler = RichHandler(level=logging.INFO)
+    logging.basicConfig(
+        format="%(message)s",
+        handlers=[handler],
+        level=logging.NOTSET,
+    )
+
     if params["verbose"]:
         logger.setLevel(logging.DEBUG)
     elif params["quiet"]:
         logger.setLevel(logging.CRITICAL)
 
 
-def extract_makemkv_args(params: InfoCliParams, bar: ProgressParser) -> MakeMKVArgs:
+def progress_bar(
+    params: InfoCliParams, titles: Iterable[int] | None = None
+) -> ContextManager[ProgressParser | None]:
+    if params["no_bar"] or params["quiet"]:
+        return contextlib.nullcontext()
+
+    from .progress import ProgressParser
+    from .telemetry import ProgressTelemetry
+
+    return ProgressParser(telemetry=ProgressTelemetry(titles))
+
+
+def extract_makemkv_args(
+    params: InfoCliParams, bar: ProgressParser | None
+) -> MakeMKVArgs:
     makemkv_args = MakeMKVArgs()
     input = makemkv_args["input"] = (
         params["input"] if params["input"] else params["disc_nr"]
@@ -142,8 +186,11 @@ def extract_makemkv_args(params: InfoCliParams, bar: ProgressParser) -> MakeMKVA
     logger.debug(
         f"input: {params['input']}, disc_nr: {params['disc_nr']} " f"-> {input}"
     )
-    if not params["no_bar"] and not params["quiet"]:
+    if bar is not None:
         makemkv_args["progress_handler"] = bar.parse_progress
+        # rich refreshes the progress bar 10 times per second
+        makemkv_args["progress_interval"] = 0.1
+        makemkv_args["telemetry"] = bar.telemetry
     if params["cache"]:
         makemkv_args["cache"] = params["cache"]
     if params["minlength"]:
@@ -160,8 +207,9 @@ def return_info(output: MakeMKVOutput, params: InfoCliParams) -> None:
     elif params["no_info"]:
         pass
     else:
-        print(MakeMKVOutputTree("Disc Info", output))
-        pass
+        from rich import print as rich_print
+
+        rich_print(MakeMKVOutputTree("Disc Info", output))
 
 
 # see https://github.com/python/mypy/issues/731
@@ -177,6 +225,8 @@ class MakeMKVOutputTree:
         label: str,
         data: MakeMKVOutput,
     ) -> None:
+        from rich.tree import Tree
+
         self.tree = Tree(
             label,
             style="tree",
@@ -242,3 +292,7 @@ class MakeMKVOutputTree:
             elif isinstance(value, dict):
                 child_tree = self.add(f"{label} {str(i + 1)}", parent_tree)
                 self.walk_dict(value, child_tree)
+
+
+if __name__ == "__main__":
+    cli()
@@ -45,6 +45,22 @@ class HelpfulGroup(click.Group):
         formatter.write_usage(ctx.command_path, "COMMAND [OPTIONS]")
 
 
+class CacheSize(click.ParamType):
+    name = "cache"
+
+    def convert(
+        self, value: Any, param: click.Parameter | None, ctx: click.Context | None
+    ) -> int | str:
+        if value == "auto" or isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            self.fail(
+                f"{value!r} is neither a number of megabytes nor 'auto'.", param, ctx
+            )
+
+
 INFO_PARAMS = [
     click.Option(
         ["-n", "--disc-nr"],
@@ -70,9 +86,11 @@ INFO_PARAMS = [
     ),
     click.Option(
         ["-c", "--cache"],
-        type=click.INT,
+        type=CacheSize(),
         metavar="MB",
-        help="Specify size of read cache in megabytes.",
+        help="Specify size of read cache in megabytes. "
+        'Use "auto" to choose it based on the disc type, '
+        "available memory and past throughput.",
     ),
     click.Option(
         ["-f", "--info-file"],
@@ -159,7 +177,7 @@ class InfoCliParams(TypedDict):
     disc_nr: int
     input: Path | None
     minlength: int | None
-    cache: int | None
+    cache: int | str | None
     info_file: Path | None
     json: bool
     no_info: bool
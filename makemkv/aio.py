@@ -0,0 +1,349 @@
+"""Provides the `AsyncMakeMKV` class for use with asyncio."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from asyncio.subprocess import PIPE, STDOUT
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncGenerator, Awaitable, Literal
+
+from .filters import OutputFilter
+from .makemkv import (
+    _READ_SIZE,
+    MakeMKVStallError,
+    _Collector,
+    _do_nothing,
+    _EventDispatcher,
+    _LineSplitter,
+    _MakeMKVBase,
+    logger,
+)
+from .types import AsyncProgressUpdateHandlerType, MakeMKVEvent, MakeMKVOutput
+from .watchdog import Watchdog, _Monitor
+
+if TYPE_CHECKING:
+    from .autotune import CacheAutotuner
+    from .cache import DiscInfoCache
+    from .metrics import Metrics
+    from .telemetry import ProgressTelemetry
+
+
+class AsyncMakeMKV(_MakeMKVBase):
+    """Wraps makemkvcon and exposes makemkvcon's commands as coroutines.
+
+    Cancelling a running command terminates `makemkvcon`.
+    """
+
+    process: asyncio.subprocess.Process | None
+
+    def __init__(
+        self,
+        input: int | str | PathLike[str],
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        progress_handler: AsyncProgressUpdateHandlerType = _do_nothing,
+        trusted: bool = False,
+        info_cache: DiscInfoCache | None = None,
+        terminate_timeout: float = 5,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        telemetry: ProgressTelemetry | None = None,
+        metrics: Metrics | None = None,
+        log_file: str | PathLike[str] | None = None,
+        watchdog: Watchdog | None = None,
+        autotuner: CacheAutotuner | None = None,
+    ) -> None:
+        """Initialize AsyncMakeMKV with input.
+
+        Args:
+            input: Can be either a disc number starting with 0, a device,
+                a .IFO file, a VIDEO_TS folder or an input in makemkvcon's
+                format like "disc:0" or "dev:/dev/sr0".
+            cache: Size of read cache in megabytes, or "auto" to choose it
+                from the disc type, the available memory and the throughput
+                of past rips, see :class:`makemkv.autotune.CacheAutotuner`.
+            minlength: Minimum title length in seconds.
+            progress_handler: A callback function or coroutine function to
+                parse progress updates. Awaitables returned by it are awaited
+                before the next line of output is parsed.
+            trusted: Don't validate the types of parsed values.
+            info_cache: Return information about known discs from this cache
+                instead of running `makemkvcon info`.
+            terminate_timeout: Seconds to wait for `makemkvcon` to exit after
+                a command was cancelled before it is killed.
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+            progress_interval: Minimum number of seconds between two
+                progress updates passed to `progress_handler`.
+            progress_delta: Minimum change of the progress value between two
+                progress updates passed to `progress_handler`. The first and
+                the last update of each task are passed on regardless.
+            telemetry: Is updated with the parsed events to calculate
+                throughput and remaining time.
+            metrics: Collects metrics about the `makemkvcon` processes.
+            log_file: Append the raw output of `makemkvcon` to this file,
+                compressed with gzip if its name ends with ".gz". See
+                :func:`makemkv.MakeMKV.from_log` for parsing it later.
+            watchdog: Terminate `makemkvcon` if it stops making progress,
+                see :class:`makemkv.watchdog.Watchdog`.
+            autotuner: Chooses the read cache size for ``cache="auto"``.
+                Defaults to a `CacheAutotuner` with its default history.
+        """
+        super().__init__(
+            input,
+            cache,
+            minlength,
+            trusted,
+            info_cache,
+            binary,
+            progress_interval,
+            progress_delta,
+            telemetry,
+            metrics,
+            log_file,
+            watchdog,
+            autotuner,
+        )
+        self.progress_handler = progress_handler
+        self.terminate_timeout = terminate_timeout
+        self._pending: list[Awaitable[None]] = []
+
+    async def info(
+        self,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        filter: OutputFilter | None = None,
+    ) -> MakeMKVOutput:
+        """Display information about a disc.
+
+        Args:
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            filter: Only return the titles, streams and keys that pass this
+                filter. Without `info_cache`, the rest isn't even collected.
+
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
+
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        minlength = self.minlength if minlength is None else minlength
+        if self.info_cache is None:
+            return await self._run(
+                self._command("info", cache=cache, minlength=minlength), filter
+            )
+
+        loop = asyncio.get_running_loop()
+        input = await loop.run_in_executor(None, self._info_cache_input)
+        output = await loop.run_in_executor(
+            None, self.info_cache.get, input, minlength, self.trusted
+        )
+        if output is None:
+            output = await self._run(
+                self._command("info", cache=cache, minlength=minlength)
+            )
+            await loop.run_in_executor(
+                None, self.info_cache.put, input, output, minlength, self.trusted
+            )
+        return self._filter_output(output, filter)
+
+    async def mkv(
+        self,
+        title: int | str,
+        output_dir: str | Path,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+    ) -> MakeMKVOutput:
+        """Copy titles from disc.
+
+        Args:
+            title: Title to be ripped, can be either an integer starting
+                with 0 or the keyword "all".
+            output_dir: Output directory for created mkv files.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
+
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        return await self._run(
+            self._command("mkv", title, output_dir, cache=cache, minlength=minlength)
+        )
+
+    async def backup(
+        self,
+        output_dir: str | Path,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        decrypt: bool = False,
+    ) -> MakeMKVOutput:
+        """Backup whole disc.
+
+        Args:
+            output_dir: Output directory for created backup files.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            decrypt: Decrypt stream files during backup.
+
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
+
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        return await self._run(
+            self._command(
+                "backup",
+                output_dir,
+                cache=cache,
+                minlength=minlength,
+                decrypt=decrypt,
+            )
+        )
+
+    def iter_events(
+        self,
+        command: Literal["info", "mkv", "backup"],
+        *args: int | str | Path,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        decrypt: bool = False,
+    ) -> AsyncGenerator[MakeMKVEvent, None]:
+        """Run a makemkvcon command and yield events while its output is parsed.
+
+        This is the asynchronous counterpart of
+        :func:`makemkv.MakeMKV.iter_events`. Use
+        :func:`contextlib.aclosing` to terminate `makemkvcon` reliably if you
+        stop the iteration early.
+
+        Args:
+            command: Either "info", "mkv" or "backup".
+            *args: Arguments of the command, eg. title and output directory
+                for "mkv" or output directory for "backup".
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            decrypt: Decrypt stream files during backup.
+
+        Yields:
+            MakeMKVEvent: A message, progress update or attribute parsed from
+                a line of makemkvcon's output.
+
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        return self._run_events(
+            self._command(
+                command, *args, cache=cache, minlength=minlength, decrypt=decrypt
+            )
+        )
+
+    def _handle_progress(self, task_description: str, progress: int, max: int) -> None:
+        result = self.progress_handler(task_description, progress, max)
+        if result is not None:
+            self._pending.append(result)
+
+    async def _run(
+        self, cmd: list[str], filter: OutputFilter | None = None
+    ) -> MakeMKVOutput:
+        """Run makemkvcon and parse its output."""
+        collector = _Collector(self, filter)
+        try:
+            async for event in self._run_events(cmd):
+                collector.feed(event)
+        except MakeMKVStallError as exc:
+            exc.output = collector.output
+            raise
+        finally:
+            collector.close()
+        return collector.output
+
+    async def _run_events(self, cmd: list[str]) -> AsyncGenerator[MakeMKVEvent, None]:
+        """Run makemkvcon and yield the events parsed from its output."""
+        dispatcher = _EventDispatcher(self, cmd[1])
+        try:
+            p = self.process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=PIPE, stderr=STDOUT
+            )
+        except BaseException:
+            dispatcher.finish(None)
+            raise
+        logger.info('Running "%s"', " ".join(cmd))
+        assert p.stdout is not None
+
+        monitor = None if self.watchdog is None else _Monitor(self.watchdog)
+        dispatcher.start(monitor)
+        watch = None if monitor is None else asyncio.ensure_future(self._watch(monitor))
+        try:
+            with self._open_log_file() as log_file:
+                splitter = _LineSplitter()
+                while True:
+                    data = await p.stdout.read(_READ_SIZE)
+                    for line in splitter.feed(data) if data else splitter.close():
+                        if log_file is not None:
+                            log_file.write(line.decode("utf-8", "replace") + "\n")
+                        event = self._parse_raw_line(line)
+                        while self._pending:
+                            await self._pending.pop(0)
+                        if event is not None:
+                            dispatcher.update(event)
+                            yield event
+                    if not data:
+                        break
+            self._flush_progress()
+            while self._pending:
+                await self._pending.pop(0)
+            await p.wait()
+        except BaseException:
+            for awaitable in self._pending:
+                if asyncio.iscoroutine(awaitable):
+                    awaitable.close()
+            self._pending.clear()
+            await self._terminate()
+            raise
+        finally:
+            if watch is not None:
+                watch.cancel()
+            dispatcher.finish(p.returncode)
+        dispatcher.check(await p.wait())
+
+    async def _watch(self, monitor: _Monitor) -> None:
+        """Terminate `makemkvcon` when it stalls."""
+        while (reason := monitor.check()) is None:
+            await asyncio.sleep(monitor.interval)
+        monitor.reason = reason
+        logger.warning(f"makemkvcon stalled ({reason}), terminating it")
+        await self._terminate(monitor.watchdog.kill_timeout)
+
+    async def _terminate(self, timeout: float | None = None) -> None:
+        """Ask `makemkvcon` to exit and kill it if it doesn't."""
+        p = self.process
+        if p is None or p.returncode is not None:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            p.terminate()
+        try:
+            await asyncio.wait_for(
+                p.wait(), self.terminate_timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("makemkvcon didn't terminate, killing it")
+            self.kill()
+            await p.wait()
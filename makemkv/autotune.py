@@ -0,0 +1,259 @@
+"""Provides `CacheAutotuner`, which chooses the read cache size for ``cache="auto"``.
+
+The size of makemkvcon's read cache is chosen from the type of the disc, the
+memory that is available to each running `makemkvcon` process and the
+throughput of past rips. The history is stored next to the default
+directory of :class:`makemkv.DiscInfoCache`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .cache import _default_directory, fingerprint
+from .makemkv import logger
+from .telemetry import ProgressTelemetry
+from .types import DiscAttributeEvent, MakeMKVEvent, ProgressValueEvent
+
+# starting points in megabytes, refined by the throughput history
+_DEFAULT_CACHE = {"DVD": 128, "HDDVD": 512, "BD": 1024}
+_UNKNOWN_CACHE = 256
+_MIN_CACHE = 32
+# samples of each disc type and discs whose type is remembered
+_MAX_SAMPLES = 100
+_MAX_DISCS = 1000
+
+_lock = threading.Lock()
+# number of running `makemkvcon` processes with an autotuned cache
+_running = 0
+
+
+class CacheAutotuner:
+    """Chooses a read cache size per disc type.
+
+    The first rips of a disc type use a default size. Later rips try half
+    and twice the size with the best median throughput until both are
+    measured, and then keep using the best size. Each size is capped at
+    `memory_fraction` of the memory that is available when the process
+    starts, divided by the number of running processes started with
+    ``cache="auto"``, including the new one. Processes that start together
+    may therefore use more than `memory_fraction` in total, eg. 512, 256,
+    170 and 128 MB of a 512 MB share for four processes.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        max_cache: int = 2048,
+        memory_fraction: float = 0.5,
+    ) -> None:
+        """Initialize CacheAutotuner.
+
+        Args:
+            path: JSON file that stores the throughput history. Defaults to
+                `autotune.json` in the user's cache directory.
+            max_cache: Maximum size of the read cache in megabytes.
+            memory_fraction: Fraction of the available memory that may be
+                used by the read caches of all running `makemkvcon` processes.
+        """
+        self.path = (
+            Path(path)
+            if path is not None
+            else _default_directory().with_name("autotune.json")
+        )
+        self.max_cache = max_cache
+        self.memory_fraction = memory_fraction
+
+    def choose(self, disc_type: str | None, jobs: int = 1) -> int:
+        """Choose the size of the read cache.
+
+        Args:
+            disc_type: The `type` of the disc, eg. "DVD" or "BD", None if it
+                is unknown.
+            jobs: Number of `makemkvcon` processes that share the memory.
+
+        Returns:
+            int: The size of the read cache in megabytes.
+        """
+        limit = self._limit(jobs)
+        samples = self._load()["throughput"].get(disc_type or "unknown", [])
+        throughputs: dict[int, list[float]] = {}
+        for cache, throughput in samples:
+            if cache <= limit:
+                throughputs.setdefault(cache, []).append(throughput)
+        if not throughputs:
+            return min(_DEFAULT_CACHE.get(disc_type or "", _UNKNOWN_CACHE), limit)
+
+        medians = {
+            cache: statistics.median(values) for cache, values in throughputs.items()
+        }
+        best = max(medians, key=lambda cache: medians[cache])
+        for candidate in (best * 2, best // 2):
+            if _MIN_CACHE <= candidate <= limit and candidate not in medians:
+                return candidate
+        return best
+
+    def record(self, disc_type: str | None, cache: int, throughput: float) -> None:
+        """Add the throughput of a rip in bytes per second to the history."""
+        with self._update() as history:
+            samples = history["throughput"].setdefault(disc_type or "unknown", [])
+            samples.append([cache, throughput])
+            del samples[:-_MAX_SAMPLES]
+
+    def disc_type(self, input: str) -> str | None:
+        """Return the type of the disc in `input` if it is known.
+
+        The type of folders is recognized by their files, the type of discs
+        and images if it was recorded by an earlier run. Discs that can't be
+        fingerprinted, eg. "disc:0", are identified by their input, so the
+        type of the last disc in the drive is returned.
+        """
+        kind, _, path = input.partition(":")
+        if kind == "file":
+            folder = Path(path)
+            if folder.name == "BDMV" or (folder / "BDMV").is_dir():
+                return "BD"
+            if folder.name == "VIDEO_TS" or (folder / "VIDEO_TS").is_dir():
+                return "DVD"
+        return self._load()["discs"].get(_disc_key(input))
+
+    def record_disc_type(self, input: str, disc_type: str) -> None:
+        """Remember the type of the disc in `input`."""
+        key = _disc_key(input)
+        with self._update() as history:
+            discs = history["discs"]
+            discs.pop(key, None)
+            discs[key] = disc_type
+            for old in list(discs)[:-_MAX_DISCS]:
+                del discs[old]
+
+    def _limit(self, jobs: int) -> int:
+        """Maximum cache size of one of `jobs` processes in megabytes."""
+        limit = self.max_cache
+        if (available := _available_memory()) is not None:
+            share = available * self.memory_fraction / max(jobs, 1) / 2**20
+            limit = min(limit, int(share))
+        return max(limit, _MIN_CACHE)
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with self.path.open() as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = {}
+        history.setdefault("throughput", {})
+        history.setdefault("discs", {})
+        return history
+
+    @contextlib.contextmanager
+    def _update(self) -> Any:
+        """Load the history and write it back atomically."""
+        with _lock:
+            history = self._load()
+            yield history
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(history, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+                raise
+
+
+class _TuningJob:
+    """Measures the throughput of a `makemkvcon` process with an autotuned cache.
+
+    The job counts as running from :func:`_reserve` until it is released, so
+    processes that are started at the same time share the memory.
+    """
+
+    def __init__(
+        self, autotuner: CacheAutotuner, input: str, disc_type: str | None, cache: int
+    ) -> None:
+        self.autotuner = autotuner
+        self.input = input
+        self.disc_type = disc_type
+        self.cache = cache
+        self._telemetry = ProgressTelemetry()
+        self._reported_type: str | None = None
+        self._bytes_done = 0
+        self._bytes_saved = 0
+        self._start: float | None = None
+        self._end = 0.0
+        self._released = False
+
+    def release(self) -> None:
+        """Stop counting the job as running, if it wasn't released yet."""
+        global _running
+        with _lock:
+            if not self._released:
+                self._released = True
+                _running -= 1
+
+    def update(self, event: MakeMKVEvent) -> None:
+        self._telemetry.update(event)
+        if isinstance(event, DiscAttributeEvent) and event.key == "type":
+            self._reported_type = str(event.value)
+        elif isinstance(event, ProgressValueEvent):
+            bytes_done = self._telemetry.bytes_done
+            if bytes_done < self._bytes_done:
+                # a new task began
+                self._bytes_done = 0
+            if bytes_done > self._bytes_done:
+                now = time.monotonic()
+                if self._start is None:
+                    self._start = now
+                self._bytes_saved += bytes_done - self._bytes_done
+                self._bytes_done = bytes_done
+                self._end = now
+
+    def finish(self, return_code: int | None) -> None:
+        self.release()
+        try:
+            if self._reported_type is not None:
+                if self._reported_type != self.disc_type:
+                    self.autotuner.record_disc_type(self.input, self._reported_type)
+                self.disc_type = self._reported_type
+            if return_code == 0 and self._start is not None and self._end > self._start:
+                throughput = self._bytes_saved / (self._end - self._start)
+                self.autotuner.record(self.disc_type, self.cache, throughput)
+        except OSError as exc:
+            logger.warning(f"Couldn't record the read cache throughput: {exc}")
+
+
+def _reserve(autotuner: CacheAutotuner, input: str) -> _TuningJob:
+    """Choose the cache size for `input` and count its job as running."""
+    global _running
+    disc_type = autotuner.disc_type(input)
+    with _lock:
+        cache = autotuner.choose(disc_type, _running + 1)
+        _running += 1
+    return _TuningJob(autotuner, input, disc_type, cache)
+
+
+def _disc_key(input: str) -> str:
+    """Key of the disc in `input` in the history of disc types."""
+    return fingerprint(input) or input
+
+
+def _available_memory() -> int | None:
+    """Return the available memory in bytes or None if it is unknown."""
+    with contextlib.suppress(OSError, ValueError, IndexError):
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    with contextlib.suppress(AttributeError, ValueError, OSError):
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    return None
@@ -0,0 +1,200 @@
+"""Provides `DiscInfoCache`, an on-disk cache for the output of `info`."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import tempfile
+from pathlib import Path
+
+from .makemkv import logger
+from .types import MakeMKVOutput
+
+_SECTOR_SIZE = 2048
+# ISO 9660 and UDF volume descriptors start at sector 16,
+# the UDF anchor volume descriptor pointer is at sector 256
+_DESCRIPTOR_SECTORS = (16, 32)
+_ANCHOR_SECTOR = 256
+
+
+class DiscInfoCache:
+    """Stores parsed disc information on disk, keyed by a disc fingerprint.
+
+    The fingerprint is computed from cheap identifiers like the volume
+    descriptors and size of a device or ISO file (see :func:`fingerprint`),
+    so a cached disc is recognized without running `makemkvcon`. If the total
+    size of the cache exceeds `max_size`, the least recently used entries are
+    removed.
+    """
+
+    def __init__(
+        self, directory: str | Path | None = None, max_size: int = 64 * 2**20
+    ) -> None:
+        """Initialize DiscInfoCache.
+
+        Args:
+            directory: Directory for the cached files. Defaults to a
+                `python-makemkv` directory in the user's cache directory.
+            max_size: Maximum total size of the cached files in bytes.
+        """
+        self.directory = (
+            Path(directory) if directory is not None else _default_directory()
+        )
+        self.max_size = max_size
+
+    def get(
+        self, input: str, minlength: int | str | None = None, trusted: bool = False
+    ) -> MakeMKVOutput | None:
+        """Return the cached information about `input` or None.
+
+        Information that was parsed without validation is only returned if
+        `trusted` is set.
+
+        Args:
+            input: Input in makemkvcon's format, eg. "dev:/dev/sr0".
+            minlength: Minimum title length in seconds used for scanning.
+            trusted: Whether the caller doesn't validate parsed values.
+        """
+        # validated information can be used by trusted callers, too
+        for entry_trusted in (False, True) if trusted else (False,):
+            if (path := self._path(input, minlength, entry_trusted)) is None:
+                return None
+            with contextlib.suppress(OSError, ValueError), path.open() as f:
+                output: MakeMKVOutput = json.load(f)
+                break
+        else:
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)  # mark as recently used
+        logger.debug(f"Using cached disc info for {input}")
+        return output
+
+    def put(
+        self,
+        input: str,
+        output: MakeMKVOutput,
+        minlength: int | str | None = None,
+        trusted: bool = False,
+    ) -> None:
+        """Store the information about `input`.
+
+        Args:
+            input: Input in makemkvcon's format, eg. "dev:/dev/sr0".
+            output: The parsed output of `info`.
+            minlength: Minimum title length in seconds used for scanning.
+            trusted: Whether `output` was parsed without validation.
+        """
+        if (path := self._path(input, minlength, trusted)) is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(output, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        self._evict(keep=path)
+
+    def invalidate(self, input: str) -> None:
+        """Remove all cached information about the disc in `input`."""
+        if (disc_fingerprint := fingerprint(input)) is None:
+            return
+        for path in self.directory.glob(f"{disc_fingerprint}-*.json"):
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+    def clear(self) -> None:
+        """Remove all cached information."""
+        for path in self.directory.glob("*.json"):
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+    def _path(
+        self, input: str, minlength: int | str | None, trusted: bool
+    ) -> Path | None:
+        if (disc_fingerprint := fingerprint(input)) is None:
+            return None
+        suffix = "-trusted" if trusted else ""
+        return self.directory / f"{disc_fingerprint}-{minlength or 0}{suffix}.json"
+
+    def _evict(self, keep: Path) -> None:
+        """Remove the least recently used files until the cache is small enough."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            if path == keep:
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total_size = keep.stat().st_size + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+            total_size -= size
+
+
+def fingerprint(input: str) -> str | None:
+    """Compute a fingerprint that identifies the disc or files of `input`.
+
+    Devices and ISO files are identified by their size and their volume
+    descriptors, which contain the volume name and creation date. ISO files
+    and folders are also identified by the modification times of their files.
+
+    Args:
+        input: Input in makemkvcon's format, eg. "dev:/dev/sr0".
+
+    Returns:
+        str | None: A hex digest or None if `input` can't be identified
+            cheaply, eg. if it is a disc number or a drive without a disc.
+    """
+    kind, _, path = input.partition(":")
+    try:
+        if kind == "dev":
+            return _hash_volume(path)
+        if kind == "iso":
+            return _hash_volume(path, os.stat(path).st_mtime_ns)
+        if kind == "file":
+            return _hash_folder(path)
+    except OSError:
+        return None
+    return None
+
+
+def _hash_volume(path: str, *extra: object) -> str:
+    digest = hashlib.sha256(repr(extra).encode())
+    with open(path, "rb") as f:
+        digest.update(str(f.seek(0, os.SEEK_END)).encode())
+        f.seek(_DESCRIPTOR_SECTORS[0] * _SECTOR_SIZE)
+        digest.update(
+            f.read((_DESCRIPTOR_SECTORS[1] - _DESCRIPTOR_SECTORS[0]) * _SECTOR_SIZE)
+        )
+        f.seek(_ANCHOR_SECTOR * _SECTOR_SIZE)
+        digest.update(f.read(_SECTOR_SIZE))
+    return digest.hexdigest()
+
+
+def _hash_folder(path: str) -> str:
+    digest = hashlib.sha256()
+    root = Path(path)
+    for file in sorted(root.rglob("*")):
+        stat = file.stat()
+        digest.update(
+            f"{file.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        )
+    return digest.hexdigest()
+
+
+def _default_directory() -> Path:
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base, "python-makemkv", "info")
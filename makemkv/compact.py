@@ -0,0 +1,195 @@
+"""A compact alternative to the dicts of `MakeMKVOutput`.
+
+Each title and stream of `MakeMKVOutput` is a dict that stores its keys
+again. The classes in this module store the same values in ``__slots__``
+and intern strings that repeat across titles and discs like codecs and
+languages, which needs a fraction of the memory when many discs are kept
+around. Missing values are missing attributes, just like missing keys of the
+dicts, and the values can be accessed like the items of the dicts as well.
+
+```python
+from makemkv import CompactOutput, MakeMKV
+
+output = CompactOutput.from_events(MakeMKV(0).iter_events("info"))
+print(output.titles[0].streams[0].codec_id)
+```
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, ClassVar, Iterable, Iterator, TypeVar
+
+from .types import Disc, Drive, MakeMKVEvent, MakeMKVOutput, Stream, Title
+
+_T = TypeVar("_T", bound="_Compact")
+
+
+class _Compact:
+    """Base class of objects that store the keys of a TypedDict as slots."""
+
+    __slots__: tuple[str, ...] = ()
+    # keys whose values repeat a lot and are therefore interned
+    _interned: ClassVar[frozenset[str]] = frozenset()
+
+    def __init__(self, **values: Any) -> None:
+        for key, value in values.items():
+            self._set(key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._set(key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of `key` or `default` if it is missing."""
+        return getattr(self, key, default)
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        """Iterate over the keys and values that aren't missing."""
+        for key in self.__slots__:
+            try:
+                yield key, getattr(self, key)
+            except AttributeError:
+                pass
+
+    @classmethod
+    def from_dict(cls: type[_T], values: Any) -> _T:
+        """Create an object from the corresponding dict."""
+        return cls(**values)
+
+    def to_dict(self) -> Any:
+        """Return the corresponding dict."""
+        return dict(self.items())
+
+    def _set(self, key: str, value: Any) -> None:
+        if key in self._interned and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({values})"
+
+
+class CompactDisc(_Compact):
+    """Compact variant of `makemkv.types.Disc`."""
+
+    __slots__ = tuple(Disc.__annotations__)
+    _interned = frozenset({"metadata_langcode", "metadata_language", "type"})
+
+    def to_dict(self) -> Disc:
+        """Return the corresponding dict."""
+        return Disc(**dict(self.items()))  # type: ignore[typeddict-item]
+
+
+class CompactStream(_Compact):
+    """Compact variant of `makemkv.types.Stream`."""
+
+    __slots__ = tuple(Stream.__annotations__)
+    _interned = frozenset(
+        key for key in Stream.__annotations__ if key not in ("framerate", "samplerate")
+    )
+
+    def to_dict(self) -> Stream:
+        """Return the corresponding dict."""
+        return Stream(**dict(self.items()))  # type: ignore[typeddict-item]
+
+
+class CompactTitle(_Compact):
+    """Compact variant of `makemkv.types.Title`."""
+
+    __slots__ = tuple(Title.__annotations__)
+    _interned = frozenset(
+        {"length", "metadata_langcode", "metadata_language", "size_human"}
+    )
+
+    streams: list[CompactStream]
+
+    def __init__(self, **values: Any) -> None:
+        self.streams = []
+        super().__init__(**values)
+
+    @classmethod
+    def from_dict(cls, values: Any) -> CompactTitle:
+        """Create an object from the corresponding dict."""
+        title = cls(**{key: value for key, value in values.items() if key != "streams"})
+        title.streams = [CompactStream.from_dict(s) for s in values["streams"]]
+        return title
+
+    def to_dict(self) -> Title:
+        """Return the corresponding dict."""
+        title = Title(**dict(self.items()))  # type: ignore[typeddict-item]
+        title["streams"] = [stream.to_dict() for stream in self.streams]
+        return title
+
+
+class CompactOutput(_Compact):
+    """Compact variant of `makemkv.MakeMKVOutput`.
+
+    Drives are kept as dicts because there are only a few of them.
+    """
+
+    __slots__ = ("disc", "drives", "title_count", "titles")
+
+    disc: CompactDisc
+    drives: list[Drive]
+    title_count: int
+    titles: list[CompactTitle]
+
+    def __init__(self, **values: Any) -> None:
+        self.drives = []
+        self.titles = []
+        super().__init__(**values)
+
+    @classmethod
+    def from_dict(cls, values: Any) -> CompactOutput:
+        """Create an object from a `MakeMKVOutput`."""
+        output = cls(drives=list(values["drives"]))
+        if "disc" in values:
+            output.disc = CompactDisc.from_dict(values["disc"])
+        if "title_count" in values:
+            output.title_count = values["title_count"]
+        output.titles = [CompactTitle.from_dict(title) for title in values["titles"]]
+        return output
+
+    @classmethod
+    def from_events(cls, events: Iterable[MakeMKVEvent]) -> CompactOutput:
+        """Collect the information of makemkvcon's events.
+
+        This builds the compact objects directly, without creating the
+        dicts of `MakeMKVOutput` first.
+
+        Args:
+            events: Events of :func:`makemkv.MakeMKV.iter_events`.
+        """
+        from .makemkv import _apply_event, _OutputTypes
+
+        types = _OutputTypes(CompactDisc, CompactTitle, CompactStream)
+        output = cls()
+        for event in events:
+            _apply_event(output, event, types)
+        return output
+
+    def to_dict(self) -> MakeMKVOutput:
+        """Return the corresponding `MakeMKVOutput`."""
+        output = MakeMKVOutput(
+            drives=list(self.drives),
+            titles=[title.to_dict() for title in self.titles],
+        )
+        if hasattr(self, "disc"):
+            output["disc"] = self.disc.to_dict()
+        if hasattr(self, "title_count"):
+            output["title_count"] = self.title_count
+        return output
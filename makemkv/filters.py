@@ -0,0 +1,281 @@
+"""Selects titles, streams and keys while makemkvcon's output is parsed.
+
+Pass an `OutputFilter` to :func:`makemkv.MakeMKV.info` to drop what you
+don't need before it is collected. Attributes that are neither returned nor
+needed by a predicate aren't even translated and validated.
+
+Titles and streams that are filtered out are removed from the lists, so the
+index of a title is no longer the number that `mkv()` expects. Instead,
+each title of filtered output has a ``title_nr`` key.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Collection, Iterator, NamedTuple
+
+from .output_codes import KEY_CODES
+from .types import (
+    DiscAttributeEvent,
+    MakeMKVEvent,
+    MakeMKVOutput,
+    StreamAttributeEvent,
+    TitleAttributeEvent,
+    TitleCountEvent,
+)
+
+
+class OutputFilter(NamedTuple):
+    """Declarative filter of the titles, streams and keys of `MakeMKVOutput`.
+
+    Titles and streams that lack an attribute aren't filtered by it.
+    """
+
+    min_length: int = 0  # seconds
+    max_length: int | None = None  # seconds
+    min_size: int = 0  # bytes
+    max_size: int | None = None  # bytes
+    min_chapters: int = 0
+    stream_types: Collection[str] | None = None  # eg. {"video", "audio"}
+    langcodes: Collection[str] | None = None  # eg. {"en", "de"}, ignores video
+    title_keys: Collection[str] | None = None  # keys of `Title` to keep
+    stream_keys: Collection[str] | None = None  # keys of `Stream` to keep
+
+    def accepts_title(self, title: dict[str, Any]) -> bool:
+        """Check if a title with these attributes passes the filter."""
+        if (length := _seconds(title.get("length"))) is not None:
+            if length < self.min_length:
+                return False
+            if self.max_length is not None and length > self.max_length:
+                return False
+        if (size := title.get("size")) is not None:
+            if size < self.min_size:
+                return False
+            if self.max_size is not None and size > self.max_size:
+                return False
+        return title.get("chapter_count", self.min_chapters) >= self.min_chapters
+
+    def accepts_stream(self, stream: dict[str, Any]) -> bool:
+        """Check if a stream with these attributes passes the filter."""
+        if self.stream_types is not None and "type" in stream:
+            if stream["type"] not in self.stream_types:
+                return False
+        if self.langcodes is not None and "langcode" in stream:
+            if (
+                stream.get("type") != "video"
+                and stream["langcode"] not in self.langcodes
+            ):
+                return False
+        return True
+
+    def title_ids(self) -> frozenset[int] | None:
+        """Attribute ids of titles that have to be parsed."""
+        if self.title_keys is None:
+            return None
+        keys = {*self.title_keys, *self._title_predicate_keys()}
+        return frozenset(id for id, key in KEY_CODES.items() if key in keys)
+
+    def stream_ids(self) -> frozenset[int] | None:
+        """Attribute ids of streams that have to be parsed."""
+        if self.stream_keys is None:
+            return None
+        keys = {*self.stream_keys, *self._stream_predicate_keys()}
+        # makemkvcon's "name" of a stream is called "downmix"
+        return frozenset(
+            id
+            for id, key in KEY_CODES.items()
+            if ("downmix" if id == 2 else key) in keys
+        )
+
+    def _title_predicate_keys(self) -> set[str]:
+        keys = set()
+        if self.min_length or self.max_length is not None:
+            keys.add("length")
+        if self.min_size or self.max_size is not None:
+            keys.add("size")
+        if self.min_chapters:
+            keys.add("chapter_count")
+        return keys
+
+    def _stream_predicate_keys(self) -> set[str]:
+        keys = set()
+        if self.stream_types is not None or self.langcodes is not None:
+            keys.add("type")
+        if self.langcodes is not None:
+            keys.add("langcode")
+        return keys
+
+
+class _EventFilter:
+    """Applies an `OutputFilter` to a stream of events.
+
+    The events of a title are held back until its first stream or the next
+    title begins, the events of a stream until the next stream begins. Title
+    and stream numbers of the passed events are renumbered so that they
+    can be collected into lists without gaps.
+    """
+
+    def __init__(self, filter: OutputFilter) -> None:
+        self.filter = filter
+        self._title_keys = None if filter.title_keys is None else {*filter.title_keys}
+        self._stream_keys = (
+            None if filter.stream_keys is None else {*filter.stream_keys}
+        )
+        self._title_predicate_keys = filter._title_predicate_keys()
+        self._stream_predicate_keys = filter._stream_predicate_keys()
+        # new number of each title and stream, None if it was filtered out
+        self._titles: dict[int, int | None] = {}
+        self._streams: dict[tuple[int, int], int | None] = {}
+        self._stream_counts: dict[int, int] = {}
+        self._title_count = 0
+        # the title and stream whose events are held back
+        self._title_nr: int | None = None
+        self._title_events: list[TitleAttributeEvent] = []
+        self._stream: tuple[int, int] | None = None
+        self._stream_events: list[StreamAttributeEvent] = []
+
+    def feed(self, event: MakeMKVEvent) -> list[MakeMKVEvent]:
+        """Return the events that are passed on after `event`."""
+        if isinstance(event, StreamAttributeEvent):
+            return self._feed_stream(event)
+        if isinstance(event, TitleAttributeEvent):
+            return self._feed_title(event)
+        return [event]
+
+    def close(self) -> list[MakeMKVEvent]:
+        """Return the events that were held back."""
+        return self._end_title()
+
+    def _feed_title(self, event: TitleAttributeEvent) -> list[MakeMKVEvent]:
+        if event.title_nr in self._titles:
+            # the title was decided already
+            return self._pass_title_events([event])
+        passed = []
+        if event.title_nr != self._title_nr:
+            passed = self._end_title()
+            self._title_nr = event.title_nr
+        self._title_events.append(event)
+        return passed
+
+    def _feed_stream(self, event: StreamAttributeEvent) -> list[MakeMKVEvent]:
+        passed = []
+        if event.title_nr not in self._titles:
+            if event.title_nr != self._title_nr:
+                passed = self._end_title()
+                self._title_nr = event.title_nr
+            passed += self._decide_title()
+        if self._titles[event.title_nr] is None:
+            return passed
+
+        stream = (event.title_nr, event.stream_nr)
+        if stream in self._streams:
+            return passed + self._pass_stream_events([event])
+        if stream != self._stream:
+            passed += self._end_stream()
+            self._stream = stream
+        self._stream_events.append(event)
+        return passed
+
+    def _end_title(self) -> list[MakeMKVEvent]:
+        passed = self._end_stream()
+        if self._title_nr is not None and self._title_nr not in self._titles:
+            passed += self._decide_title()
+        self._title_nr = None
+        return passed
+
+    def _decide_title(self) -> list[MakeMKVEvent]:
+        title_nr = self._title_nr
+        assert title_nr is not None
+        events, self._title_events = self._title_events, []
+        values = {
+            event.key: event.value
+            for event in events
+            if event.key in self._title_predicate_keys
+        }
+        if not self.filter.accepts_title(values):
+            self._titles[title_nr] = None
+            return []
+
+        new_title_nr = self._title_count
+        self._title_count += 1
+        self._titles[title_nr] = new_title_nr
+        self._stream_counts[new_title_nr] = 0
+        return [
+            TitleAttributeEvent(new_title_nr, "title_nr", title_nr),
+            *self._pass_title_events(events),
+        ]
+
+    def _end_stream(self) -> list[MakeMKVEvent]:
+        if self._stream is None:
+            return []
+        stream, self._stream = self._stream, None
+        events, self._stream_events = self._stream_events, []
+        values = {
+            event.key: event.value
+            for event in events
+            if event.key in self._stream_predicate_keys
+        }
+        if not self.filter.accepts_stream(values):
+            self._streams[stream] = None
+            return []
+
+        new_title_nr = self._titles[stream[0]]
+        assert new_title_nr is not None
+        self._streams[stream] = self._stream_counts[new_title_nr]
+        self._stream_counts[new_title_nr] += 1
+        return self._pass_stream_events(events)
+
+    def _pass_title_events(
+        self, events: list[TitleAttributeEvent]
+    ) -> list[MakeMKVEvent]:
+        new_title_nr = self._titles[events[0].title_nr] if events else None
+        if new_title_nr is None:
+            return []
+        return [
+            event._replace(title_nr=new_title_nr)
+            for event in events
+            if self._title_keys is None or event.key in self._title_keys
+        ]
+
+    def _pass_stream_events(
+        self, events: list[StreamAttributeEvent]
+    ) -> list[MakeMKVEvent]:
+        if not events:
+            return []
+        new_stream_nr = self._streams[events[0].title_nr, events[0].stream_nr]
+        if new_stream_nr is None:
+            return []
+        new_title_nr = self._titles[events[0].title_nr]
+        assert new_title_nr is not None
+        return [
+            event._replace(title_nr=new_title_nr, stream_nr=new_stream_nr)
+            for event in events
+            if self._stream_keys is None or event.key in self._stream_keys
+        ]
+
+
+def _output_events(output: MakeMKVOutput) -> Iterator[MakeMKVEvent]:
+    """Yield the events that produce the disc and the titles of `output`."""
+    if "title_count" in output:
+        yield TitleCountEvent(output["title_count"])
+    for key, value in output.get("disc", {}).items():
+        yield DiscAttributeEvent(key, value)  # type: ignore[arg-type]
+    for title_nr, title in enumerate(output["titles"]):
+        for key, value in title.items():
+            if key != "streams":
+                yield TitleAttributeEvent(title_nr, key, value)  # type: ignore[arg-type]
+        for stream_nr, stream in enumerate(title["streams"]):
+            for key, value in stream.items():
+                yield StreamAttributeEvent(
+                    title_nr, stream_nr, key, value  # type: ignore[arg-type]
+                )
+
+
+def _seconds(length: str | None) -> int | None:
+    """Convert a length like "1:42:00" to seconds."""
+    if length is None:
+        return None
+    try:
+        hours, minutes, seconds = map(int, length.split(":"))
+    except ValueError:
+        return None
+    return hours * 3600 + minutes * 60 + seconds
@@ -0,0 +1,458 @@
+"""Provides `JobQueue`, a durable queue of rip jobs backed by SQLite.
+
+Jobs survive restarts of the worker: a job that was running when the process
+died is queued again, unless all of its files were already saved. Each job
+writes into a staging directory next to its output directory first and its
+files are only moved into place after `makemkvcon` succeeded, so a file with
+an expected name in the output directory is always complete.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Literal, NamedTuple, Optional
+
+from .makemkv import MakeMKV, MakeMKVError, _do_nothing, logger
+from .orchestrator import MultiProgressUpdateHandlerType
+from .types import MakeMKVEvent, TitleAttributeEvent
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    input TEXT NOT NULL,
+    command TEXT NOT NULL,
+    title TEXT,
+    output_dir TEXT NOT NULL,
+    decrypt INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    files TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+
+class JobState(str, Enum):
+    """State of a job in a `JobQueue`."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(NamedTuple):
+    """A job stored in a `JobQueue`."""
+
+    id: int
+    input: str  # in makemkvcon's format, eg. "disc:0"
+    command: Literal["mkv", "backup"]
+    title: Optional[str]  # title number or "all", None for backups
+    output_dir: Path
+    decrypt: bool
+    state: JobState
+    files: tuple[str, ...]  # expected `file_output` names of mkv jobs
+    error: Optional[str]  # message of the last failure
+    attempts: int
+
+
+class JobQueue:
+    """Stores rip jobs in a SQLite database and runs them with `MakeMKV`.
+
+    Jobs with the same input are run one after another, jobs with different
+    inputs at the same time. Only one process should run the jobs of a
+    database, since opening it queues all running jobs again.
+    """
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        max_workers: int | None = None,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        progress_handler: MultiProgressUpdateHandlerType = _do_nothing,
+        trusted: bool = False,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        metrics: Metrics | None = None,
+    ) -> None:
+        """Open the job queue and recover the jobs of a previous run.
+
+        Args:
+            path: Path of the SQLite database, it is created if it doesn't
+                exist.
+            max_workers: Maximum number of jobs running at the same time.
+                Defaults to the number of CPU cores.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            progress_handler: A callback function to parse progress updates.
+                Its first argument is "job N".
+            trusted: Don't validate the types of parsed values.
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+            progress_interval: Minimum number of seconds between two
+                progress updates passed to `progress_handler`.
+            progress_delta: Minimum change of the progress value between two
+                progress updates passed to `progress_handler`.
+            metrics: Collects metrics about the `makemkvcon` processes.
+        """
+        self.path = Path(path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.progress_handler = progress_handler
+        self._new_makemkv = functools.partial(
+            MakeMKV,
+            cache=cache,
+            minlength=minlength,
+            trusted=trusted,
+            binary=binary,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            metrics=metrics,
+        )
+        self._lock = threading.Lock()
+        self._running: dict[int, MakeMKV] = {}
+        # set by `kill`, jobs that fail afterwards are queued again
+        self._killed = threading.Event()
+        self._db = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self.recover()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> JobQueue:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def add_mkv(
+        self,
+        input: int | str | PathLike[str],
+        title: int | str,
+        output_dir: str | PathLike[str],
+    ) -> int:
+        """Queue a job that copies titles from a disc.
+
+        Args:
+            input: The disc to rip, see :func:`makemkv.MakeMKV.__init__`.
+            title: Title to be ripped, can be either an integer starting
+                with 0 or the keyword "all".
+            output_dir: Output directory for created mkv files.
+
+        Returns:
+            int: The id of the job.
+        """
+        return self._add(input, "mkv", str(title), output_dir, False)
+
+    def add_backup(
+        self,
+        input: int | str | PathLike[str],
+        output_dir: str | PathLike[str],
+        decrypt: bool = False,
+    ) -> int:
+        """Queue a job that backs up a whole disc.
+
+        Args:
+            input: The disc to back up, see :func:`makemkv.MakeMKV.__init__`.
+            output_dir: Output directory for created backup files. It must
+                not exist or be empty.
+            decrypt: Decrypt stream files during backup.
+
+        Returns:
+            int: The id of the job.
+        """
+        return self._add(input, "backup", None, output_dir, decrypt)
+
+    def get(self, job_id: int) -> Job:
+        """Return a job by its id.
+
+        Raises:
+            KeyError: There is no job with this id.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            if (job := row.fetchone()) is None:
+                raise KeyError(job_id)
+        return _job(job)
+
+    def jobs(self, state: JobState | None = None) -> list[Job]:
+        """Return all jobs or the jobs in `state`, oldest first."""
+        with self._lock:
+            if state is None:
+                rows = self._db.execute("SELECT * FROM jobs ORDER BY id")
+            else:
+                rows = self._db.execute(
+                    "SELECT * FROM jobs WHERE state = ? ORDER BY id", (state.value,)
+                )
+            return [_job(row) for row in rows.fetchall()]
+
+    def retry(self, job_id: int) -> None:
+        """Queue a failed job again."""
+        self._update(job_id, JobState.QUEUED, error=None, expected=JobState.FAILED)
+
+    def recover(self) -> list[int]:
+        """Reconcile the jobs that were running when the last process died.
+
+        A job whose expected files are all in its output directory is marked
+        as done, the others are queued again and their staging directories
+        removed. This is done when opening the queue.
+
+        Returns:
+            list[int]: The ids of the jobs that were queued again.
+        """
+        requeued = []
+        for job in self.jobs(JobState.RUNNING):
+            if self._finished(job):
+                logger.info("Job %d finished before the restart", job.id)
+                self._update(job.id, JobState.DONE)
+                continue
+            shutil.rmtree(_staging_dir(job), ignore_errors=True)
+            self._update(job.id, JobState.QUEUED)
+            requeued.append(job.id)
+        return requeued
+
+    def run(self) -> list[Job]:
+        """Run queued jobs until none are left.
+
+        A job that fails doesn't stop the others, its error is stored with
+        the job and it isn't run again until it is passed to :func:`retry`.
+        If `run` is interrupted or :func:`kill` is called, the running jobs
+        are terminated and queued again.
+
+        Returns:
+            list[Job]: The jobs that were run, in the order they finished.
+        """
+        finished: list[Job] = []
+        self._killed.clear()
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            futures: dict[Future[None], Job] = {}
+            try:
+                while True:
+                    busy = {job.input for job in futures.values()}
+                    while len(futures) < self.max_workers:
+                        if self._killed.is_set() or (job := self._claim(busy)) is None:
+                            break
+                        busy.add(job.input)
+                        futures[executor.submit(self._run_job, job)] = job
+                    if not futures:
+                        return finished
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished.append(self.get(futures.pop(future).id))
+            except BaseException:
+                for future, job in futures.items():
+                    if future.cancel():
+                        self._update(job.id, JobState.QUEUED)
+                self.kill()
+                raise
+
+    def kill(self) -> None:
+        """Terminate all running `makemkvcon` processes and stop :func:`run`.
+
+        The terminated jobs are queued again.
+        """
+        with self._lock:
+            self._killed.set()
+            running = list(self._running.values())
+        for makemkv in running:
+            makemkv.kill()
+
+    def _add(
+        self,
+        input: int | str | PathLike[str],
+        command: str,
+        title: str | None,
+        output_dir: str | PathLike[str],
+        decrypt: bool,
+    ) -> int:
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO jobs (input, command, title, output_dir, decrypt,"
+                " state, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._new_makemkv(input)._input,
+                    command,
+                    title,
+                    os.path.abspath(os.path.expanduser(output_dir)),
+                    decrypt,
+                    JobState.QUEUED.value,
+                    now,
+                    now,
+                ),
+            )
+        assert cursor.lastrowid is not None
+        return cursor.lastrowid
+
+    def _claim(self, busy: set[str]) -> Job | None:
+        """Mark the oldest queued job whose input isn't busy as running."""
+        for job in self.jobs(JobState.QUEUED):
+            if job.input in busy:
+                continue
+            with self._lock:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1,"
+                    " updated = ? WHERE id = ? AND state = ?",
+                    (JobState.RUNNING.value, time.time(), job.id, job.state.value),
+                )
+            if cursor.rowcount:
+                return self.get(job.id)
+        return None
+
+    def _update(
+        self,
+        job_id: int,
+        state: JobState,
+        error: str | None = None,
+        expected: JobState = JobState.RUNNING,
+    ) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated = ?"
+                " WHERE id = ? AND state = ?",
+                (state.value, error, time.time(), job_id, expected.value),
+            )
+
+    def _set_files(self, job_id: int, files: list[str]) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET files = ?, updated = ? WHERE id = ?",
+                (json.dumps(files), time.time(), job_id),
+            )
+
+    def _run_job(self, job: Job) -> None:
+        makemkv = self._new_makemkv(job.input)
+        makemkv.progress_handler = functools.partial(
+            self.progress_handler, f"job {job.id}"
+        )
+        # `kill` sets `_killed` and collects the running jobs under the same
+        # lock, so it either sees this job or this job sees `_killed`
+        with self._lock:
+            self._running[job.id] = makemkv
+            killed = self._killed.is_set()
+        staging_dir = _staging_dir(job)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        try:
+            if killed:
+                raise MakeMKVError("the job queue was killed")
+            staging_dir.mkdir(parents=True)
+            if job.command == "mkv":
+                self._run_mkv(makemkv, job, staging_dir)
+            else:
+                for _ in self._iter_events(
+                    makemkv, "backup", staging_dir, decrypt=job.decrypt
+                ):
+                    pass
+                _move_backup(staging_dir, job.output_dir)
+        except Exception as exc:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if self._killed.is_set():
+                logger.info(f"Job {job.id} was interrupted, queueing it again")
+                self._update(job.id, JobState.QUEUED)
+            else:
+                logger.error(f"Job {job.id}: {exc}")
+                self._update(job.id, JobState.FAILED, error=str(exc))
+        else:
+            self._update(job.id, JobState.DONE)
+        finally:
+            with self._lock:
+                del self._running[job.id]
+
+    def _iter_events(
+        self,
+        makemkv: MakeMKV,
+        command: Literal["mkv", "backup"],
+        *args: int | str | Path,
+        decrypt: bool = False,
+    ) -> Iterator[MakeMKVEvent]:
+        """Yield the events of a job's command until the queue is killed.
+
+        A `kill` that lands before `makemkvcon` was started can't terminate
+        it, so the events are checked as well. Stopping the iteration
+        terminates `makemkvcon`.
+        """
+        for event in makemkv.iter_events(command, *args, decrypt=decrypt):
+            if self._killed.is_set():
+                raise MakeMKVError("the job queue was killed")
+            yield event
+
+    def _run_mkv(self, makemkv: MakeMKV, job: Job, staging_dir: Path) -> None:
+        assert job.title is not None
+        title = int(job.title) if job.title.isdigit() else job.title
+        files: list[str] = []
+        for event in self._iter_events(makemkv, "mkv", title, staging_dir):
+            if (
+                isinstance(event, TitleAttributeEvent)
+                and event.key == "file_output"
+                and (title == "all" or event.title_nr == title)
+            ):
+                files.append(str(event.value))
+                # recorded before saving starts, see `recover`
+                self._set_files(job.id, files)
+
+        job.output_dir.mkdir(parents=True, exist_ok=True)
+        for path in staging_dir.iterdir():
+            os.replace(path, job.output_dir / path.name)
+        staging_dir.rmdir()
+
+    def _finished(self, job: Job) -> bool:
+        """Check if a running job saved all of its files."""
+        if job.command == "backup":
+            return (
+                job.output_dir.is_dir()
+                and any(job.output_dir.iterdir())
+                and not _staging_dir(job).exists()
+            )
+        return bool(job.files) and all(
+            (job.output_dir / name).is_file() for name in job.files
+        )
+
+
+def _job(row: sqlite3.Row) -> Job:
+    return Job(
+        row["id"],
+        row["input"],
+        row["command"],
+        row["title"],
+        Path(row["output_dir"]),
+        bool(row["decrypt"]),
+        JobState(row["state"]),
+        tuple(json.loads(row["files"])),
+        row["error"],
+        row["attempts"],
+    )
+
+
+def _staging_dir(job: Job) -> Path:
+    """Directory that `makemkvcon` writes into before the output is moved."""
+    if job.command == "mkv":
+        return job.output_dir / f".job-{job.id}.partial"
+    return job.output_dir.with_name(f".{job.output_dir.name}.job-{job.id}.partial")
+
+
+def _move_backup(staging_dir: Path, output_dir: Path) -> None:
+    if output_dir.is_dir() and not any(output_dir.iterdir()):
+        output_dir.rmdir()
+    os.replace(staging_dir, output_dir)
@@ -2,20 +2,66 @@
 
 from __future__ import annotations
 
+import abc
+import contextlib
+import functools
+import gzip
 import logging
 import platform
 import re
 import shutil
+import time
 from os import PathLike
 from pathlib import Path, WindowsPath
 from subprocess import PIPE, STDOUT, Popen
-from typing import Any, Iterable, Literal, Union
-
-from iso639 import Lang  # type: ignore [import]
-from typing_extensions import TypedDict, get_args, get_origin, get_type_hints
-
-from .output_codes import KEY_CODES, MESSAGE_CODES, SPECIAL_VALUES
-from .types import Disc, Drive, MakeMKVOutput, ProgressUpdateHandlerType, Stream, Title
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Container,
+    ContextManager,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    NamedTuple,
+    TextIO,
+)
+
+from .filters import OutputFilter, _EventFilter, _output_events
+from .output_codes import KEY_CODES, LANGUAGE_CODES, MESSAGE_CODES, SPECIAL_VALUES
+from .types import (
+    Disc,
+    DiscAttributeEvent,
+    DiscFsFlags,
+    Drive,
+    DriveEvent,
+    DriveState,
+    DriveStatus,
+    MakeMKVEvent,
+    MakeMKVOutput,
+    MessageEvent,
+    ProgressTitleEvent,
+    ProgressUpdateHandlerType,
+    ProgressValueEvent,
+    Stream,
+    StreamAttributeEvent,
+    Title,
+    TitleAttributeEvent,
+    TitleCountEvent,
+    _item_validators,
+)
+from .watchdog import Watchdog, _Monitor, _ProcessWatchdog
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from .autotune import CacheAutotuner, _TuningJob
+    from .cache import DiscInfoCache
+    from .metrics import JobMetrics, Metrics
+    from .telemetry import ProgressTelemetry
 
 if platform.system() == "Windows":
     MAKEMKVCON_BINARIES = [
@@ -28,149 +74,88 @@ else:
 
 logger = logging.getLogger(__package__)
 makemkvcon_logger = logger.getChild("makemkvcon")
-_split_msg_exp = re.compile(r'[A-Z]+(?=:)|(?<=,")[^"]*(?=")|(?!:)[^,"]+|(?<=,)(?=,)')
+_input_exp = re.compile(r"^(disc|dev|iso|file):")
+_framerate_exp = re.compile(r"^(\d+(?:\.\d+)*)\s\(\d+/\d+\)$")
+
+# makemkvcon's output is read in blocks of this many bytes
+_READ_SIZE = 2**16
+
+_LineHandlerType = Callable[["_MakeMKVBase", list[str], str], "MakeMKVEvent | None"]
 
 
 def _do_nothing(*args: Any, **kwargs: Any) -> None:
     return
 
 
-class MakeMKV:
-    """Wraps makemkvcon and exposes makemkvcon's commands as methods."""
+class _MakeMKVBase(abc.ABC):
+    """Shared implementation of `MakeMKV` and `AsyncMakeMKV`."""
+
+    process: Popen[bytes] | asyncio.subprocess.Process | None
 
     def __init__(
         self,
         input: int | str | PathLike[str],
         cache: int | str | None = None,
         minlength: int | str | None = None,
-        progress_handler: ProgressUpdateHandlerType = _do_nothing,
+        trusted: bool = False,
+        info_cache: DiscInfoCache | None = None,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        telemetry: ProgressTelemetry | None = None,
+        metrics: Metrics | None = None,
+        log_file: str | PathLike[str] | None = None,
+        watchdog: Watchdog | None = None,
+        autotuner: CacheAutotuner | None = None,
     ) -> None:
-        """Initialize MakeMKV with input.
-
-        Args:
-            input: Can be either a disc number starting with 0, a device,
-                a .IFO file or a VIDEO_TS folder.
-            cache: Size of read cache in megabytes.
-            minlength: Minimum title length in seconds.
-            progress_handler: A callback function to parse progress updates.
-                See :func:`makemkv.ProgressParser.parse_progress`
-                for an example.
-        """
         self._input = self._parse_input(input)
         self.cache = cache
         self.minlength = minlength
-        self.progress_handler = progress_handler
-        self.process: Popen | None = None
-
-    def info(
-        self,
-        cache: int | str | None = None,
-        minlength: int | str | None = None,
-    ) -> MakeMKVOutput:
-        """Display information about a disc.
-
-        Args:
-            cache: Size of read cache in megabytes.
-            minlength: Minimum title length in seconds.
-
-        Returns:
-            MakeMKVOutput: A dict containing some information about drives,
-                discs, titles and streams.
-
-        Raises:
-            MakeMKVError: MakeMKV encountered a critical problem.
-            FileNotFoundError: Couldn't find `makemkvcon`.
-        """
-        cache = self.cache if cache is None else cache
-        minlength = self.minlength if minlength is None else minlength
-        cmd = [
-            _find_makemkvcon_binary(),
-            "info",
-            self._input,
-            "--robot",
-            "--progress=-same",
-            "--noscan",
-        ]
-        if cache:
-            cmd.extend(["--cache", str(cache)])
-        if minlength:
-            cmd.extend(["--minlength", str(minlength)])
-
-        return self._run(cmd)
-
-    def mkv(
-        self,
-        title: int | str,
-        output_dir: str | Path,
-        cache: int | str | None = None,
-        minlength: int | str | None = None,
-    ) -> MakeMKVOutput:
-        """Copy titles from disc.
-
-        Args:
-            title: Title to be ripped, can be either an integer starting
-                with 0 or the keyword "all".
-            output_dir: Output directory for created mkv files.
-            cache: Size of read cache in megabytes.
-            minlength: Minimum title length in seconds.
-
-        Returns:
-            MakeMKVOutput: A dict containing some information about drives,
-                discs, titles and streams.
-
-        Raises:
-            MakeMKVError: MakeMKV encountered a critical problem.
-            FileNotFoundError: Couldn't find `makemkvcon`.
-        """
-        cache = self.cache if cache is None else cache
-        minlength = self.minlength if minlength is None else minlength
-        cmd = [
-            _find_makemkvcon_binary(),
-            "mkv",
-            self._input,
-            str(title),
-            str(output_dir),
-            "--robot",
-            "--progress=-same",
-            "--noscan",
-        ]
-        if cache:
-            cmd.extend(["--cache", str(cache)])
-        if minlength:
-            cmd.extend(["--minlength", str(minlength)])
+        self.trusted = trusted
+        self.info_cache = info_cache
+        self.binary = binary
+        self.progress_interval = progress_interval
+        self.progress_delta = progress_delta
+        self.telemetry = telemetry
+        self.metrics = metrics
+        self.log_file = log_file
+        self.watchdog = watchdog
+        self.autotuner = autotuner
+        self.process = None
+        # attribute ids of titles and streams that are parsed, None for all
+        self._title_ids: Container[int] | None = None
+        self._stream_ids: Container[int] | None = None
+        # measures the throughput of the next command if its cache is autotuned
+        self._tuning: _TuningJob | None = None
+        # input that identifies the disc in `info_cache`, see `_info_cache_input`
+        self._cache_input: str | None = None
+        self._reset_progress()
 
-        return self._run(cmd)
+    def kill(self) -> None:
+        """Terminate the `makemkvcon` progress."""
+        if self.process and self.process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                self.process.kill()
 
-    def backup(
+    def _command(
         self,
-        output_dir: str | Path,
+        command: str,
+        *args: int | str | Path,
         cache: int | str | None = None,
         minlength: int | str | None = None,
         decrypt: bool = False,
-    ) -> MakeMKVOutput:
-        """Backup whole disc.
-
-        Args:
-            output_dir: Output directory for created backup files.
-            cache: Size of read cache in megabytes.
-            minlength: Minimum title length in seconds.
-            decrypt: Decrypt stream files during backup.
-
-        Returns:
-            MakeMKVOutput: A dict containing some information about drives,
-                discs, titles and streams.
-
-        Raises:
-            MakeMKVError: MakeMKV encountered a critical problem.
-            FileNotFoundError: Couldn't find `makemkvcon`.
-        """
+    ) -> list[str]:
+        """Build the command line for running a makemkvcon command."""
+        binary = self._makemkvcon(command)
         cache = self.cache if cache is None else cache
+        if cache == "auto":
+            cache = self._autotune_cache()
         minlength = self.minlength if minlength is None else minlength
         cmd = [
-            _find_makemkvcon_binary(),
-            "backup",
+            binary,
+            command,
             self._input,
-            str(output_dir),
+            *map(str, args),
             "--robot",
             "--progress=-same",
             "--noscan",
@@ -181,18 +166,68 @@ class MakeMKV:
             cmd.extend(["--minlength", str(minlength)])
         if decrypt:
             cmd.append("--decrypt")
+        return cmd
+
+    def _autotune_cache(self) -> int:
+        """Choose the size of the read cache for the next command."""
+        from .autotune import CacheAutotuner, _reserve
+
+        if self._tuning is not None:
+            # the previous command wasn't run
+            self._tuning.release()
+        autotuner = CacheAutotuner() if self.autotuner is None else self.autotuner
+        tuning = self._tuning = _reserve(autotuner, self._input)
+        logger.info(
+            f"Using a read cache of {tuning.cache} MB"
+            f" for {tuning.disc_type or 'the disc'}"
+        )
+        return tuning.cache
 
-        return self._run(cmd)
+    def _info_cache_input(self) -> str:
+        """Return the input that identifies the disc in `info_cache`.
 
-    def kill(self) -> None:
-        """Terminate the `makemkvcon` progress."""
-        if self.process:
-            self.process.kill()
+        Disc numbers can't be fingerprinted, so they are resolved to the
+        device path of the drive with :func:`list_drives` once.
+        """
+        if self._cache_input is not None:
+            return self._cache_input
+        self._cache_input = self._input
+        kind, _, drive_nr = self._input.partition(":")
+        if kind == "disc":
+            try:
+                drives = list_drives(self.binary)
+            except MakeMKVError as exc:
+                drives = []
+                logger.debug(f"Couldn't list the drives: {exc}")
+            for drive in drives:
+                if str(drive["drive_nr"]) == drive_nr and "device_path" in drive:
+                    self._cache_input = f"dev:{drive['device_path']}"
+            if self._cache_input == self._input:
+                logger.warning(
+                    f"Couldn't find the device of {self._input},"
+                    " its information isn't cached"
+                )
+        return self._cache_input
+
+    def _open_log_file(self) -> ContextManager[TextIO | None]:
+        """Open `log_file` for appending, if it is set."""
+        if self.log_file is None:
+            return contextlib.nullcontext()
+        return _open_log(self.log_file, "at")
+
+    def _makemkvcon(self, command: str) -> str:
+        """Find makemkvcon and make sure that it supports `command`."""
+        # the probe module imports this module
+        from .probe import check_makemkvcon
+
+        return check_makemkvcon(self.binary, command)
 
     def _parse_input(self, input: int | str | PathLike[str]) -> str:
         """Autodetect suitable input type and reformat it for makemkvcon."""
         if isinstance(input, int):
             return f"disc:{input}"
+        if isinstance(input, str) and _input_exp.match(input):
+            return input
 
         input_path = Path(input)
 
@@ -236,14 +271,14 @@ class MakeMKV:
 
         if code:
             return_value = SPECIAL_VALUES.get(code, value)
-        elif key in ["information", "name", "volume_name"]:
+        elif key in ("information", "name", "volume_name"):
             return_value = value
-        elif key in ["metadata_langcode", "langcode"]:
+        elif key in ("metadata_langcode", "langcode"):
             # convert 3-letter language codes to 2-letter codes
-            return_value = Lang(value).pt1
+            return_value = _to_iso639_1(value)
         elif key == "framerate":
             # convert "##.### (#####/####)" to int string
-            if m := re.match(r"^(\d+(?:\.\d+)*)\s\(\d+/\d+\)$", value):
+            if m := _framerate_exp.match(value):
                 return_value = float(m[1])
             else:
                 return_value = int(value)
@@ -256,257 +291,957 @@ class MakeMKV:
 
         return key, return_value
 
-    def _parse_makemkv_log(self, lines: Iterable[str]) -> MakeMKVOutput:
+    def _parse_makemkv_log(
+        self, lines: Iterable[str], filter: OutputFilter | None = None
+    ) -> MakeMKVOutput:
+        if filter is not None:
+            return self._collect(self._parse_events(lines), filter)
         output = MakeMKVOutput(drives=[], titles=[])
-        progress_title = ""
+        for event in self._parse_events(lines):
+            _apply_event(output, event)
+        return output
 
+    def _collect(
+        self, events: Iterable[MakeMKVEvent], filter: OutputFilter | None = None
+    ) -> MakeMKVOutput:
+        """Collect the information of `events` that passes `filter`."""
+        collector = _Collector(self, filter)
+        try:
+            for event in events:
+                collector.feed(event)
+        except MakeMKVStallError as exc:
+            exc.output = collector.output
+            raise
+        finally:
+            collector.close()
+        return collector.output
+
+    def _filter_output(
+        self, output: MakeMKVOutput, filter: OutputFilter | None
+    ) -> MakeMKVOutput:
+        """Apply `filter` to output that was collected without it."""
+        if filter is None:
+            return output
+        filtered = self._collect(_output_events(output), filter)
+        filtered["drives"] = list(output["drives"])
+        return filtered
+
+    def _parse_events(self, lines: Iterable[str]) -> Iterator[MakeMKVEvent]:
+        return self._parse_lines(self._parse_line, lines)
+
+    def _parse_raw_events(self, lines: Iterable[bytes]) -> Iterator[MakeMKVEvent]:
+        return self._parse_lines(self._parse_raw_line, lines)
+
+    def _parse_lines(
+        self, parse_line: Callable[[Any], MakeMKVEvent | None], lines: Iterable[Any]
+    ) -> Iterator[MakeMKVEvent]:
+        self._reset_progress()
+        telemetry = self.telemetry
         for line in lines:
-            # flag, msg = line.strip().split(':', 1)
-            # msg_values = _split_values_exp.findall(msg)
-            # msg_values = [v.strip('"').strip() for v in msg_values]
-            if not line:
-                continue
-            flag: str
-            msg_values: list[str]
-            flag, *msg_values = _split_msg_exp.findall(line.strip())
-
-            if flag in "MSG":
-                # MSG:code,flags,count,message,format,param0,param1,...
-                #   code - unique message code, should be used to identify
-                #          particular string in language-neutral way.
-                #   flags - message flags, see AP_UIMSG_xxx flags in apdefs.h
-                #   count - number of parameters
-                #   message - raw message string suitable for output
-                #   format - format string used for message. This string is
-                #            localized and subject to change, unlike message
-                #            code.
-                #   paramX - parameter for message
-
+            if (event := parse_line(line)) is not None:
+                if telemetry is not None:
+                    telemetry.update(event)
+                yield event
+        self._flush_progress()
+
+    def _parse_line(self, line: str) -> MakeMKVEvent | None:
+        line = line.strip()
+        if not line:
+            return None
+        flag, _, data = line.partition(":")
+        try:
+            handler = self._line_handlers[flag]
+        except KeyError:
+            logger.error(f"Error while parsing '{line}'")
+            return None
+        return handler(self, _split_fields(data), line)
+
+    def _parse_raw_line(self, line: bytes) -> MakeMKVEvent | None:
+        """Parse a line of makemkvcon's output before it is decoded.
+
+        Progress values make up most of the output while saving, so they are
+        parsed from bytes. Other lines are decoded, invalid bytes in disc or
+        title names are replaced.
+        """
+        if line.startswith(b"PRGV:"):
+            values = line[5:].split(b",")
+            if len(values) == 3:
                 try:
-                    code = int(msg_values[0])
-                    message = msg_values[3]
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
+                    current, total, max = map(int, values)
+                except ValueError:
+                    pass
+                else:
+                    self._report_progress(current, max)
+                    return ProgressValueEvent(current, total, max)
+        return self._parse_line(line.decode("utf-8", "replace"))
+
+    @abc.abstractmethod
+    def _handle_progress(self, task_description: str, progress: int, max: int) -> None:
+        """Pass a progress update to `progress_handler`."""
+
+    def _reset_progress(self) -> None:
+        self._critical_error: str | None = None
+        self._progress_title = ""
+        # time and value of the last update passed to the progress handler
+        self._last_progress: tuple[float, int] | None = None
+        # the last update that was held back by `_report_progress`
+        self._coalesced_progress: tuple[str, int, int] | None = None
+
+    def _report_progress(self, progress: int, max: int) -> None:
+        """Pass a progress update to the progress handler.
+
+        Updates that follow the previous one within `progress_interval`
+        seconds or change the progress by less than `progress_delta` are
+        held back, but the first and the last update of each task are
+        always passed on.
+        """
+        if self.progress_interval or self.progress_delta:
+            now = time.monotonic()
+            if (
+                (last := self._last_progress) is not None
+                and progress != max
+                and (
+                    now - last[0] < self.progress_interval
+                    or abs(progress - last[1]) < self.progress_delta
+                )
+            ):
+                self._coalesced_progress = (self._progress_title, progress, max)
+                return
+            self._last_progress = (now, progress)
+            self._coalesced_progress = None
+        self._handle_progress(self._progress_title, progress, max)
+
+    def _flush_progress(self) -> None:
+        """Pass the last update that was held back to the progress handler."""
+        if (update := self._coalesced_progress) is not None:
+            self._coalesced_progress = None
+            self._handle_progress(*update)
+
+    def _parse_msg(self, values: list[str], line: str) -> MessageEvent | None:
+        # MSG:code,flags,count,message,format,param0,param1,...
+        #   code - unique message code, should be used to identify
+        #          particular string in language-neutral way.
+        #   flags - message flags, see AP_UIMSG_xxx flags in apdefs.h
+        #   count - number of parameters
+        #   message - raw message string suitable for output
+        #   format - format string used for message. This string is
+        #            localized and subject to change, unlike message
+        #            code.
+        #   paramX - parameter for message
+
+        try:
+            code = int(values[0])
+            flags = int(values[1])
+            message = values[3]
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        loglevel = MESSAGE_CODES.get(code, 10)
+        makemkvcon_logger.log(loglevel, "%s (%s)", message, code)
+
+        if loglevel == logging.CRITICAL and self.process is not None:
+            # raised by `_run_events` after the event was counted
+            self._critical_error = message
+
+        return MessageEvent(code, flags, message)
+
+    def _parse_prgt(self, values: list[str], line: str) -> ProgressTitleEvent | None:
+        # PRGT:code,id,name
+        # code - unique message code
+        # id - operation sub-id
+        # name - name string
+
+        try:
+            code = int(values[0])
+            id = int(values[1])
+            message = values[2]
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        loglevel = MESSAGE_CODES.get(code, 10)
+        makemkvcon_logger.log(loglevel, "%s (%s)", message, code)
+
+        return ProgressTitleEvent(code, id, message, total=True)
+
+    def _parse_prgc(self, values: list[str], line: str) -> ProgressTitleEvent | None:
+        # PRGC:code,id,name
+        #   code - unique message code
+        #   id - operation sub-id
+        #   name - name string
+
+        try:
+            code = int(values[0])
+            id = int(values[1])
+            name = values[2]
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        # a new task begins, so the previous one is finished
+        self._flush_progress()
+        self._progress_title = name
+        self._last_progress = None
+
+        return ProgressTitleEvent(code, id, name, total=False)
+
+    def _parse_prgv(self, values: list[str], line: str) -> ProgressValueEvent | None:
+        # PRGV:current,total,max
+        #   current - current progress value
+        #   total - total progress value
+        #   max - maximum possible value for a progress bar, constant
+
+        try:
+            current = int(values[0])
+            total = int(values[1])
+            max = int(values[2])
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        self._report_progress(current, max)
+
+        return ProgressValueEvent(current, total, max)
+
+    def _parse_drv(self, values: list[str], line: str) -> DriveEvent | None:
+        # DRV:index,visible,enabled,flags,drive name,disc name,
+        # device path (wrong documented)
+        #   index - drive index
+        #   visible - drive state, see AP_DriveStateXXX in apdefs.h
+        #   enabled - set to 1 if drive is accessible
+        #   flags - media flags, see AP_DskFsFlagXXX in apdefs.h
+        #   drive name - drive name string
+        #   disc name - disc name string
+        #   device path - device path string (not documented)
+
+        try:
+            index, visible, _, flags, drive_name, disc_name, device_path = values
+            drive_nr = int(index)
+            state = DriveState(int(visible))
+            fs_flags = DiscFsFlags(int(flags))
+        except ValueError:
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        drive = Drive()
+        if drive_name:
+            drive["drive_name"] = drive_name
+        if disc_name:
+            drive["disc_name"] = disc_name
+        if device_path:
+            drive["device_path"] = device_path
+        return DriveEvent(drive_nr, drive, state, fs_flags)
+
+    def _parse_tcount(self, values: list[str], line: str) -> TitleCountEvent | None:
+        # TCOUNT:count
+        #   count - titles count
+        try:
+            count = int(values[0])
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        return TitleCountEvent(count)
+
+    def _parse_cinfo(self, values: list[str], line: str) -> DiscAttributeEvent | None:
+        # CINFO:id,code,value
+        #   id - attribute id, see AP_ItemAttributeId in apdefs.h
+        #   code - message code if attribute value is a constant string
+        #   value - attribute value
+        try:
+            id = int(values[0])
+            code = int(values[1])
+            value = values[2]
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        try:
+            key, d_value = self._translate_codes("CINFO", id, value, code)
+        except KeyError:
+            return None
+        if not self._is_valid_item(Disc, key, d_value):
+            logger.error(f"Error while parsing '{line}'")
+            return None
+
+        return DiscAttributeEvent(key, d_value)
+
+    def _parse_tinfo(self, values: list[str], line: str) -> TitleAttributeEvent | None:
+        # TINFO:disc_nr,title_nr,id,code,value (wrong documented)
+        #   title_nr - title number
+        #   id - attribute id, see AP_ItemAttributeId in apdefs.h
+        #   code - message code if attribute value is a constant string
+        #   value - attribute value
+
+        try:
+            title_nr = int(values[0])
+            id = int(values[1])
+            code = int(values[2])
+            value = values[3]
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        if self._title_ids is not None and id not in self._title_ids:
+            return None
+        try:
+            key, d_value = self._translate_codes("TINFO", id, value, code)
+        except KeyError:
+            return None
+
+        if not self._is_valid_item(Title, key, d_value):
+            logger.error(f"Error while parsing '{line}'")
+            return None
+
+        return TitleAttributeEvent(title_nr, key, d_value)
+
+    def _parse_sinfo(self, values: list[str], line: str) -> StreamAttributeEvent | None:
+        # SINFO:disc_nr,title_nr,stream_nr,id,code,value
+        # (wrong documented)
+        #   title_nr - title number
+        #   stream_nr - stream number
+        #   id - attribute id, see AP_ItemAttributeId in apdefs.h
+        #   code - message code if attribute value is a constant string
+        #   value - attribute value
+
+        try:
+            title_nr = int(values[0])
+            stream_nr = int(values[1])
+            id = int(values[2])
+            code = int(values[3])
+            value = values[4]
+        except (ValueError, IndexError):
+            logger.exception(f"Error while parsing '{line}'")
+            return None
+
+        if self._stream_ids is not None and id not in self._stream_ids:
+            return None
+        try:
+            key, d_value = self._translate_codes("SINFO", id, value, code)
+        except KeyError:
+            return None
+
+        if not self._is_valid_item(Stream, key, d_value):
+            logger.error(f"Error while parsing '{line}'")
+            return None
+
+        return StreamAttributeEvent(title_nr, stream_nr, key, d_value)
+
+    def _is_valid_item(self, td: type, key: str, value: Any) -> bool:
+        """Check if `key` and `value` form a valid item for the TypedDict `td`.
+
+        Values aren't checked if `trusted` is set.
+        """
+        try:
+            is_valid_value = _item_validators(td)[key]
+        except KeyError:
+            return False
+        return self.trusted or is_valid_value(value)
+
+    # maps the prefix of each line of robot output to its handler
+    _line_handlers: ClassVar[dict[str, _LineHandlerType]] = {
+        "MSG": _parse_msg,
+        "PRGT": _parse_prgt,
+        "PRGC": _parse_prgc,
+        "PRGV": _parse_prgv,
+        "DRV": _parse_drv,
+        "TCOUNT": _parse_tcount,
+        "CINFO": _parse_cinfo,
+        "TINFO": _parse_tinfo,
+        "SINFO": _parse_sinfo,
+    }
+
+
+class MakeMKV(_MakeMKVBase):
+    """Wraps makemkvcon and exposes makemkvcon's commands as methods."""
+
+    process: Popen[bytes] | None
+
+    def __init__(
+        self,
+        input: int | str | PathLike[str],
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        progress_handler: ProgressUpdateHandlerType = _do_nothing,
+        trusted: bool = False,
+        info_cache: DiscInfoCache | None = None,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        telemetry: ProgressTelemetry | None = None,
+        metrics: Metrics | None = None,
+        log_file: str | PathLike[str] | None = None,
+        watchdog: Watchdog | None = None,
+        autotuner: CacheAutotuner | None = None,
+    ) -> None:
+        """Initialize MakeMKV with input.
 
-                loglevel = MESSAGE_CODES.get(code, 10)
-                makemkvcon_logger.log(loglevel, "%s (%s)", message, code)
+        Args:
+            input: Can be either a disc number starting with 0, a device,
+                a .IFO file, a VIDEO_TS folder or an input in makemkvcon's
+                format like "disc:0" or "dev:/dev/sr0".
+            cache: Size of read cache in megabytes, or "auto" to choose it
+                from the disc type, the available memory and the throughput
+                of past rips, see :class:`makemkv.autotune.CacheAutotuner`.
+            minlength: Minimum title length in seconds.
+            progress_handler: A callback function to parse progress updates.
+                See :func:`makemkv.ProgressParser.parse_progress`
+                for an example.
+            trusted: Don't validate the types of parsed values. This speeds up
+                scanning lots of discs, but values that don't match the types
+                in `makemkv.types` aren't filtered out.
+            info_cache: Return information about known discs from this cache
+                instead of running `makemkvcon info`.
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+            progress_interval: Minimum number of seconds between two
+                progress updates passed to `progress_handler`.
+            progress_delta: Minimum change of the progress value between two
+                progress updates passed to `progress_handler`. The first and
+                the last update of each task are passed on regardless.
+            telemetry: Is updated with the parsed events to calculate
+                throughput and remaining time.
+            metrics: Collects metrics about the `makemkvcon` processes.
+            log_file: Append the raw output of `makemkvcon` to this file,
+                compressed with gzip if its name ends with ".gz". See
+                :func:`from_log` for parsing it later.
+            watchdog: Terminate `makemkvcon` if it stops making progress,
+                see :class:`makemkv.watchdog.Watchdog`.
+            autotuner: Chooses the read cache size for ``cache="auto"``.
+                Defaults to a `CacheAutotuner` with its default history.
+        """
+        super().__init__(
+            input,
+            cache,
+            minlength,
+            trusted,
+            info_cache,
+            binary,
+            progress_interval,
+            progress_delta,
+            telemetry,
+            metrics,
+            log_file,
+            watchdog,
+            autotuner,
+        )
+        self.progress_handler = progress_handler
 
-                if loglevel == logging.CRITICAL and self.process is not None:
-                    self.process.kill()
-                    raise MakeMKVError(message)
+    @classmethod
+    def from_log(
+        cls,
+        log_file: str | PathLike[str],
+        trusted: bool = False,
+        filter: OutputFilter | None = None,
+    ) -> MakeMKVOutput:
+        """Parse the output of `makemkvcon` that was saved to a file.
 
-            elif flag == "PRGT":
-                # PRGT:code,id,name
-                # code - unique message code
-                # id - operation sub-id
-                # name - name string
+        The file is read line by line, so large logs don't have to fit into
+        memory.
 
-                try:
-                    code = int(msg_values[0])
-                    message = msg_values[2]
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
+        Args:
+            log_file: A file written by passing `log_file` to `MakeMKV` or
+                `AsyncMakeMKV`, or the output of ``makemkvcon --robot``.
+                It is decompressed if its name ends with ".gz".
+            trusted: Don't validate the types of parsed values.
+            filter: Only return the titles, streams and keys that pass this
+                filter.
 
-                loglevel = MESSAGE_CODES.get(code, 10)
-                makemkvcon_logger.log(loglevel, "%s (%s)", message, code)
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
+        """
+        with _open_log(log_file, "rt") as lines:
+            return cls("disc:0", trusted=trusted)._parse_makemkv_log(lines, filter)
 
-            elif flag == "PRGC":
-                # PRGC:code,id,name
-                #   code - unique message code
-                #   id - operation sub-id
-                #   name - name string
+    def info(
+        self,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        filter: OutputFilter | None = None,
+    ) -> MakeMKVOutput:
+        """Display information about a disc.
 
-                try:
-                    progress_title = msg_values[2]
-                except IndexError:
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
+        Args:
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            filter: Only return the titles, streams and keys that pass this
+                filter. Without `info_cache`, the rest isn't even collected.
 
-            elif flag == "PRGV":
-                # PRGV:current,total,max
-                #   current - current progress value
-                #   total - total progress value
-                #   max - maximum possible value for a progress bar, constant
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
 
-                try:
-                    current = int(msg_values[0])
-                    max = int(msg_values[2])
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
-
-                self.progress_handler(progress_title, current, max)
-
-            elif flag == "DRV":
-                # DRV:index,visible,enabled,flags,drive name,disc name,
-                # device path (wrong documented)
-                #   index - drive index
-                #   visible - set to 1 if drive is present
-                #   enabled - set to 1 if drive is accessible
-                #   flags - media flags, see AP_DskFsFlagXXX in apdefs.h
-                #   drive name - drive name string
-                #   disc name - disc name string
-                #   device path - device path string (not documented)
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        minlength = self.minlength if minlength is None else minlength
+        if self.info_cache is None:
+            return self._run(
+                self._command("info", cache=cache, minlength=minlength), filter
+            )
 
-                try:
-                    _, _, _, _, drive_name, disc_name, device_path = msg_values
-                except ValueError:
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
-
-                if drive_name or disc_name or device_path:
-                    drive = Drive()
-                    if drive_name:
-                        drive["drive_name"] = drive_name
-                    if disc_name:
-                        drive["disc_name"] = disc_name
-                    if device_path:
-                        drive["device_path"] = device_path
-                    output["drives"].append(drive)
-
-            elif flag == "TCOUNT":
-                # TCOUNT:count
-                #   count - titles count
-                try:
-                    count = int(msg_values[0])
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
-
-                output["title_count"] = count
-
-            elif flag == "CINFO":
-                # CINFO:id,code,value
-                #   id - attribute id, see AP_ItemAttributeId in apdefs.h
-                #   code - message code if attribute value is a constant string
-                #   value - attribute value
-                try:
-                    id = int(msg_values[0])
-                    code = int(msg_values[1])
-                    value = msg_values[2]
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
+        info_cache = self.info_cache
+        input = self._info_cache_input()
+        if (output := info_cache.get(input, minlength, self.trusted)) is None:
+            output = self._run(self._command("info", cache=cache, minlength=minlength))
+            info_cache.put(input, output, minlength, self.trusted)
+        return self._filter_output(output, filter)
 
-                if "disc" not in output:
-                    output["disc"] = Disc()
-                    assert "disc" in output
+    def mkv(
+        self,
+        title: int | str,
+        output_dir: str | Path,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+    ) -> MakeMKVOutput:
+        """Copy titles from disc.
 
-                try:
-                    key, d_value = self._translate_codes(flag, id, value, code)
-                except KeyError:
-                    continue
-                if not _is_valid_typeddict_item(Disc, key, d_value):
-                    logger.error(f"Error while parsing '{line.strip()}'")
-                    continue
-
-                output["disc"][key] = d_value  # type: ignore[literal-required] # noqa: B950
-
-            elif flag == "TINFO":
-                # TINFO:disc_nr,title_nr,id,code,value (wrong documented)
-                #   title_nr - title number
-                #   id - attribute id, see AP_ItemAttributeId in apdefs.h
-                #   code - message code if attribute value is a constant string
-                #   value - attribute value
+        Args:
+            title: Title to be ripped, can be either an integer starting
+                with 0 or the keyword "all".
+            output_dir: Output directory for created mkv files.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
 
-                try:
-                    title_nr = int(msg_values[0])
-                    id = int(msg_values[1])
-                    code = int(msg_values[2])
-                    value = msg_values[3]
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
 
-                while title_nr >= len(output["titles"]):
-                    output["titles"].append(Title(streams=[]))
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        return self._run(
+            self._command("mkv", title, output_dir, cache=cache, minlength=minlength)
+        )
 
-                try:
-                    key, d_value = self._translate_codes(flag, id, value, code)
-                except KeyError:
-                    continue
+    def backup(
+        self,
+        output_dir: str | Path,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        decrypt: bool = False,
+    ) -> MakeMKVOutput:
+        """Backup whole disc.
 
-                if not _is_valid_typeddict_item(Title, key, d_value):
-                    logger.error(f"Error while parsing '{line.strip()}'")
-                    continue
+        Args:
+            output_dir: Output directory for created backup files.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            decrypt: Decrypt stream files during backup.
 
-                output["titles"][title_nr][key] = d_value  # type: ignore[literal-required] # noqa: B950
+        Returns:
+            MakeMKVOutput: A dict containing some information about drives,
+                discs, titles and streams.
 
-            elif flag == "SINFO":
-                # SINFO:disc_nr,title_nr,stream_nr,id,code,value
-                # (wrong documented)
-                #   title_nr - title number
-                #   stream_nr - stream number
-                #   id - attribute id, see AP_ItemAttributeId in apdefs.h
-                #   code - message code if attribute value is a constant string
-                #   value - attribute value
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        return self._run(
+            self._command(
+                "backup",
+                output_dir,
+                cache=cache,
+                minlength=minlength,
+                decrypt=decrypt,
+            )
+        )
 
-                try:
-                    title_nr = int(msg_values[0])
-                    stream_nr = int(msg_values[1])
-                    id = int(msg_values[2])
-                    code = int(msg_values[3])
-                    value = msg_values[4]
-                except (ValueError, IndexError):
-                    logger.exception(f"Error while parsing '{line.strip()}'")
-                    continue
-
-                while stream_nr >= len(output["titles"][title_nr]["streams"]):
-                    output["titles"][title_nr]["streams"].append(Stream())
+    def iter_events(
+        self,
+        command: Literal["info", "mkv", "backup"],
+        *args: int | str | Path,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        decrypt: bool = False,
+    ) -> Generator[MakeMKVEvent, None, None]:
+        """Run a makemkvcon command and yield events while its output is parsed.
 
-                try:
-                    key, d_value = self._translate_codes(flag, id, value, code)
-                except KeyError:
-                    continue
+        Unlike :func:`info`, :func:`mkv` and :func:`backup`, this doesn't
+        collect the information in a dict, so you can react to it in real
+        time and memory usage doesn't grow with the size of the disc.
+        Stopping the iteration early terminates `makemkvcon`.
 
-                if not _is_valid_typeddict_item(Stream, key, d_value):
-                    logger.error(f"Error while parsing '{line.strip()}'")
-                    continue
+        Args:
+            command: Either "info", "mkv" or "backup".
+            *args: Arguments of the command, eg. title and output directory
+                for "mkv" or output directory for "backup".
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            decrypt: Decrypt stream files during backup.
 
-                output["titles"][title_nr]["streams"][stream_nr][key] = d_value  # type: ignore[literal-required] # noqa: B950
-            else:
-                logger.error(f"Error while parsing '{line.strip()}'")
+        Yields:
+            MakeMKVEvent: A message, progress update or attribute parsed from
+                a line of makemkvcon's output.
 
-        return output
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem.
+            MakeMKVStallError: The watchdog terminated `makemkvcon`.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        return self._run_events(
+            self._command(
+                command, *args, cache=cache, minlength=minlength, decrypt=decrypt
+            )
+        )
+
+    def _handle_progress(self, task_description: str, progress: int, max: int) -> None:
+        self.progress_handler(task_description, progress, max)
 
-    def _run(self, cmd: list[str]) -> MakeMKVOutput:
+    def _run(self, cmd: list[str], filter: OutputFilter | None = None) -> MakeMKVOutput:
         """Run makemkvcon and parse its output."""
-        p = self.process = Popen(cmd, stderr=STDOUT, stdout=PIPE, bufsize=1, text=True)
+        return self._collect(self._run_events(cmd), filter)
+
+    def _run_events(self, cmd: list[str]) -> Generator[MakeMKVEvent, None, None]:
+        """Run makemkvcon and yield the events parsed from its output."""
+        dispatcher = _EventDispatcher(self, cmd[1])
+        try:
+            # unbuffered, so that each read returns what is available at once
+            p = self.process = Popen(cmd, stderr=STDOUT, stdout=PIPE, bufsize=0)
+        except BaseException:
+            dispatcher.finish(None)
+            raise
         logger.info('Running "%s"', " ".join(cmd))
         assert p.stdout is not None
 
-        output = self._parse_makemkv_log(p.stdout)
-        if (return_code := p.wait()) != 0:
+        watchdog = None if self.watchdog is None else _ProcessWatchdog(self.watchdog, p)
+        dispatcher.start(watchdog)
+        try:
+            with self._open_log_file() as log_file:
+                lines = _read_lines(p.stdout)
+                if log_file is not None:
+                    lines = _tee(lines, log_file)
+                for line in lines:
+                    if (event := self._parse_raw_line(line)) is not None:
+                        dispatcher.update(event)
+                        yield event
+            self._flush_progress()
+        except BaseException:
+            self.kill()
+            p.wait()
+            raise
+        finally:
+            if watchdog is not None:
+                watchdog.stop()
+            dispatcher.finish(p.wait())
+        dispatcher.check(p.wait())
+
+
+def list_drives(binary: str | PathLike[str] | None = None) -> list[DriveStatus]:
+    """List the optical drives that are known to makemkvcon.
+
+    This doesn't scan any titles. `makemkvcon` is terminated as soon as it
+    has reported all drives, so this usually takes well under a second.
+
+    Args:
+        binary: Path of the `makemkvcon` binary. It is searched in
+            `MAKEMKVCON_BINARIES` by default.
+
+    Returns:
+        list[DriveStatus]: The state of each drive and the files found
+            on its disc.
+
+    Raises:
+        MakeMKVError: MakeMKV encountered a critical problem before listing
+            the drives.
+        FileNotFoundError: Couldn't find `makemkvcon`.
+    """
+    # makemkvcon reports all drives before failing to open a non-existent disc
+    makemkv = MakeMKV("disc:9999", binary=binary)
+    cmd = [makemkv._makemkvcon("info"), "info", "disc:9999", "--robot"]
+
+    drives: list[DriveStatus] = []
+    listed = False
+    events = makemkv._run_events(cmd)
+    try:
+        for event in events:
+            if isinstance(event, DriveEvent):
+                listed = True
+                if event.state != DriveState.NO_DRIVE:
+                    drives.append(
+                        DriveStatus(
+                            drive_nr=event.drive_nr,
+                            state=event.state,
+                            flags=event.flags,
+                            **event.drive,
+                        )
+                    )
+            elif listed:
+                break
+    except MakeMKVError:
+        if not listed:
+            raise
+    finally:
+        events.close()
+    return drives
+
+
+def _open_log(log_file: str | PathLike[str], mode: Literal["at", "rt"]) -> TextIO:
+    """Open a log of makemkvcon's output, compressed if it ends with .gz."""
+    if str(log_file).endswith(".gz"):
+        return gzip.open(log_file, mode, encoding="utf-8", errors="replace")
+    return open(log_file, mode, encoding="utf-8", errors="replace")
+
+
+def _tee(lines: Iterable[bytes], log_file: TextIO) -> Iterator[bytes]:
+    for line in lines:
+        log_file.write(line.decode("utf-8", "replace") + "\n")
+        yield line
+
+
+class _OutputTypes(NamedTuple):
+    """Creates the disc, titles and streams that `_apply_event` fills."""
+
+    disc: Callable[[], Any]
+    title: Callable[[], Any]
+    stream: Callable[[], Any]
+
+
+_DICT_TYPES = _OutputTypes(Disc, lambda: Title(streams=[]), Stream)
+
+
+def _apply_event(
+    output: Any, event: MakeMKVEvent, types: _OutputTypes = _DICT_TYPES
+) -> None:
+    """Add the information of `event` to `output`.
+
+    `output` is a `MakeMKVOutput` or an object whose items are accessed in
+    the same way, eg. `CompactOutput`, whose disc, titles and streams are
+    created by `types`.
+    """
+    if (handler := _event_handlers.get(type(event))) is not None:
+        handler(output, event, types)
+
+
+def _apply_drive(output: Any, event: DriveEvent, types: _OutputTypes) -> None:
+    if event.drive:
+        output["drives"].append(event.drive)
+
+
+def _apply_title_count(
+    output: Any, event: TitleCountEvent, types: _OutputTypes
+) -> None:
+    output["title_count"] = event.title_count
+
+
+def _apply_disc_attribute(
+    output: Any, event: DiscAttributeEvent, types: _OutputTypes
+) -> None:
+    if "disc" not in output:
+        output["disc"] = types.disc()
+    output["disc"][event.key] = event.value
+
+
+def _apply_title_attribute(
+    output: Any, event: TitleAttributeEvent, types: _OutputTypes
+) -> None:
+    _item(output["titles"], event.title_nr, types.title)[event.key] = event.value
+
+
+def _apply_stream_attribute(
+    output: Any, event: StreamAttributeEvent, types: _OutputTypes
+) -> None:
+    title = _item(output["titles"], event.title_nr, types.title)
+    _item(title["streams"], event.stream_nr, types.stream)[event.key] = event.value
+
+
+def _item(items: list[Any], index: int, new: Callable[[], Any]) -> Any:
+    """Return `items[index]`, appending new items until it exists."""
+    while index >= len(items):
+        items.append(new())
+    return items[index]
+
+
+# maps each type of event to the function that adds it to the output
+_event_handlers: dict[type, Callable[..., None]] = {
+    DriveEvent: _apply_drive,
+    TitleCountEvent: _apply_title_count,
+    DiscAttributeEvent: _apply_disc_attribute,
+    TitleAttributeEvent: _apply_title_attribute,
+    StreamAttributeEvent: _apply_stream_attribute,
+}
+
+
+class _Collector:
+    """Collects the information of the events that pass a filter."""
+
+    def __init__(self, makemkv: _MakeMKVBase, filter: OutputFilter | None) -> None:
+        self.makemkv = makemkv
+        self.output = MakeMKVOutput(drives=[], titles=[])
+        self._filter = None if filter is None else _EventFilter(filter)
+        if filter is not None:
+            makemkv._title_ids = filter.title_ids()
+            makemkv._stream_ids = filter.stream_ids()
+
+    def feed(self, event: MakeMKVEvent) -> None:
+        if self._filter is None:
+            _apply_event(self.output, event)
+            return
+        for passed in self._filter.feed(event):
+            _apply_event(self.output, passed)
+
+    def close(self) -> None:
+        """Collect the events that the filter held back."""
+        if self._filter is None:
+            return
+        event_filter, self._filter = self._filter, None
+        self.makemkv._title_ids = self.makemkv._stream_ids = None
+        for passed in event_filter.close():
+            _apply_event(self.output, passed)
+
+
+class _EventDispatcher:
+    """Passes the events of a `makemkvcon` process on to their consumers.
+
+    The consumers are the telemetry, metrics, cache autotuner and watchdog of
+    a `MakeMKV` or `AsyncMakeMKV` instance.
+    """
+
+    def __init__(self, makemkv: _MakeMKVBase, command: str) -> None:
+        self.makemkv = makemkv
+        self.command = command
+        # taken before the process starts, so that it's released if it can't
+        self._tuning, makemkv._tuning = makemkv._tuning, None
+        self._job: JobMetrics | None = None
+        self._monitor: _Monitor | None = None
+
+    def start(self, monitor: _Monitor | None) -> None:
+        """Start passing on the events of the process that was started."""
+        makemkv = self.makemkv
+        makemkv._reset_progress()
+        if makemkv.metrics is not None:
+            self._job = makemkv.metrics.job(makemkv._input, self.command)
+        self._monitor = monitor
+
+    def update(self, event: MakeMKVEvent) -> None:
+        makemkv = self.makemkv
+        if makemkv.telemetry is not None:
+            makemkv.telemetry.update(event)
+        if self._job is not None:
+            self._job.update(event)
+        if self._tuning is not None:
+            self._tuning.update(event)
+        if self._monitor is not None:
+            self._monitor.update(event)
+        if makemkv._critical_error is not None:
+            raise MakeMKVError(makemkv._critical_error)
+
+    def finish(self, return_code: int | None) -> None:
+        """Record the end of the process, None if it couldn't be started."""
+        if self._job is not None:
+            self._job.finish(return_code)
+        if self._tuning is not None:
+            self._tuning.finish(return_code)
+
+    def check(self, return_code: int) -> None:
+        """Raise an error if the process stalled or failed."""
+        if self._monitor is not None and self._monitor.reason is not None:
+            raise MakeMKVStallError(f"makemkvcon stalled: {self._monitor.reason}")
+        if return_code != 0:
             raise MakeMKVError(
                 f"makemkvcon exited with non-zero return code {return_code}"
             )
-        return output
 
 
-def _is_valid_typeddict_item(
-    td: type[TypedDict], key: str, value: Any  # type: ignore [valid-type]
-) -> bool:
-    """Check if `key` and `value` form a valid item for the TypedDict `td`."""
-    annotations = get_type_hints(td)
-    if key not in annotations:
-        return False
-    if get_origin(annotations[key]) is Literal:
-        return value in get_args(annotations[key])
-    if get_origin(annotations[key]) is Union:
-        return any(isinstance(value, tp) for tp in get_args(annotations[key]))
-    if get_origin(annotations[key]) is list:
-        return isinstance(value, list) and all(
-            isinstance(item, get_args(annotations[key])[0]) for item in value
-        )
-    return isinstance(value, annotations[key])
+class _LineSplitter:
+    """Splits blocks of makemkvcon's output into lines.
+
+    The output is split at newline bytes before it is decoded. This is safe
+    because the newline byte never occurs within a multi-byte UTF-8
+    character, so each line can be decoded on its own.
+    """
+
+    def __init__(self) -> None:
+        self._pending = b""
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Return the lines that are completed by `data`."""
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        return lines
+
+    def close(self) -> list[bytes]:
+        """Return the last line if it doesn't end with a newline."""
+        pending, self._pending = self._pending, b""
+        return [pending] if pending else []
+
+
+def _read_lines(stream: IO[bytes]) -> Iterator[bytes]:
+    """Read `stream` in large blocks and yield its lines without newlines."""
+    splitter = _LineSplitter()
+    while data := stream.read(_READ_SIZE):
+        yield from splitter.feed(data)
+    yield from splitter.close()
+
+
+def _split_fields(data: str) -> list[str]:
+    """Split the comma-separated fields of a line of robot output.
+
+    Quoted fields may contain commas, their quotes are removed.
+    """
+    head, _, tail = data.partition('"')
+    if not tail:
+        return data.split(",")
+
+    # makemkvcon puts all quoted fields after the unquoted ones,
+    # so the quoted part can be split at once in the common case
+    if (not head or head[-1] == ",") and tail[-1] == '"':
+        quoted = tail[:-1].split('","')
+        if tail.count('"') == 2 * len(quoted) - 1:
+            fields = head.split(",") if head else [""]
+            fields[-1:] = quoted
+            return fields
+
+    fields = []
+    pos = 0
+    while True:
+        if data.startswith('"', pos):
+            end = data.find('",', pos + 1)
+            if end == -1:
+                fields.append(data[pos + 1 : -1 if data.endswith('"') else None])
+                return fields
+            fields.append(data[pos + 1 : end])
+            pos = end + 2
+        else:
+            end = data.find(",", pos)
+            if end == -1:
+                fields.append(data[pos:])
+                return fields
+            fields.append(data[pos:end])
+            pos = end + 1
+
+
+@functools.lru_cache(maxsize=None)
+def _to_iso639_1(code: str) -> str:
+    """Return the ISO 639-1 code of an ISO 639-2 code if it exists."""
+    if (pt1 := LANGUAGE_CODES.get(code)) is not None:
+        return pt1
+
+    from iso639 import Lang  # type: ignore [import]
+    from iso639.exceptions import InvalidLanguageValue  # type: ignore [import]
+
+    try:
+        return Lang(code).pt1 or code
+    except InvalidLanguageValue:
+        return code
 
 
 def _find_makemkvcon_binary() -> str:
-    for bin_path in MAKEMKVCON_BINARIES:
-        if shutil.which(bin_path) is not None:
-            return bin_path
+    return _which(tuple(MAKEMKVCON_BINARIES))
+
+
+@functools.lru_cache(maxsize=None)
+def _which(binaries: tuple[str, ...]) -> str:
+    for bin_path in binaries:
+        if (path := shutil.which(bin_path)) is not None:
+            return path
     else:
         raise FileNotFoundError(
             "Couldn't find makemkvcon. Make sure it is installed and in your PATH."
@@ -515,3 +1250,16 @@ def _find_makemkvcon_binary() -> str:
 
 class MakeMKVError(Exception):
     """Raised if MakeMKV encounters a critical problem."""
+
+
+class MakeMKVStallError(MakeMKVError):
+    """Raised if the watchdog terminated `makemkvcon` because it stalled.
+
+    Attributes:
+        output: The information parsed until `makemkvcon` was terminated.
+            None if the events were passed on by `iter_events()`.
+    """
+
+    def __init__(self, message: str, output: MakeMKVOutput | None = None) -> None:
+        super().__init__(message)
+        self.output = output
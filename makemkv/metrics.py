@@ -0,0 +1,207 @@
+"""Exposes metrics about makemkvcon processes to Prometheus.
+
+Only the standard library is used. The metrics are served in Prometheus' text
+format or, if the client asks for it, in the OpenMetrics format.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+from .makemkv import logger
+from .output_codes import MESSAGE_CODES
+from .telemetry import ProgressTelemetry
+from .types import MakeMKVEvent, MessageEvent, ProgressValueEvent
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# name: (type, help)
+_FAMILIES = {
+    "makemkv_jobs_active": ("gauge", "Number of running makemkvcon processes."),
+    "makemkv_jobs": ("counter", "Number of finished makemkvcon processes."),
+    "makemkv_job_duration_seconds": ("summary", "Run time of makemkvcon processes."),
+    "makemkv_ripped_bytes": ("counter", "Number of bytes saved by makemkvcon."),
+    "makemkv_throughput_bytes_per_second": (
+        "gauge",
+        "Smoothed throughput of makemkvcon for each input.",
+    ),
+    "makemkv_messages": (
+        "counter",
+        "Number of warnings and errors reported by makemkvcon.",
+    ),
+}
+
+_Labels = Tuple[Tuple[str, str], ...]
+# (suffix, labels) of each sample of a metric family
+_Samples = Dict[Tuple[str, _Labels], float]
+
+
+class Metrics:
+    """Collects metrics about makemkvcon processes.
+
+    Pass it to `MakeMKV`, `AsyncMakeMKV` or `Orchestrator` to collect the
+    metrics of their commands and call :func:`serve` to expose them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: dict[str, _Samples] = {name: {} for name in _FAMILIES}
+
+    def job(self, input: str, command: str) -> JobMetrics:
+        """Start collecting the metrics of a makemkvcon process."""
+        return JobMetrics(self, input, command)
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Return all metrics in Prometheus' text format or as OpenMetrics."""
+        lines = []
+        with self._lock:
+            for name, (type, help) in _FAMILIES.items():
+                # Prometheus' text format expects the name of the samples
+                family = (
+                    name + "_total" if type == "counter" and not openmetrics else name
+                )
+                lines.append(f"# HELP {family} {help}")
+                lines.append(f"# TYPE {family} {type}")
+                for (suffix, labels), value in sorted(self._samples[name].items()):
+                    if type == "counter":
+                        suffix = "_total"
+                    lines.append(f"{name}{suffix}{_format_labels(labels)} {value!r}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, address: str = "127.0.0.1") -> MetricsServer:
+        """Serve the metrics on http://address:port/metrics in a thread.
+
+        Args:
+            port: TCP port to listen on, 0 chooses a free port.
+            address: Address to listen on, only local clients can connect by
+                default.
+
+        Returns:
+            MetricsServer: The running server, call its `shutdown()` method
+                to stop it.
+        """
+        server = MetricsServer((address, port), self)
+        threading.Thread(
+            target=server.serve_forever, name="makemkv-metrics", daemon=True
+        ).start()
+        logger.info("Serving metrics on port %s", server.server_address[1])
+        return server
+
+    def _add(self, name: str, labels: _Labels, amount: float, suffix: str = "") -> None:
+        with self._lock:
+            samples = self._samples[name]
+            samples[suffix, labels] = samples.get((suffix, labels), 0) + amount
+
+    def _set(self, name: str, labels: _Labels, value: float) -> None:
+        with self._lock:
+            self._samples[name]["", labels] = value
+
+
+class JobMetrics:
+    """Metrics of a single makemkvcon process."""
+
+    def __init__(self, metrics: Metrics, input: str, command: str) -> None:
+        self.metrics = metrics
+        self.input = input
+        self.command = command
+        self._start = time.monotonic()
+        self._telemetry = ProgressTelemetry()
+        self._bytes_done = 0
+        metrics._add("makemkv_jobs_active", (("command", command),), 1)
+
+    def update(self, event: MakeMKVEvent) -> None:
+        """Update the metrics with an event of makemkvcon."""
+        self._telemetry.update(event)
+        if isinstance(event, ProgressValueEvent):
+            telemetry = self._telemetry
+            if telemetry.bytes_done < self._bytes_done:
+                # a new task began
+                self._bytes_done = 0
+            if telemetry.bytes_done > self._bytes_done:
+                self.metrics._add(
+                    "makemkv_ripped_bytes",
+                    (("input", self.input),),
+                    telemetry.bytes_done - self._bytes_done,
+                )
+                self._bytes_done = telemetry.bytes_done
+            self.metrics._set(
+                "makemkv_throughput_bytes_per_second",
+                (("input", self.input),),
+                telemetry.smoothed_throughput,
+            )
+        elif isinstance(event, MessageEvent):
+            level = MESSAGE_CODES.get(event.code, logging.DEBUG)
+            if level >= logging.WARNING:
+                self.metrics._add(
+                    "makemkv_messages",
+                    (("level", logging.getLevelName(level).lower()),),
+                    1,
+                )
+
+    def finish(self, return_code: int | None) -> None:
+        """Record the exit code and the run time of the process."""
+        command = (("command", self.command),)
+        metrics = self.metrics
+        metrics._add("makemkv_jobs_active", command, -1)
+        metrics._add("makemkv_jobs", (*command, ("exit_code", str(return_code))), 1)
+        metrics._add(
+            "makemkv_job_duration_seconds",
+            command,
+            time.monotonic() - self._start,
+            suffix="_sum",
+        )
+        metrics._add("makemkv_job_duration_seconds", command, 1, suffix="_count")
+        metrics._set("makemkv_throughput_bytes_per_second", (("input", self.input),), 0)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Serves `Metrics` over HTTP."""
+
+    def __init__(self, server_address: tuple[str, int], metrics: Metrics) -> None:
+        super().__init__(server_address, _MetricsHandler)
+        self.metrics = metrics
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: MetricsServer
+
+    def do_GET(self) -> None:
+        if self.path.partition("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.server.metrics.render(openmetrics).encode()
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(format, *args)
+
+
+def _format_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(
+            '{}="{}"'.format(
+                key,
+                value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"),
+            )
+            for key, value in labels
+        )
+        + "}"
+    )
@@ -0,0 +1,243 @@
+"""Provides the `Orchestrator` class to run makemkvcon on several drives at once."""
+
+from __future__ import annotations
+
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import PathLike
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Protocol,
+)
+
+from .makemkv import MakeMKV, _do_nothing, logger
+from .types import MakeMKVOutput
+
+if TYPE_CHECKING:
+    from .autotune import CacheAutotuner
+    from .cache import DiscInfoCache
+    from .filters import OutputFilter
+    from .metrics import Metrics
+    from .watchdog import Watchdog
+
+
+class MultiProgressUpdateHandlerType(Protocol):
+    """A callback function to parse progress updates of several drives.
+
+    Like `makemkv.ProgressUpdateHandlerType`, but it also receives the
+    input of the drive in makemkvcon's format, eg. "disc:0".
+    """
+
+    def __call__(  # noqa: D102
+        self, input: str, task_description: str, progress: int, max: int
+    ) -> None: ...  # pragma: no cover
+
+
+class DriveResult(NamedTuple):
+    """The result of running a command on one drive."""
+
+    input: str  # input in makemkvcon's format, eg. "disc:0"
+    output: Optional[MakeMKVOutput]  # None if the command failed
+    error: Optional[Exception]  # None if the command succeeded
+
+
+class Orchestrator:
+    """Runs makemkvcon's commands on several drives concurrently.
+
+    Each drive is handled by its own `makemkv.MakeMKV` instance in a pool of
+    worker threads. Errors are isolated, so a drive that fails doesn't stop
+    the others.
+    """
+
+    def __init__(
+        self,
+        inputs: Iterable[int | str | PathLike[str]],
+        max_workers: int | None = None,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        progress_handler: MultiProgressUpdateHandlerType = _do_nothing,
+        trusted: bool = False,
+        info_cache: DiscInfoCache | None = None,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        metrics: Metrics | None = None,
+        watchdog: Watchdog | None = None,
+        autotuner: CacheAutotuner | None = None,
+    ) -> None:
+        """Initialize Orchestrator with inputs.
+
+        Args:
+            inputs: The inputs to process, see :func:`makemkv.MakeMKV.__init__`.
+            max_workers: Maximum number of makemkvcon processes running at
+                the same time. Defaults to the number of inputs.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            progress_handler: A callback function to parse progress updates.
+                Its first argument is the input in makemkvcon's format.
+            trusted: Don't validate the types of parsed values.
+            info_cache: Return information about known discs from this cache
+                instead of running `makemkvcon info`.
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+            progress_interval: Minimum number of seconds between two
+                progress updates passed to `progress_handler`.
+            progress_delta: Minimum change of the progress value between two
+                progress updates passed to `progress_handler`. The first and
+                the last update of each task are passed on regardless.
+            metrics: Collects metrics about the `makemkvcon` processes.
+            watchdog: Terminate `makemkvcon` if it stops making progress, so
+                that a stalled drive doesn't block the others.
+            autotuner: Chooses the read cache size for ``cache="auto"``, it
+                is shared by all drives.
+        """
+        self.drives: dict[str, MakeMKV] = {}
+        for input in inputs:
+            makemkv = MakeMKV(
+                input,
+                cache=cache,
+                minlength=minlength,
+                trusted=trusted,
+                info_cache=info_cache,
+                binary=binary,
+                progress_interval=progress_interval,
+                progress_delta=progress_delta,
+                metrics=metrics,
+                watchdog=watchdog,
+                autotuner=autotuner,
+            )
+            makemkv.progress_handler = functools.partial(
+                progress_handler, makemkv._input
+            )
+            self.drives[makemkv._input] = makemkv
+        self.max_workers = max_workers or max(len(self.drives), 1)
+
+    def info(
+        self,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        filter: OutputFilter | None = None,
+    ) -> dict[str, DriveResult]:
+        """Display information about the discs in all drives.
+
+        Args:
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            filter: Only return the titles, streams and keys that pass this
+                filter.
+
+        Returns:
+            dict[str, DriveResult]: The result of each drive, keyed by its
+                input in makemkvcon's format.
+        """
+        return self._map(lambda makemkv: makemkv.info(cache, minlength, filter))
+
+    def mkv(
+        self,
+        title: int | str,
+        output_dir: str | Path | Mapping[str, str | Path],
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+    ) -> dict[str, DriveResult]:
+        """Copy titles from the discs in all drives.
+
+        Args:
+            title: Title to be ripped, can be either an integer starting
+                with 0 or the keyword "all".
+            output_dir: Output directory for created mkv files, either a
+                directory that will contain a subdirectory for each drive or
+                a mapping of inputs in makemkvcon's format to output
+                directories.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+
+        Returns:
+            dict[str, DriveResult]: The result of each drive, keyed by its
+                input in makemkvcon's format.
+        """
+        output_dirs = self._output_dirs(output_dir)
+        return self._map(
+            lambda makemkv: makemkv.mkv(
+                title, output_dirs[makemkv._input], cache, minlength
+            )
+        )
+
+    def backup(
+        self,
+        output_dir: str | Path | Mapping[str, str | Path],
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        decrypt: bool = False,
+    ) -> dict[str, DriveResult]:
+        """Backup the discs in all drives.
+
+        Args:
+            output_dir: Output directory for created backup files, either a
+                directory that will contain a subdirectory for each drive or
+                a mapping of inputs in makemkvcon's format to output
+                directories.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            decrypt: Decrypt stream files during backup.
+
+        Returns:
+            dict[str, DriveResult]: The result of each drive, keyed by its
+                input in makemkvcon's format.
+        """
+        output_dirs = self._output_dirs(output_dir)
+        return self._map(
+            lambda makemkv: makemkv.backup(
+                output_dirs[makemkv._input], cache, minlength, decrypt
+            )
+        )
+
+    def kill(self) -> None:
+        """Terminate all running `makemkvcon` processes."""
+        for makemkv in self.drives.values():
+            makemkv.kill()
+
+    def _output_dirs(
+        self, output_dir: str | Path | Mapping[str, str | Path]
+    ) -> Mapping[str, str | Path]:
+        """Map each input to its output directory."""
+        if isinstance(output_dir, Mapping):
+            return output_dir
+        output_dirs = {}
+        for input in self.drives:
+            path = output_dirs[input] = Path(output_dir, _safe_name(input))
+            path.mkdir(parents=True, exist_ok=True)
+        return output_dirs
+
+    def _map(self, func: Callable[[MakeMKV], MakeMKVOutput]) -> dict[str, DriveResult]:
+        """Call `func` with each drive in the worker pool and collect the results."""
+        results: dict[str, DriveResult] = {}
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            futures = {
+                executor.submit(func, makemkv): input
+                for input, makemkv in self.drives.items()
+            }
+            try:
+                for future in as_completed(futures):
+                    input = futures[future]
+                    try:
+                        results[input] = DriveResult(input, future.result(), None)
+                    except Exception as exc:
+                        logger.error(f"{input}: {exc}")
+                        results[input] = DriveResult(input, None, exc)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.kill()
+                raise
+        return {input: results[input] for input in self.drives}
+
+
+def _safe_name(input: str) -> str:
+    """Turn an input like "dev:/dev/sr0" into a name usable for a directory."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in input)
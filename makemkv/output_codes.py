@@ -46,6 +46,69 @@ SPECIAL_VALUES = {
     6213: "MKV",
 }
 
+# ISO 639-1 codes of the most common ISO 639-2 codes reported by makemkvcon,
+# other codes are looked up with iso639-lang
+LANGUAGE_CODES = {
+    "eng": "en",
+    "ger": "de",
+    "deu": "de",
+    "fre": "fr",
+    "fra": "fr",
+    "spa": "es",
+    "ita": "it",
+    "jpn": "ja",
+    "chi": "zh",
+    "zho": "zh",
+    "kor": "ko",
+    "rus": "ru",
+    "por": "pt",
+    "dut": "nl",
+    "nld": "nl",
+    "swe": "sv",
+    "dan": "da",
+    "nor": "no",
+    "nob": "nb",
+    "nno": "nn",
+    "fin": "fi",
+    "pol": "pl",
+    "cze": "cs",
+    "ces": "cs",
+    "slo": "sk",
+    "slk": "sk",
+    "hun": "hu",
+    "gre": "el",
+    "ell": "el",
+    "tur": "tr",
+    "heb": "he",
+    "ara": "ar",
+    "hin": "hi",
+    "tha": "th",
+    "ice": "is",
+    "isl": "is",
+    "rum": "ro",
+    "ron": "ro",
+    "bul": "bg",
+    "hrv": "hr",
+    "srp": "sr",
+    "slv": "sl",
+    "ukr": "uk",
+    "est": "et",
+    "lav": "lv",
+    "lit": "lt",
+    "ind": "id",
+    "may": "ms",
+    "msa": "ms",
+    "vie": "vi",
+    "cat": "ca",
+    "baq": "eu",
+    "eus": "eu",
+    "glg": "gl",
+    "per": "fa",
+    "fas": "fa",
+    "tam": "ta",
+    "tel": "te",
+}
+
 # Loglevel for each messsage from makemkvcon
 # the messsages can be found in makemkvgui/src/str/en_utf16.cpp
 # (in makemkv-oss-1.16.1.tar.gz)
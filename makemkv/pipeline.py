@@ -0,0 +1,185 @@
+"""Provides `RemuxPipeline` to rip several titles with a single pass over a disc.
+
+Running `mkv` once per title reads the disc once per title. The pipeline
+backs up the decrypted disc to fast local storage at drive speed instead and
+then saves the titles from the backup with several `makemkvcon` processes
+at once. The drive is free for the next disc as soon as the backup is done.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Literal, NamedTuple, Optional
+
+from .makemkv import MakeMKV, _do_nothing, logger
+from .orchestrator import MultiProgressUpdateHandlerType
+from .types import MakeMKVOutput
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+
+
+class TitleResult(NamedTuple):
+    """The result of saving one title from the backup."""
+
+    title: int
+    output: Optional[MakeMKVOutput]  # None if saving the title failed
+    error: Optional[Exception]  # None if saving the title succeeded
+
+
+class PipelineResult(NamedTuple):
+    """The result of running a `RemuxPipeline`."""
+
+    backup: MakeMKVOutput  # output of `makemkvcon backup`
+    backup_dir: Optional[Path]  # None if the backup was removed
+    titles: dict[int, TitleResult]
+
+
+class RemuxPipeline:
+    """Backs up a disc and saves titles from the backup concurrently.
+
+    A title that fails doesn't stop the others, its error is returned with
+    the results.
+    """
+
+    def __init__(
+        self,
+        input: int | str | PathLike[str],
+        staging_dir: str | PathLike[str] | None = None,
+        max_workers: int | None = None,
+        keep_backup: bool = False,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        progress_handler: MultiProgressUpdateHandlerType = _do_nothing,
+        backup_done: Callable[[str], None] = _do_nothing,
+        trusted: bool = False,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        metrics: Metrics | None = None,
+    ) -> None:
+        """Initialize RemuxPipeline with input.
+
+        Args:
+            input: The disc to rip, see :func:`makemkv.MakeMKV.__init__`.
+            staging_dir: Directory on fast storage that will contain the
+                backup. Defaults to the system's temporary directory.
+            max_workers: Maximum number of `makemkvcon` processes saving
+                titles at the same time. Defaults to the number of CPU cores.
+            keep_backup: Don't remove the backup after saving the titles.
+                It is also kept if a title fails, so it can be retried.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            progress_handler: A callback function to parse progress updates.
+                Its first argument is "backup" or "title N".
+            backup_done: Called with the input in makemkvcon's format as soon
+                as the drive isn't needed anymore, eg. to eject the disc.
+            trusted: Don't validate the types of parsed values.
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+            progress_interval: Minimum number of seconds between two
+                progress updates passed to `progress_handler`.
+            progress_delta: Minimum change of the progress value between two
+                progress updates passed to `progress_handler`.
+            metrics: Collects metrics about the `makemkvcon` processes.
+        """
+        self.staging_dir = staging_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.keep_backup = keep_backup
+        self.progress_handler = progress_handler
+        self.backup_done = backup_done
+        self._new_makemkv = functools.partial(
+            MakeMKV,
+            cache=cache,
+            minlength=minlength,
+            trusted=trusted,
+            binary=binary,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            metrics=metrics,
+        )
+        self.drive = self._makemkv(input, "backup")
+        self._jobs: list[MakeMKV] = []
+
+    def run(
+        self, titles: Iterable[int] | Literal["all"], output_dir: str | Path
+    ) -> PipelineResult:
+        """Back up the disc and save `titles` from the backup.
+
+        Args:
+            titles: Numbers of the titles to be ripped, starting with 0, or
+                "all".
+            output_dir: Output directory for created mkv files.
+
+        Returns:
+            PipelineResult: The output of the backup and the result of each
+                title.
+
+        Raises:
+            MakeMKVError: MakeMKV encountered a critical problem during the
+                backup.
+            FileNotFoundError: Couldn't find `makemkvcon`.
+        """
+        backup_dir = Path(tempfile.mkdtemp(prefix="makemkv-", dir=self.staging_dir))
+        try:
+            backup = self.drive.backup(backup_dir, decrypt=True)
+        except BaseException:
+            shutil.rmtree(backup_dir, ignore_errors=True)
+            raise
+        self.backup_done(self.drive._input)
+
+        if titles == "all":
+            titles = range(backup.get("title_count", len(backup["titles"])))
+        results = self._remux(list(titles), backup_dir, output_dir)
+
+        failed = any(result.error is not None for result in results.values())
+        if self.keep_backup or failed:
+            logger.info("Kept the backup in %s", backup_dir)
+            return PipelineResult(backup, backup_dir, results)
+        shutil.rmtree(backup_dir, ignore_errors=True)
+        return PipelineResult(backup, None, results)
+
+    def kill(self) -> None:
+        """Terminate all running `makemkvcon` processes."""
+        self.drive.kill()
+        for makemkv in self._jobs:
+            makemkv.kill()
+
+    def _makemkv(self, input: int | str | PathLike[str], job: str) -> MakeMKV:
+        makemkv = self._new_makemkv(input)
+        makemkv.progress_handler = functools.partial(self.progress_handler, job)
+        return makemkv
+
+    def _remux(
+        self, titles: list[int], backup_dir: Path, output_dir: str | Path
+    ) -> dict[int, TitleResult]:
+        """Save `titles` from the backup in the worker pool."""
+        self._jobs = [
+            self._makemkv(f"file:{backup_dir}", f"title {title}") for title in titles
+        ]
+        results: dict[int, TitleResult] = {}
+        with ThreadPoolExecutor(min(self.max_workers, len(titles) or 1)) as executor:
+            futures = {
+                executor.submit(makemkv.mkv, title, output_dir): title
+                for title, makemkv in zip(titles, self._jobs)
+            }
+            try:
+                for future in as_completed(futures):
+                    title = futures[future]
+                    try:
+                        results[title] = TitleResult(title, future.result(), None)
+                    except Exception as exc:
+                        logger.error(f"Title {title}: {exc}")
+                        results[title] = TitleResult(title, None, exc)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.kill()
+                raise
+        return {title: results[title] for title in titles}
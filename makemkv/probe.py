@@ -0,0 +1,238 @@
+"""Detects the version and the capabilities of `makemkvcon`.
+
+Probing a binary runs it twice: once without arguments to read its usage
+text and, if the usage text doesn't mention the version, once in robot mode
+to read the version from its first message. The result is cached for the
+lifetime of the process and, if `CACHE_FILE` is set, on disk. Both caches
+are invalidated when the modification time of the binary changes.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from os import PathLike
+from pathlib import Path
+from subprocess import PIPE, STDOUT
+from typing import Callable, NamedTuple
+
+from .makemkv import MakeMKVError, _find_makemkvcon_binary, _which, logger
+
+CACHE_FILE: Path | None = None
+"""Store probe results in this JSON file so that other processes can reuse them.
+
+Disabled by default, eg. set it to
+``Path.home() / ".cache" / "python-makemkv" / "makemkvcon.json"``.
+"""
+
+REQUIRED_OPTIONS = frozenset({"robot"})
+"""Options that `makemkvcon` has to support to be used by python-makemkv."""
+
+# seconds to wait for makemkvcon while probing it
+_TIMEOUT = 10
+
+_version_exp = re.compile(r"MakeMKV v(\d+(?:\.\d+)+)")
+_option_exp = re.compile(r"(?<![\w-])--([a-z][a-z-]*)")
+# commands are listed like "  mkv <source> <title id> <destination folder>"
+_command_exp = re.compile(r"^\s+([a-z]+) <source>", re.MULTILINE)
+_lock = threading.Lock()
+
+
+class MakeMKVConInfo(NamedTuple):
+    """Version and capabilities of a `makemkvcon` binary.
+
+    `commands` and `options` are empty if the usage text wasn't recognized.
+    """
+
+    path: str
+    version: str | None
+    commands: frozenset[str]
+    options: frozenset[str]
+
+
+def probe_makemkvcon(
+    binary: str | PathLike[str] | None = None,
+    cache_file: str | PathLike[str] | None = None,
+) -> MakeMKVConInfo:
+    """Detect the version and the supported commands and options of makemkvcon.
+
+    Args:
+        binary: Path or name of the `makemkvcon` binary. It is searched in
+            `MAKEMKVCON_BINARIES` by default.
+        cache_file: Store the result in this file, defaults to `CACHE_FILE`.
+
+    Returns:
+        MakeMKVConInfo: The version and capabilities of `makemkvcon`.
+
+    Raises:
+        FileNotFoundError: Couldn't find `makemkvcon`.
+    """
+    if binary is None:
+        path, mtime_ns = _stat(_find_makemkvcon_binary, _which.cache_clear)
+    else:
+        find = functools.partial(_resolve, os.fspath(binary))
+        path, mtime_ns = _stat(find, _resolve.cache_clear)
+
+    if cache_file is None:
+        cache_file = CACHE_FILE
+    with _lock:
+        return _probe(
+            os.path.abspath(path),
+            mtime_ns,
+            None if cache_file is None else Path(cache_file),
+        )
+
+
+def check_makemkvcon(
+    binary: str | PathLike[str] | None = None, command: str | None = None
+) -> str:
+    """Find makemkvcon and make sure that it can be used to run `command`.
+
+    Returns:
+        str: The path of `makemkvcon`.
+
+    Raises:
+        MakeMKVError: `makemkvcon` lacks a required option or `command`.
+        FileNotFoundError: Couldn't find `makemkvcon`.
+    """
+    info = probe_makemkvcon(binary)
+    if not info.options:
+        return info.path
+    if missing := REQUIRED_OPTIONS - info.options:
+        raise MakeMKVError(
+            f"{info.path} doesn't support "
+            + ", ".join(f"--{option}" for option in sorted(missing))
+        )
+    if command is not None and info.commands and command not in info.commands:
+        raise MakeMKVError(f"{info.path} doesn't support the {command} command")
+    return info.path
+
+
+def _stat(find: Callable[[], str], clear_cache: Callable[[], None]) -> tuple[str, int]:
+    """Return the path of `makemkvcon` and its modification time in nanoseconds.
+
+    `find` caches the path, so it is searched again after `clear_cache` if
+    `makemkvcon` was moved since it was found.
+    """
+    path = find()
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        clear_cache()
+        path = find()
+        return path, os.stat(path).st_mtime_ns
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve(binary: str) -> str:
+    """Search `binary` in PATH if it isn't a path."""
+    return shutil.which(binary) or binary
+
+
+@functools.lru_cache(maxsize=None)
+def _probe(path: str, mtime_ns: int, cache_file: Path | None) -> MakeMKVConInfo:
+    if cache_file is not None:
+        if (info := _load(cache_file, path, mtime_ns)) is not None:
+            return info
+
+    usage = _read_usage(path)
+    if (m := _version_exp.search(usage)) is None:
+        m = _version_exp.search(_read_banner(path))
+    info = MakeMKVConInfo(
+        path=path,
+        version=m[1] if m else None,
+        commands=frozenset(_command_exp.findall(usage)),
+        options=frozenset(_option_exp.findall(usage)),
+    )
+    logger.debug("Found makemkvcon %s at %s", info.version or "(unknown)", path)
+
+    if cache_file is not None:
+        _store(cache_file, info, mtime_ns)
+    return info
+
+
+def _read_usage(path: str) -> str:
+    """Return the usage text that makemkvcon prints without arguments."""
+    try:
+        return subprocess.run(
+            [path],
+            stdout=PIPE,
+            stderr=STDOUT,
+            text=True,
+            errors="replace",
+            timeout=_TIMEOUT,
+        ).stdout
+    except subprocess.TimeoutExpired:
+        logger.warning("makemkvcon didn't print its usage in time")
+        return ""
+
+
+def _read_banner(path: str) -> str:
+    """Return the first message of makemkvcon, which contains its version."""
+    with subprocess.Popen(
+        [path, "info", "disc:9999", "--robot", "--noscan"],
+        stdout=PIPE,
+        stderr=STDOUT,
+        text=True,
+        errors="replace",
+    ) as p:
+        assert p.stdout is not None
+        timer = threading.Timer(_TIMEOUT, p.kill)
+        timer.start()
+        try:
+            return p.stdout.readline()
+        finally:
+            timer.cancel()
+            p.kill()
+
+
+def _load(cache_file: Path, path: str, mtime_ns: int) -> MakeMKVConInfo | None:
+    try:
+        entry = json.loads(cache_file.read_text())[path]
+        if entry["mtime_ns"] != mtime_ns:
+            return None
+        return MakeMKVConInfo(
+            path=path,
+            version=entry["version"],
+            commands=frozenset(entry["commands"]),
+            options=frozenset(entry["options"]),
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store(cache_file: Path, info: MakeMKVConInfo, mtime_ns: int) -> None:
+    try:
+        entries = json.loads(cache_file.read_text())
+        if not isinstance(entries, dict):
+            entries = {}
+    except (OSError, ValueError):
+        entries = {}
+    entries[info.path] = {
+        "mtime_ns": mtime_ns,
+        "version": info.version,
+        "commands": sorted(info.commands),
+        "options": sorted(info.options),
+    }
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    except OSError:
+        logger.warning("Couldn't write %s", cache_file, exc_info=True)
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
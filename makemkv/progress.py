@@ -1,19 +1,58 @@
 # noqa: D100
+from datetime import timedelta
 from typing import Any, Optional
 
 try:
-    from rich.progress import BarColumn, Progress, TaskID, TimeRemainingColumn
+    from rich import filesize
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        ProgressColumn,
+        Task,
+        TaskID,
+        TimeRemainingColumn,
+    )
+    from rich.text import Text
 except ImportError as exc:
     raise ImportError(
         "'makemkv.progress' requires 'rich' to be installed. You can "
         "install it with 'pip install rich' or 'pip install makemkv[cli]."
     ) from exc
 
+from .telemetry import ProgressTelemetry
+
+
+class TelemetryColumn(ProgressColumn):
+    """Renders the throughput and the remaining time of a `ProgressTelemetry`."""
+
+    def __init__(self, telemetry: ProgressTelemetry) -> None:
+        super().__init__()
+        self.telemetry = telemetry
+
+    def render(self, task: Task) -> Text:  # noqa: D102
+        snapshot = self.telemetry.snapshot()
+        parts = []
+        if snapshot.smoothed_throughput > 0:
+            parts.append(f"{filesize.decimal(int(snapshot.smoothed_throughput))}/s")
+        if snapshot.eta is not None:
+            parts.append(str(timedelta(seconds=round(snapshot.eta))))
+        return Text(" ".join(parts), style="progress.remaining")
+
 
 class ProgressParser(Progress):
     """Renders progress bars that can be updated using a callback method."""
 
-    def __init__(self, **kwargs: Any) -> None:
+    def __init__(
+        self, telemetry: Optional[ProgressTelemetry] = None, **kwargs: Any
+    ) -> None:
+        """Initialize ProgressParser.
+
+        Args:
+            telemetry: Show the throughput and the remaining time calculated
+                by this telemetry instead of estimating the remaining time of
+                each task.
+            **kwargs: Passed to `rich.progress.Progress`.
+        """
         if "transient" not in kwargs:
             kwargs["transient"] = True
         if "expand" not in kwargs:
@@ -22,9 +61,10 @@ class ProgressParser(Progress):
             "[progress.description]{task.description}",
             BarColumn(bar_width=None),
             "[progress.percentage]{task.percentage:>3.0f}%",
-            TimeRemainingColumn(),
+            TimeRemainingColumn() if telemetry is None else TelemetryColumn(telemetry),
             **kwargs,
         )
+        self.telemetry = telemetry
         self.task_description: Optional[str] = None
         self.task_id: Optional[TaskID] = None
         self.started: bool = False
@@ -0,0 +1,248 @@
+"""Compares the segments of titles to find duplicate and overlapping playlists.
+
+makemkvcon reports the segments (clips) of each title as a string like
+``"1,(2,4,6),11-22"``. Obfuscated Blu-rays contain hundreds of playlists
+that consist of the same segments, :class:`SegmentIndex` finds them without
+comparing each pair of titles.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from typing import Iterable, Iterator, NamedTuple
+
+from .types import MakeMKVOutput, Title
+
+
+class SegmentRange(NamedTuple):
+    """Consecutive segments from `start` to `end`, both inclusive."""
+
+    start: int
+    end: int
+
+    @property
+    def size(self) -> int:
+        """Number of segments in the range."""
+        return self.end - self.start + 1
+
+
+def parse_segments_map(segments_map: str) -> tuple[SegmentRange, ...]:
+    """Parse the `segments_map` of a title.
+
+    Segments in parentheses, which are alternatives on multi-angle discs,
+    are treated like the others. Consecutive segments are merged into one
+    range.
+
+    Args:
+        segments_map: eg. "1,(2,4,6),11-22,23-44".
+
+    Returns:
+        tuple[SegmentRange, ...]: The segments in playing order,
+            eg. ``(SegmentRange(1, 2), SegmentRange(4, 4), ...)``.
+
+    Raises:
+        ValueError: if `segments_map` can't be parsed.
+    """
+    ranges: list[SegmentRange] = []
+    for item in segments_map.replace("(", "").replace(")", "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        start, _, end = item.partition("-")
+        segment = SegmentRange(int(start), int(end or start))
+        if segment.end < segment.start:
+            raise ValueError(f"invalid segment range {item!r}")
+        if ranges and ranges[-1].end + 1 == segment.start:
+            ranges[-1] = SegmentRange(ranges[-1].start, segment.end)
+        else:
+            ranges.append(segment)
+    return tuple(ranges)
+
+
+class SegmentIndex:
+    """Index of the segments of a disc's titles.
+
+    Titles are identified by their `title_nr` key if the output was filtered
+    and by their position otherwise. Titles without a `segments_map` are
+    ignored.
+    """
+
+    def __init__(self, titles: Iterable[Title]) -> None:
+        """Index the segments of `titles`.
+
+        The segment ranges of all titles are sorted by their start and
+        indexed by the largest end of each part of the sorted list, which
+        takes O(n log n) time for n ranges. Overlaps are only computed by
+        the queries, in O((r + k) log n) time for a title with r ranges that
+        overlap k ranges of other titles.
+        """
+        # segments of each title in playing order and as a sorted set
+        self.segments: dict[int, tuple[SegmentRange, ...]] = {}
+        self._sets: dict[int, tuple[SegmentRange, ...]] = {}
+        self._set_starts: dict[int, list[int]] = {}
+        self._sizes: dict[int, int] = {}
+        self._angles: dict[int, list[tuple[int, int]]] = defaultdict(list)
+
+        for position, title in enumerate(titles):
+            title_nr = title.get("title_nr", position)
+            if "original_title_id" in title:
+                self._angles[title["original_title_id"]].append(
+                    (title.get("video_angle", 1), title_nr)
+                )
+            if "segments_map" not in title:
+                continue
+            segments = parse_segments_map(title["segments_map"])
+            self.segments[title_nr] = segments
+            self._sets[title_nr] = _merge(segments)
+            self._set_starts[title_nr] = [s.start for s in self._sets[title_nr]]
+            self._sizes[title_nr] = sum(s.size for s in self._sets[title_nr])
+
+        ranges = sorted(
+            (segment.start, segment.end, title_nr)
+            for title_nr, segments in self._sets.items()
+            for segment in segments
+        )
+        self._starts = [start for start, _, _ in ranges]
+        self._ends = [end for _, end, _ in ranges]
+        self._titles = [title_nr for _, _, title_nr in ranges]
+        # the largest end of the ranges lo..hi-1 is stored at (lo + hi) // 2
+        self._max_ends = [0] * len(ranges)
+        self._index_ends(0, len(ranges))
+
+    @classmethod
+    def from_output(cls, output: MakeMKVOutput) -> SegmentIndex:
+        """Index the titles of the output of `info()`."""
+        return cls(output["titles"])
+
+    def duplicates(self) -> list[list[int]]:
+        """Return groups of titles that play the same segments in the same order."""
+        groups: dict[tuple[SegmentRange, ...], list[int]] = defaultdict(list)
+        for title_nr, segments in self.segments.items():
+            groups[segments].append(title_nr)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def overlapping(self, title_nr: int) -> dict[int, int]:
+        """Return the titles that share segments with a title.
+
+        Returns:
+            dict[int, int]: The number of shared segments of each title.
+        """
+        shared: dict[int, int] = {}
+        for segment in self._sets.get(title_nr, ()):
+            for i in self._find(segment.start, segment.end):
+                if (other := self._titles[i]) != title_nr:
+                    shared[other] = (
+                        shared.get(other, 0)
+                        + min(segment.end, self._ends[i])
+                        - max(segment.start, self._starts[i])
+                        + 1
+                    )
+        return dict(sorted(shared.items()))
+
+    def supersets(self, title_nr: int) -> list[int]:
+        """Return the titles that contain all segments of a title."""
+        size = self._sizes[title_nr]
+        return [
+            other
+            for other, shared in self.overlapping(title_nr).items()
+            if shared == size
+        ]
+
+    def subsets(self, title_nr: int) -> list[int]:
+        """Return the titles whose segments are all part of a title."""
+        return [
+            other
+            for other, shared in self.overlapping(title_nr).items()
+            if shared == self._sizes[other]
+        ]
+
+    def candidates(self) -> list[int]:
+        """Return the titles that aren't part of another title.
+
+        Of titles with the same set of segments, only the first one is
+        returned.
+        """
+        first: dict[tuple[SegmentRange, ...], int] = {}
+        for title_nr, segments in self._sets.items():
+            first[segments] = min(first.get(segments, title_nr), title_nr)
+        return sorted(
+            title_nr for title_nr in first.values() if not self._is_contained(title_nr)
+        )
+
+    def angles(self) -> dict[int, list[int]]:
+        """Group the titles of multi-angle discs by `original_title_id`.
+
+        Returns:
+            dict[int, list[int]]: The titles of each original title, sorted
+                by `video_angle`.
+        """
+        return {
+            original_title_id: [title_nr for _, title_nr in sorted(angles)]
+            for original_title_id, angles in self._angles.items()
+        }
+
+    def _index_ends(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._max_ends[mid] = max(
+            self._ends[mid], self._index_ends(lo, mid), self._index_ends(mid + 1, hi)
+        )
+        return self._max_ends[mid]
+
+    def _find(self, start: int, end: int) -> Iterator[int]:
+        """Yield the positions of the ranges that overlap `start` to `end`."""
+        parts = [(0, len(self._starts))]
+        while parts:
+            lo, hi = parts.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_ends[mid] < start:
+                # none of these ranges reaches `start`
+                continue
+            parts.append((lo, mid))
+            if self._starts[mid] <= end:
+                # the following ranges start after `end` otherwise
+                parts.append((mid + 1, hi))
+                if self._ends[mid] >= start:
+                    yield mid
+
+    def _is_contained(self, title_nr: int) -> bool:
+        """Check if a larger title contains all segments of a title."""
+        segments = self._sets[title_nr]
+        if not segments:
+            return False
+        first = segments[0]
+        for i in self._find(first.start, first.start):
+            other = self._titles[i]
+            if (
+                self._ends[i] >= first.end
+                and self._sizes[other] > self._sizes[title_nr]
+                and self._contains(other, segments)
+            ):
+                return True
+        return False
+
+    def _contains(self, title_nr: int, segments: Iterable[SegmentRange]) -> bool:
+        """Check if a title contains all `segments`."""
+        starts = self._set_starts[title_nr]
+        ranges = self._sets[title_nr]
+        for segment in segments:
+            i = bisect.bisect_right(starts, segment.start) - 1
+            if i < 0 or ranges[i].end < segment.end:
+                return False
+        return True
+
+
+def _merge(segments: Iterable[SegmentRange]) -> tuple[SegmentRange, ...]:
+    """Merge segment ranges into sorted, disjoint ranges."""
+    merged: list[SegmentRange] = []
+    for segment in sorted(segments):
+        if merged and segment.start <= merged[-1].end + 1:
+            if segment.end > merged[-1].end:
+                merged[-1] = SegmentRange(merged[-1].start, segment.end)
+        else:
+            merged.append(segment)
+    return tuple(merged)
@@ -0,0 +1,312 @@
+"""A stand-in for `makemkvcon` that simulates a drive with a disc.
+
+The simulator prints robot output like `makemkvcon` does, with progress
+updates at a realistic rate, so that python-makemkv and applications built
+on it can be tested and benchmarked without a real drive. A scenario
+controls the simulated disc and failures like critical errors, non-zero exit
+codes and stalls.
+
+:func:`write_simulator` installs an executable that `MAKEMKVCON_BINARIES` or
+the `binary` argument of `MakeMKV` can point to. It is also possible to run
+the simulator with ``python -m makemkv.simulator [makemkvcon arguments]``,
+the scenario is then read from the JSON file in
+``$MAKEMKV_SIMULATOR_SCENARIO``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+import time
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, List, Optional, TextIO, TypedDict
+
+SCENARIO_ENV = "MAKEMKV_SIMULATOR_SCENARIO"
+"""Environment variable with the path of a JSON file containing a `Scenario`."""
+
+USAGE = """MakeMKV v1.17.5 linux(x64-release) started
+Use: makemkvcon [switches] Command [Parameters]
+
+Commands:
+  info <source>
+      prints info about disc
+  mkv <source> <title id> <destination folder>
+      saves a single title to mkv file
+  backup <source> <destination folder>
+      backs up disc to a hard drive
+
+Switches:
+  -r --robot        turn on "robot" mode
+  --progress=file   output all progress messages to file
+  --noscan          don't access any media during disc scan
+  --cache=size      set size of read cache in megabytes
+  --minlength=sec   minimum title length in seconds
+  --decrypt         decrypt stream files during backup
+"""
+
+# maximum of the progress values, like makemkvcon
+_PROGRESS_MAX = 65536
+_DRIVES = 16
+
+
+class Scenario(TypedDict, total=False):
+    """Behaviour of the simulator, all keys are optional."""
+
+    title_sizes: List[int]
+    """Size of each title of the disc in bytes."""
+    rate: float
+    """Bytes saved per second by `mkv` and `backup`."""
+    interval: float
+    """Seconds between two progress updates."""
+    scan_time: float
+    """Seconds it takes to scan the disc."""
+    critical_error_at: Optional[float]
+    """Fail with a critical error after saving this fraction of the bytes."""
+    stall_at: Optional[float]
+    """Stop printing anything after saving this fraction of the bytes."""
+    stall: Optional[float]
+    """Seconds to stall, None stalls until the simulator is killed."""
+    exit_code: int
+    """Exit code after all output was printed."""
+    lines: Optional[List[str]]
+    """Print these lines instead of simulating a disc."""
+    line_delay: float
+    """Seconds between two of `lines`."""
+
+
+DEFAULT_SCENARIO: Scenario = {
+    "title_sizes": [4 * 10**9, 2 * 10**9, 10**9],
+    "rate": 35 * 10**9,
+    "interval": 0.01,
+    "scan_time": 0.05,
+    "critical_error_at": None,
+    "stall_at": None,
+    "stall": None,
+    "exit_code": 0,
+    "lines": None,
+    "line_delay": 0,
+}
+
+
+def write_simulator(
+    path: str | PathLike[str], scenario: Scenario | None = None
+) -> Path:
+    """Install an executable that simulates `makemkvcon`.
+
+    The executable is a Python script, so it only works on systems that
+    support shebang lines.
+
+    Args:
+        path: Path of the executable.
+        scenario: Behaviour of the simulator, see `Scenario`.
+
+    Returns:
+        Path: The path of the executable.
+    """
+    path = Path(path)
+    # make sure that the script imports this package even if it isn't installed
+    package_dir = str(Path(__file__).resolve().parent.parent)
+    path.write_text(
+        f"#!{sys.executable}\n"
+        "import json, sys\n"
+        f"sys.path.insert(0, {package_dir!r})\n"
+        "from makemkv.simulator import main\n"
+        f"sys.exit(main(json.loads({json.dumps(scenario or {})!r})))\n"
+    )
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return path
+
+
+def main(scenario: Scenario | None = None, argv: Iterable[str] | None = None) -> int:
+    """Simulate `makemkvcon` with command line arguments `argv`.
+
+    Args:
+        scenario: Behaviour of the simulator, read from the JSON file in
+            ``$MAKEMKV_SIMULATOR_SCENARIO`` by default.
+        argv: Arguments of `makemkvcon`, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: The exit code.
+    """
+    if scenario is None:
+        scenario_file = os.environ.get(SCENARIO_ENV)
+        scenario = json.loads(Path(scenario_file).read_text()) if scenario_file else {}
+    simulator = _Simulator({**DEFAULT_SCENARIO, **scenario}, sys.stdout)
+    try:
+        return simulator.run(list(sys.argv[1:] if argv is None else argv))
+    except BrokenPipeError:
+        # the reader stopped early, eg. `list_drives()`; don't fail again
+        # while flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+
+class _Simulator:
+    def __init__(self, scenario: Scenario, out: TextIO) -> None:
+        self.scenario = scenario
+        self.out = out
+
+    def run(self, argv: list[str]) -> int:
+        args = [arg for arg in argv if not arg.startswith("-")]
+        if not args or args[0] not in ("info", "mkv", "backup") or len(args) < 2:
+            self.out.write(USAGE)
+            return 1
+
+        if (lines := self.scenario["lines"]) is not None:
+            for i, line in enumerate(lines):
+                if i:
+                    time.sleep(self.scenario["line_delay"])
+                self._print(line)
+            return self.scenario["exit_code"]
+
+        command, source = args[:2]
+        self._msg(1005, "%1 started", "MakeMKV v1.17.5 linux(x64-release)")
+        for drive_nr in range(_DRIVES):
+            if drive_nr == 0:
+                self._print(
+                    'DRV:0,2,999,12,"BD-ROM SIMULATOR","SIMULATED_DISC","/dev/sr0"'
+                )
+            else:
+                self._print(f'DRV:{drive_nr},256,999,0,"","",""')
+        # backups and images are simulated like the disc
+        if source not in ("disc:0", "dev:/dev/sr0") and not source.startswith(
+            ("file:", "iso:")
+        ):
+            self._msg(5010, "Failed to open disc")
+            return 1
+
+        self._scan()
+        sizes = self.scenario["title_sizes"]
+        if command == "mkv" and len(args) >= 4:
+            if args[2] == "all":
+                titles = list(range(len(sizes)))
+            elif args[2].isdigit() and int(args[2]) < len(sizes):
+                titles = [int(args[2])]
+            else:
+                titles = []
+            if not self._save(Path(args[3]), titles):
+                return 1
+            self._msg(5036, "Copy complete. %1 titles saved.", str(len(titles)))
+        elif command == "backup" and len(args) >= 3:
+            if not self._save(Path(args[2]), None):
+                return 1
+            self._msg(5011, "Operation successfully completed")
+        return self.scenario["exit_code"]
+
+    def _scan(self) -> None:
+        self._print('PRGT:5018,0,"Opening disc"')
+        self._print('PRGC:5018,0,"Processing title sets"')
+        steps = max(1, round(self.scenario["scan_time"] / self.scenario["interval"]))
+        for step in range(steps + 1):
+            if step:
+                time.sleep(self.scenario["interval"])
+            value = _PROGRESS_MAX * step // steps
+            self._print(f"PRGV:{value},{value},{_PROGRESS_MAX}")
+
+        sizes = self.scenario["title_sizes"]
+        self._print(f"TCOUNT:{len(sizes)}")
+        self._print('CINFO:1,6209,"Blu-ray disc"')
+        self._print('CINFO:2,0,"SIMULATED_DISC"')
+        self._print('CINFO:30,0,"SIMULATED_DISC"')
+        self._print('CINFO:32,0,"SIMULATED_DISC"')
+        for title_nr, size in enumerate(sizes):
+            # 5 MB per second of video
+            seconds = size // (5 * 10**6)
+            length = f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+            self._print(f'TINFO:{title_nr},2,0,"Title {title_nr}"')
+            self._print(f'TINFO:{title_nr},8,0,"{title_nr + 1}"')
+            self._print(f'TINFO:{title_nr},9,0,"{length}"')
+            self._print(f'TINFO:{title_nr},10,0,"{size / 10**9:.1f} GB"')
+            self._print(f'TINFO:{title_nr},11,0,"{size}"')
+            self._print(f'TINFO:{title_nr},16,0,"{title_nr:05}.mpls"')
+            self._print(f'TINFO:{title_nr},27,0,"{_file_name(title_nr)}"')
+            self._print(f'SINFO:{title_nr},0,1,6201,"Video"')
+            self._print(f'SINFO:{title_nr},0,5,0,"V_MPEG4/ISO/AVC"')
+            self._print(f'SINFO:{title_nr},0,19,0,"1920x1080"')
+            self._print(f'SINFO:{title_nr},1,1,6202,"Audio"')
+            self._print(f'SINFO:{title_nr},1,3,0,"eng"')
+            self._print(f'SINFO:{title_nr},1,5,0,"A_AC3"')
+            self._print(f'SINFO:{title_nr},2,1,6203,"Subtitles"')
+            self._print(f'SINFO:{title_nr},2,3,0,"eng"')
+            self._print(f'SINFO:{title_nr},2,5,0,"S_HDMV/PGS"')
+
+    def _save(self, output_dir: Path, titles: list[int] | None) -> bool:
+        """Simulate saving `titles` or, if None, a backup of the disc.
+
+        Returns False after a critical error.
+        """
+        sizes = self.scenario["title_sizes"]
+        if titles is None:
+            name = "Saving all titles to backup"
+            tasks = [sum(sizes)]
+            (output_dir / "BDMV").mkdir(parents=True, exist_ok=True)
+        else:
+            name = "Saving to MKV file"
+            tasks = [sizes[title_nr] for title_nr in titles]
+            output_dir.mkdir(parents=True, exist_ok=True)
+            self._msg(
+                5014,
+                "Saving %1 titles into directory %2",
+                str(len(titles)),
+                output_dir.as_uri() if output_dir.is_absolute() else str(output_dir),
+            )
+
+        total = sum(tasks)
+        step = max(1, round(self.scenario["rate"] * self.scenario["interval"]))
+        critical_error_at = self.scenario["critical_error_at"]
+        stall_at = self.scenario["stall_at"]
+        self._print(f'PRGT:5017,0,"{name}"')
+        saved = 0
+        for i, size in enumerate(tasks):
+            if titles is not None:
+                (output_dir / _file_name(titles[i])).touch()
+            self._print(f'PRGC:5017,0,"{name}"')
+            done = 0
+            while True:
+                fraction = (saved + done) / total if total else 1.0
+                if stall_at is not None and fraction >= stall_at:
+                    stall_at = None
+                    self._stall()
+                if critical_error_at is not None and fraction >= critical_error_at:
+                    self._msg(5010, "Failed to save title")
+                    return False
+                self._print(
+                    f"PRGV:{_PROGRESS_MAX * done // size if size else _PROGRESS_MAX},"
+                    f"{round(_PROGRESS_MAX * fraction)},{_PROGRESS_MAX}"
+                )
+                if done >= size:
+                    break
+                time.sleep(self.scenario["interval"])
+                done = min(size, done + step)
+            saved += size
+        return True
+
+    def _stall(self) -> None:
+        if (seconds := self.scenario["stall"]) is not None:
+            time.sleep(seconds)
+            return
+        while True:
+            time.sleep(3600)
+
+    def _msg(self, code: int, format: str, *params: str) -> None:
+        message = format
+        for i, param in reversed(list(enumerate(params, 1))):
+            message = message.replace(f"%{i}", param)
+        fields = [message, format, *params]
+        quoted = ",".join(f'"{field}"' for field in fields)
+        self._print(f"MSG:{code},0,{len(params)},{quoted}")
+
+    def _print(self, line: str) -> None:
+        self.out.write(line + "\n")
+        self.out.flush()
+
+
+def _file_name(title_nr: int) -> str:
+    return f"SIMULATED_DISC_t{title_nr:02}.mkv"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Derives throughput and remaining time of makemkvcon's tasks from its events.
+
+makemkvcon only reports the progress of its tasks as fractions. Combined with
+the sizes of the titles reported in its output, this is enough to calculate
+how many bytes were saved, how fast and how long it will take to save the
+rest.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Iterable, NamedTuple
+
+from .types import (
+    MakeMKVEvent,
+    ProgressTitleEvent,
+    ProgressValueEvent,
+    TitleAttributeEvent,
+)
+
+# minimum number of seconds between two throughput measurements
+_SAMPLE_INTERVAL = 1.0
+
+
+class PhaseTiming(NamedTuple):
+    """Duration of a finished task of makemkvcon."""
+
+    name: str
+    total: bool  # whether the task was reported by a PRGT or a PRGC line
+    seconds: float
+
+
+class TelemetrySnapshot(NamedTuple):
+    """Progress, throughput and remaining time at one point in time."""
+
+    elapsed: float  # seconds since the first event
+    phase: str  # name of the current task
+    phase_elapsed: float  # seconds since the current task began
+    phases: tuple[PhaseTiming, ...]  # finished tasks
+    title_nr: int | None  # title that is being saved, if known
+    bytes_done: int
+    bytes_total: int  # 0 if the sizes of the titles are unknown
+    throughput: float  # bytes per second during the last measurement
+    smoothed_throughput: float  # exponentially weighted average
+    eta: float | None  # seconds until the current overall task is finished
+
+
+class ProgressTelemetry:
+    """Collects the progress of makemkvcon from its events.
+
+    Pass the events of :func:`makemkv.MakeMKV.iter_events` to :func:`update`
+    or pass the telemetry to `MakeMKV` to have it updated automatically.
+
+    Bytes are counted during overall tasks that begin after the sizes of the
+    titles were reported, eg. "Saving to MKV file". The remaining time of
+    other tasks is estimated from the progress value and the time since the
+    task began.
+    """
+
+    def __init__(
+        self,
+        titles: Iterable[int] | None = None,
+        smoothing: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize ProgressTelemetry.
+
+        Args:
+            titles: Numbers of the titles that are saved, defaults to all
+                titles.
+            smoothing: Time constant of the smoothed throughput in seconds.
+            clock: Returns the current time in seconds.
+        """
+        self.titles = None if titles is None else sorted(titles)
+        self.smoothing = smoothing
+        self.clock = clock
+
+        self._sizes: dict[int, int] = {}
+        # sorted keys of `_sizes`, None after a size was added
+        self._sorted_sizes: list[int] | None = []
+        # `bytes_total` and the `titles` it was summed for, None after a size
+        # was added
+        self._bytes_total: tuple[list[int] | None, int] | None = None
+        self._start: float | None = None
+        self._phases: list[PhaseTiming] = []
+        # name and start of the running tasks, keyed by `total`
+        self._tasks: dict[bool, tuple[str, float]] = {}
+        self._transfer = False
+        self._fraction = 0.0
+        self._bytes_done = 0
+        # time and bytes done of the previous throughput measurement
+        self._sample: tuple[float, int] | None = None
+        self._throughput = 0.0
+        self._smoothed_throughput = 0.0
+
+    def update(self, event: MakeMKVEvent) -> None:
+        """Update the telemetry with an event of makemkvcon."""
+        now = self.clock()
+        if self._start is None:
+            self._start = now
+
+        if isinstance(event, ProgressValueEvent):
+            self._update_progress(now, event)
+        elif isinstance(event, ProgressTitleEvent):
+            self._begin_task(now, event)
+        elif (
+            isinstance(event, TitleAttributeEvent)
+            and event.key == "size"
+            and isinstance(event.value, int)
+        ):
+            self._sizes[event.title_nr] = event.value
+            self._sorted_sizes = None
+            self._bytes_total = None
+
+    def snapshot(self) -> TelemetrySnapshot:
+        """Return the current progress, throughput and remaining time."""
+        now = self.clock()
+        start = now if self._start is None else self._start
+        name, phase_start = self._tasks.get(False, self._tasks.get(True, ("", start)))
+        bytes_total = self.bytes_total if self._transfer else 0
+        return TelemetrySnapshot(
+            elapsed=now - start,
+            phase=name,
+            phase_elapsed=now - phase_start,
+            phases=tuple(self._phases),
+            title_nr=self._current_title(),
+            bytes_done=self._bytes_done,
+            bytes_total=bytes_total,
+            throughput=self._throughput,
+            smoothed_throughput=self._smoothed_throughput,
+            eta=self._eta(now, bytes_total),
+        )
+
+    @property
+    def bytes_done(self) -> int:
+        """Number of bytes saved by the current overall task."""
+        return self._bytes_done
+
+    @property
+    def smoothed_throughput(self) -> float:
+        """Exponentially weighted average of the throughput in bytes per second."""
+        return self._smoothed_throughput
+
+    @property
+    def bytes_total(self) -> int:
+        """Total size of the titles that are saved."""
+        if self._bytes_total is not None and self._bytes_total[0] is self.titles:
+            return self._bytes_total[1]
+        if self.titles is None:
+            bytes_total = sum(self._sizes.values())
+        else:
+            bytes_total = sum(self._sizes.get(title_nr, 0) for title_nr in self.titles)
+        self._bytes_total = (self.titles, bytes_total)
+        return bytes_total
+
+    def _begin_task(self, now: float, event: ProgressTitleEvent) -> None:
+        if (task := self._tasks.get(event.total)) is not None:
+            self._phases.append(PhaseTiming(task[0], event.total, now - task[1]))
+        self._tasks[event.total] = (event.name, now)
+
+        if event.total:
+            self._transfer = bool(self._sizes)
+            self._fraction = 0.0
+            self._bytes_done = 0
+            self._sample = None
+            self._throughput = 0.0
+            self._smoothed_throughput = 0.0
+
+    def _update_progress(self, now: float, event: ProgressValueEvent) -> None:
+        if event.max <= 0:
+            return
+        self._fraction = min(event.total / event.max, 1.0)
+        if not self._transfer:
+            return
+        self._bytes_done = round(self.bytes_total * self._fraction)
+
+        if self._sample is None:
+            self._sample = (now, self._bytes_done)
+            return
+        dt = now - self._sample[0]
+        if dt < _SAMPLE_INTERVAL:
+            return
+        self._throughput = (self._bytes_done - self._sample[1]) / dt
+        if self._smoothed_throughput:
+            alpha = 1 - math.exp(-dt / self.smoothing)
+            self._smoothed_throughput += alpha * (
+                self._throughput - self._smoothed_throughput
+            )
+        else:
+            self._smoothed_throughput = self._throughput
+        self._sample = (now, self._bytes_done)
+
+    def _current_title(self) -> int | None:
+        if not self._transfer:
+            return None
+        if (titles := self.titles) is None:
+            if self._sorted_sizes is None:
+                self._sorted_sizes = sorted(self._sizes)
+            titles = self._sorted_sizes
+        saved = 0
+        for title_nr in titles:
+            saved += self._sizes.get(title_nr, 0)
+            if saved > self._bytes_done:
+                return title_nr
+        return None
+
+    def _eta(self, now: float, bytes_total: int) -> float | None:
+        if bytes_total and self._smoothed_throughput > 0:
+            return (bytes_total - self._bytes_done) / self._smoothed_throughput
+        if self._fraction > 0 and (task := self._tasks.get(True)) is not None:
+            return (now - task[1]) * (1 - self._fraction) / self._fraction
+        return None
@@ -1,6 +1,35 @@
-from typing import Literal, Protocol, Union
+import functools
+import sys
+from enum import IntEnum, IntFlag
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Literal,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Union,
+)
 
-from typing_extensions import Required, TypedDict
+if sys.version_info >= (3, 11):
+    from typing import (
+        Required,
+        TypedDict,
+        get_args,
+        get_origin,
+        get_type_hints,
+        is_typeddict,
+    )
+else:
+    from typing_extensions import (
+        Required,
+        TypedDict,
+        get_args,
+        get_origin,
+        get_type_hints,
+        is_typeddict,
+    )
 
 
 class ProgressUpdateHandlerType(Protocol):
@@ -15,12 +44,61 @@ class ProgressUpdateHandlerType(Protocol):
         ...  # pragma: no cover
 
 
+class AsyncProgressUpdateHandlerType(Protocol):
+    """A callback function or coroutine function to parse progress updates.
+
+    Used by `makemkv.AsyncMakeMKV`, which awaits the result if it is awaitable.
+    """
+
+    def __call__(  # noqa: D102
+        self, task_description: str, progress: int, max: int
+    ) -> Optional[Awaitable[None]]:
+        ...  # pragma: no cover
+
+
 class Drive(TypedDict, total=False):
     device_path: str
     disc_name: str
     drive_name: str
 
 
+class DriveState(IntEnum):
+    """State of a drive, see `AP_DriveState*` in apdefs.h."""
+
+    EMPTY_CLOSED = 0
+    EMPTY_OPEN = 1
+    INSERTED = 2
+    LOADING = 3
+    NO_DRIVE = 256
+    UNMOUNTING = 257
+
+    @classmethod
+    def _missing_(cls, value: object) -> Optional["DriveState"]:
+        # keep drives whose state was added in a newer version of makemkvcon
+        if not isinstance(value, int):
+            return None
+        state = int.__new__(cls, value)
+        state._name_ = f"UNKNOWN_{value}"
+        state._value_ = value
+        return state
+
+
+class DiscFsFlags(IntFlag):
+    """Files found on the disc in a drive, see `AP_DskFsFlag*` in apdefs.h."""
+
+    DVD_FILES_PRESENT = 1
+    HDDVD_FILES_PRESENT = 2
+    BLURAY_FILES_PRESENT = 4
+    AACS_FILES_PRESENT = 8
+    BDSVM_FILES_PRESENT = 16
+
+
+class DriveStatus(Drive, total=False):
+    drive_nr: Required[int]
+    state: Required[DriveState]
+    flags: Required[DiscFsFlags]
+
+
 class Disc(TypedDict, total=False):
     comment: str
     information: str
@@ -65,6 +143,7 @@ class Title(TypedDict, total=False):
     size_human: str  # eg. "5.9 GB"
     size: int  # bytes
     streams: Required[list[Stream]]
+    title_nr: int  # number of the title, only set if the output was filtered
     video_angle: int  # eg. 1
 
 
@@ -73,3 +152,104 @@ class MakeMKVOutput(TypedDict, total=False):
     drives: Required[list[Drive]]
     title_count: int
     titles: Required[list[Title]]
+
+
+class MessageEvent(NamedTuple):
+    """A message from makemkvcon (`MSG`)."""
+
+    code: int
+    flags: int
+    message: str
+
+
+class ProgressTitleEvent(NamedTuple):
+    """Name of the current or total progress (`PRGC`/`PRGT`)."""
+
+    code: int
+    id: int
+    name: str
+    total: bool  # True for the total progress, False for the current one
+
+
+class ProgressValueEvent(NamedTuple):
+    """A progress update (`PRGV`)."""
+
+    current: int
+    total: int
+    max: int
+
+
+class DriveEvent(NamedTuple):
+    """Information about a drive (`DRV`)."""
+
+    drive_nr: int
+    drive: Drive
+    state: DriveState
+    flags: DiscFsFlags
+
+
+class TitleCountEvent(NamedTuple):
+    """Number of titles on the disc (`TCOUNT`)."""
+
+    title_count: int
+
+
+class DiscAttributeEvent(NamedTuple):
+    """An attribute of the disc (`CINFO`)."""
+
+    key: str
+    value: Union[str, int, float]
+
+
+class TitleAttributeEvent(NamedTuple):
+    """An attribute of a title (`TINFO`)."""
+
+    title_nr: int
+    key: str
+    value: Union[str, int, float]
+
+
+class StreamAttributeEvent(NamedTuple):
+    """An attribute of a stream (`SINFO`)."""
+
+    title_nr: int
+    stream_nr: int
+    key: str
+    value: Union[str, int, float]
+
+
+MakeMKVEvent = Union[
+    MessageEvent,
+    ProgressTitleEvent,
+    ProgressValueEvent,
+    DriveEvent,
+    TitleCountEvent,
+    DiscAttributeEvent,
+    TitleAttributeEvent,
+    StreamAttributeEvent,
+]
+
+
+def _compile_validator(tp: Any) -> Callable[[Any], bool]:
+    """Create a function that checks if a value is of type `tp`."""
+    if get_origin(tp) is Literal:
+        return frozenset(get_args(tp)).__contains__
+    if get_origin(tp) is Union:
+        types = get_args(tp)
+        return lambda value: isinstance(value, types)
+    if get_origin(tp) is list:
+        is_valid_item = _compile_validator(get_args(tp)[0])
+        return lambda value: isinstance(value, list) and all(map(is_valid_item, value))
+    if is_typeddict(tp):
+        return lambda value: isinstance(value, dict)
+    return lambda value: isinstance(value, tp)
+
+
+@functools.lru_cache(maxsize=None)
+def _item_validators(td: type) -> dict[str, Callable[[Any], bool]]:
+    """Map each key of the TypedDict `td` to a function that validates its values.
+
+    The type hints of `td` are only inspected on the first call for each
+    TypedDict.
+    """
+    return {key: _compile_validator(tp) for key, tp in get_type_hints(td).items()}
@@ -0,0 +1,107 @@
+"""Provides `Watchdog` to terminate `makemkvcon` when it stops making progress.
+
+A damaged disc can leave `makemkvcon` retrying the same sectors for hours.
+Pass a `Watchdog` to `MakeMKV` or `AsyncMakeMKV` to terminate it when the
+progress hasn't advanced or no output was received for too long. The command
+then raises :class:`makemkv.MakeMKVStallError`, which contains the
+information parsed until then.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from subprocess import Popen, TimeoutExpired
+from typing import Callable, NamedTuple, Optional
+
+from .types import MakeMKVEvent, ProgressValueEvent
+
+logger = logging.getLogger(__package__)
+
+
+class Watchdog(NamedTuple):
+    """Thresholds for terminating a `makemkvcon` process that stalled."""
+
+    progress_timeout: Optional[float] = None  # seconds without a PRGV advance
+    output_timeout: Optional[float] = None  # seconds without any output
+    kill_timeout: float = 10  # seconds between SIGTERM and SIGKILL
+
+
+class _Monitor:
+    """Tracks the time since the last output and the last progress advance."""
+
+    def __init__(
+        self, watchdog: Watchdog, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.watchdog = watchdog
+        self.clock = clock
+        self.last_output = self.last_progress = clock()
+        # the reason why `makemkvcon` was terminated
+        self.reason: str | None = None
+        self._progress: tuple[int, int] | None = None
+        timeouts = [
+            timeout
+            for timeout in (watchdog.progress_timeout, watchdog.output_timeout)
+            if timeout is not None
+        ]
+        # check a few times per timeout, but not more often than needed
+        self.interval = min(max(min(timeouts, default=1) / 4, 0.05), 1)
+
+    def update(self, event: MakeMKVEvent) -> None:
+        now = self.clock()
+        self.last_output = now
+        if isinstance(event, ProgressValueEvent):
+            progress = (event.current, event.total)
+            if progress != self._progress:
+                self._progress = progress
+                self.last_progress = now
+
+    def check(self) -> str | None:
+        """Return why `makemkvcon` stalled or None if it didn't."""
+        now = self.clock()
+        watchdog = self.watchdog
+        if (
+            watchdog.output_timeout is not None
+            and now - self.last_output >= watchdog.output_timeout
+        ):
+            return f"no output for {watchdog.output_timeout:g} seconds"
+        if (
+            watchdog.progress_timeout is not None
+            and now - self.last_progress >= watchdog.progress_timeout
+        ):
+            return f"no progress for {watchdog.progress_timeout:g} seconds"
+        return None
+
+
+class _ProcessWatchdog(_Monitor):
+    """Terminates a process from a background thread when it stalls."""
+
+    def __init__(self, watchdog: Watchdog, process: Popen[bytes]) -> None:
+        super().__init__(watchdog)
+        self.process = process
+        self._done = threading.Event()
+        self._thread = threading.Thread(
+            target=self._watch, name="makemkvcon watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._done.set()
+        self._thread.join()
+
+    def _watch(self) -> None:
+        while not self._done.wait(self.interval):
+            if (reason := self.check()) is None:
+                continue
+            self.reason = reason
+            logger.warning(f"makemkvcon stalled ({reason}), terminating it")
+            p = self.process
+            if p.poll() is None:
+                p.terminate()
+            try:
+                p.wait(self.watchdog.kill_timeout)
+            except TimeoutExpired:
+                logger.warning("makemkvcon didn't terminate, killing it")
+                p.kill()
+            return
@@ -0,0 +1,308 @@
+"""Provides `DriveWatcher` to run makemkvcon as soon as a disc is inserted.
+
+The watcher polls a :class:`DeviceSource` for the drives that contain a
+disc. On Linux, :class:`LinuxDeviceSource` asks the kernel for the tray
+status of `/dev/sr*`, which doesn't spin up the drives. Elsewhere,
+:class:`MakeMKVDeviceSource` lists the drives with `makemkvcon`, which
+should be done less often.
+"""
+
+from __future__ import annotations
+
+import functools
+import glob
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Literal, Protocol, Union
+
+from .makemkv import MakeMKV, _do_nothing, list_drives, logger
+from .orchestrator import DriveResult, MultiProgressUpdateHandlerType, _safe_name
+from .types import DriveState
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+
+# see linux/cdrom.h
+_CDROM_DRIVE_STATUS = 0x5326
+_CDSL_CURRENT = 0x7FFFFFFF
+_CDS_DISC_OK = 4
+
+OutputDirType = Union[str, Path, Callable[[str], Union[str, Path]]]
+
+
+class DeviceSource(Protocol):
+    """Reports which drives contain a disc."""
+
+    def poll(self) -> dict[str, bool]:
+        """Check all drives.
+
+        Returns:
+            dict[str, bool]: Whether each drive contains a disc, keyed by
+                its input in makemkvcon's format, eg. "dev:/dev/sr0".
+        """
+        ...  # pragma: no cover
+
+
+class LinuxDeviceSource:
+    """Checks the tray status of optical drives with the `CDROM_DRIVE_STATUS` ioctl."""
+
+    def __init__(self, devices: Iterable[str] | None = None) -> None:
+        """Initialize LinuxDeviceSource.
+
+        Args:
+            devices: Paths of the drives to watch. Defaults to all `/dev/sr*`
+                devices that exist when polling.
+        """
+        self.devices = None if devices is None else list(devices)
+
+    def poll(self) -> dict[str, bool]:
+        """Check all drives, see :func:`DeviceSource.poll`."""
+        devices = (
+            sorted(glob.glob("/dev/sr[0-9]*")) if self.devices is None else self.devices
+        )
+        return {f"dev:{device}": _has_disc(device) for device in devices}
+
+
+class MakeMKVDeviceSource:
+    """Lists the drives and their state with :func:`makemkv.list_drives`."""
+
+    def __init__(self, binary: str | PathLike[str] | None = None) -> None:
+        """Initialize MakeMKVDeviceSource.
+
+        Args:
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+        """
+        self.binary = binary
+
+    def poll(self) -> dict[str, bool]:
+        """Check all drives, see :func:`DeviceSource.poll`."""
+        discs = {}
+        for drive in list_drives(self.binary):
+            if device_path := drive.get("device_path"):
+                input = f"dev:{device_path}"
+            else:
+                input = f"disc:{drive['drive_nr']}"
+            discs[input] = drive["state"] == DriveState.INSERTED
+        return discs
+
+
+class DriveWatcher:
+    """Runs `info`, `mkv` or `backup` when a disc is inserted into a drive.
+
+    A disc has to be reported for `debounce` seconds before the action
+    starts, so a drive that is still loading or a tray that is closed and
+    opened again isn't scanned. Each insertion starts the action once; after
+    it finished, the drive is ignored for `cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        source: DeviceSource,
+        action: Literal["info", "mkv", "backup"] = "info",
+        output_dir: OutputDirType | None = None,
+        title: int | str = "all",
+        decrypt: bool = False,
+        result_handler: Callable[[DriveResult], None] = _do_nothing,
+        poll_interval: float = 5,
+        debounce: float = 3,
+        cooldown: float = 30,
+        cache: int | str | None = None,
+        minlength: int | str | None = None,
+        progress_handler: MultiProgressUpdateHandlerType = _do_nothing,
+        trusted: bool = False,
+        binary: str | PathLike[str] | None = None,
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        metrics: Metrics | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize DriveWatcher.
+
+        Args:
+            source: Reports which drives contain a disc.
+            action: The command to run on an inserted disc.
+            output_dir: Output directory for `mkv` and `backup`. Each disc
+                gets a subdirectory named after the drive and the time, or
+                pass a function that returns the output directory for an
+                input in makemkvcon's format.
+            title: Title to be ripped by `mkv`, can be either an integer
+                starting with 0 or the keyword "all".
+            decrypt: Decrypt stream files during `backup`.
+            result_handler: Called with the result of each action.
+            poll_interval: Seconds between two polls of `source`.
+            debounce: Seconds a disc has to be reported before the action
+                starts.
+            cooldown: Seconds a drive is ignored after an action finished.
+            cache: Size of read cache in megabytes.
+            minlength: Minimum title length in seconds.
+            progress_handler: A callback function to parse progress updates.
+                Its first argument is the input in makemkvcon's format.
+            trusted: Don't validate the types of parsed values.
+            binary: Path of the `makemkvcon` binary. It is searched in
+                `MAKEMKVCON_BINARIES` by default.
+            progress_interval: Minimum number of seconds between two
+                progress updates passed to `progress_handler`.
+            progress_delta: Minimum change of the progress value between two
+                progress updates passed to `progress_handler`.
+            metrics: Collects metrics about the `makemkvcon` processes.
+            clock: Returns the current time in seconds, for testing.
+        """
+        if action != "info" and output_dir is None:
+            raise ValueError(f"{action} requires an output directory")
+        self.source = source
+        self.action = action
+        self.output_dir = output_dir
+        self.title = title
+        self.decrypt = decrypt
+        self.result_handler = result_handler
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.cooldown = cooldown
+        self.progress_handler = progress_handler
+        self.clock = clock
+        self._new_makemkv = functools.partial(
+            MakeMKV,
+            cache=cache,
+            minlength=minlength,
+            trusted=trusted,
+            binary=binary,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            metrics=metrics,
+        )
+        # time since a disc is reported in each drive
+        self._inserted: dict[str, float] = {}
+        # drives whose current disc was handled already
+        self._handled: set[str] = set()
+        self._cooldown_until: dict[str, float] = {}
+        self._running: dict[str, tuple[MakeMKV, Future[None]]] = {}
+        # created by the first action, shut down when `run` returns
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        """Poll the drives until :func:`stop` is called."""
+        self._stop.clear()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as exc:
+                    logger.error(f"Polling the drives failed: {exc}")
+                self._stop.wait(self.poll_interval)
+        finally:
+            self.kill()
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def stop(self) -> None:
+        """Stop :func:`run` after the current poll and terminate running actions."""
+        self._stop.set()
+
+    def poll(self) -> list[str]:
+        """Poll the drives once and start the action on newly inserted discs.
+
+        Returns:
+            list[str]: The inputs whose action was started.
+        """
+        now = self.clock()
+        started = []
+        for input, has_disc in self.source.poll().items():
+            if not has_disc:
+                self._inserted.pop(input, None)
+                self._handled.discard(input)
+                continue
+            inserted = self._inserted.setdefault(input, now)
+            if (
+                input in self._handled
+                or input in self._running
+                or now - inserted < self.debounce
+                or now < self._cooldown_until.get(input, now)
+            ):
+                continue
+            self._handled.add(input)
+            self._start(input)
+            started.append(input)
+        return started
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Wait until the running actions finished."""
+        with self._lock:
+            futures = [future for _, future in self._running.values()]
+        wait_futures(futures, timeout)
+
+    def kill(self) -> None:
+        """Terminate all running `makemkvcon` processes."""
+        with self._lock:
+            running = list(self._running.values())
+        for makemkv, _ in running:
+            makemkv.kill()
+
+    def _start(self, input: str) -> None:
+        logger.info(f"{input}: disc inserted, running {self.action}")
+        makemkv = self._new_makemkv(input)
+        makemkv.progress_handler = functools.partial(self.progress_handler, input)
+        # the action removes the drive when it finished, so it has to wait
+        # until the drive is registered
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="DriveWatcher")
+            future = self._executor.submit(self._run_action, makemkv)
+            self._running[input] = (makemkv, future)
+
+    def _run_action(self, makemkv: MakeMKV) -> None:
+        input = makemkv._input
+        try:
+            if self.action == "info":
+                output = makemkv.info()
+            elif self.action == "mkv":
+                output = makemkv.mkv(self.title, self._output_dir(input))
+            else:
+                output = makemkv.backup(self._output_dir(input), decrypt=self.decrypt)
+        except Exception as exc:
+            logger.error(f"{input}: {exc}")
+            result = DriveResult(input, None, exc)
+        else:
+            result = DriveResult(input, output, None)
+        finally:
+            self._cooldown_until[input] = self.clock() + self.cooldown
+            with self._lock:
+                self._running.pop(input, None)
+        try:
+            self.result_handler(result)
+        except Exception:
+            logger.exception(f"{input}: result handler failed")
+
+    def _output_dir(self, input: str) -> str | Path:
+        assert self.output_dir is not None
+        if callable(self.output_dir):
+            return self.output_dir(input)
+        path = Path(
+            self.output_dir, f"{_safe_name(input)}-{time.strftime('%Y%m%d-%H%M%S')}"
+        )
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+def _has_disc(device: str) -> bool:
+    """Check if a Linux optical drive contains a disc."""
+    import fcntl
+
+    try:
+        fd = os.open(device, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return False
+    try:
+        return fcntl.ioctl(fd, _CDROM_DRIVE_STATUS, _CDSL_CURRENT) == _CDS_DISC_OK
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
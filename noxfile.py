@@ -41,3 +41,15 @@ def test(session: nox.Session) -> None:
         "--cov-report=xml",
         "--cov-report=term",
     )
+
+
+@nox.session
+def importtime(session: nox.Session) -> None:
+    session.install(".[cli]")
+    session.run("python", "benchmarks/importtime.py", *session.posargs)
+
+
+@nox.session
+def benchmark(session: nox.Session) -> None:
+    session.install(".")
+    session.run("python", "benchmarks/parser.py", *session.posargs)
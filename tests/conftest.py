@@ -0,0 +1,29 @@
+import shlex
+import stat
+from pathlib import Path
+from typing import Callable, Iterable
+
+import pytest
+
+from makemkv.simulator import USAGE
+
+
+@pytest.fixture
+def fake_makemkvcon(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Callable[..., Path]:
+    """Install a shell script that prints `lines` in place of makemkvcon."""
+
+    def install(lines: Iterable[str], exit_code: int = 0, sleep: float = 0) -> Path:
+        script = tmp_path / "makemkvcon"
+        commands = [f"[ $# -eq 0 ] && echo {shlex.quote(USAGE)} && exit 1"]
+        commands.extend(f"echo {shlex.quote(line)}" for line in lines)
+        if sleep:
+            commands.append(f"exec sleep {sleep}")
+        commands.append(f"exit {exit_code}")
+        script.write_text("#!/bin/sh\n" + "\n".join(commands) + "\n")
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setattr("makemkv.makemkv.MAKEMKVCON_BINARIES", [str(script)])
+        return script
+
+    return install
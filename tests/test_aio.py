@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from makemkv import AsyncMakeMKV, MakeMKVError, MakeMKVOutput
+from makemkv.types import Disc
+
+FakeMakeMKVCon = Callable[..., Path]
+
+LOG = [
+    'PRGC:5018,0,"Scanning CD-ROM devices"',
+    "PRGV:0,0,65536",
+    "PRGV:65536,65536,65536",
+    'CINFO:1,6209,"Blu-ray disc"',
+    "TCOUNT:0",
+]
+
+
+def test_info(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG)
+    updates: list[tuple[str, int, int]] = []
+
+    async def progress_handler(task_description: str, progress: int, max: int):
+        await asyncio.sleep(0)
+        updates.append((task_description, progress, max))
+
+    output = asyncio.run(AsyncMakeMKV(0, progress_handler=progress_handler).info())
+    assert output == MakeMKVOutput(
+        drives=[], titles=[], disc=Disc(type="BD"), title_count=0
+    )
+    assert updates == [
+        ("Scanning CD-ROM devices", 0, 65536),
+        ("Scanning CD-ROM devices", 65536, 65536),
+    ]
+
+
+def test_non_zero_exit_code(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG, exit_code=1)
+    with pytest.raises(MakeMKVError):
+        asyncio.run(AsyncMakeMKV(0).info())
+
+
+def test_cancel(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG, sleep=60)
+    makemkv = AsyncMakeMKV(0, terminate_timeout=1)
+
+    async def main() -> None:
+        task = asyncio.create_task(makemkv.info())
+        while makemkv.process is None:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert makemkv.process is not None
+    assert makemkv.process.returncode is not None
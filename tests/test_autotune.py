@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from makemkv import CacheAutotuner, MakeMKV, autotune
+from makemkv.autotune import _reserve
+from makemkv.simulator import write_simulator
+
+GB = 2**30
+
+
+@pytest.fixture(autouse=True)
+def memory(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("makemkv.autotune._available_memory", lambda: 64 * GB)
+    monkeypatch.setattr("makemkv.autotune._running", 0)
+
+
+def test_defaults(tmp_path: Path):
+    autotuner = CacheAutotuner(tmp_path / "autotune.json")
+    assert autotuner.choose("DVD") == 128
+    assert autotuner.choose("BD") == 1024
+    assert autotuner.choose(None) == 256
+
+
+def test_memory_limit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("makemkv.autotune._available_memory", lambda: GB)
+    autotuner = CacheAutotuner(tmp_path / "autotune.json")
+    assert autotuner.choose("BD") == 512
+    assert autotuner.choose("BD", jobs=4) == 128
+    assert autotuner.choose("BD", jobs=100) == 32
+
+
+def test_reserve(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("makemkv.autotune._available_memory", lambda: GB)
+    autotuner = CacheAutotuner(tmp_path / "autotune.json")
+    (tmp_path / "bd" / "BDMV").mkdir(parents=True)
+    input = f"file:{tmp_path / 'bd'}"
+    # jobs that start at the same time share the memory
+    jobs = [_reserve(autotuner, input) for _ in range(4)]
+    assert [job.cache for job in jobs] == [512, 256, 170, 128]
+    for job in jobs:
+        job.release()
+        job.release()
+    assert _reserve(autotuner, input).cache == 512
+
+
+def test_history(tmp_path: Path):
+    autotuner = CacheAutotuner(tmp_path / "autotune.json")
+    autotuner.record("BD", 1024, 100e6)
+    # twice and half the best size are tried
+    assert autotuner.choose("BD") == 2048
+    autotuner.record("BD", 2048, 90e6)
+    assert autotuner.choose("BD") == 512
+    autotuner.record("BD", 512, 110e6)
+    assert autotuner.choose("BD") == 256
+    autotuner.record("BD", 256, 80e6)
+    assert autotuner.choose("BD") == 512
+    # other disc types aren't affected
+    assert autotuner.choose("DVD") == 128
+
+
+def test_disc_type(tmp_path: Path):
+    autotuner = CacheAutotuner(tmp_path / "autotune.json")
+    (tmp_path / "bd" / "BDMV").mkdir(parents=True)
+    (tmp_path / "dvd" / "VIDEO_TS").mkdir(parents=True)
+    (tmp_path / "dvd" / "VIDEO_TS" / "VIDEO_TS.IFO").touch()
+    assert autotuner.disc_type(f"file:{tmp_path / 'bd'}") == "BD"
+    assert autotuner.disc_type(f"file:{tmp_path / 'dvd' / 'VIDEO_TS'}") == "DVD"
+
+    iso = tmp_path / "disc.iso"
+    iso.write_bytes(bytes(2**20))
+    assert autotuner.disc_type(f"iso:{iso}") is None
+    autotuner.record_disc_type(f"iso:{iso}", "BD")
+    assert autotuner.disc_type(f"iso:{iso}") == "BD"
+    assert autotuner.disc_type("disc:0") is None
+
+
+def test_auto(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    binary = write_simulator(tmp_path / "makemkvcon")
+    iso = tmp_path / "disc.iso"
+    iso.write_bytes(bytes(2**20))
+
+    makemkv = MakeMKV(iso, cache="auto", binary=binary)
+    assert "--cache" in makemkv._command("info")
+    assert makemkv._command("info")[-1] == "256"
+
+    # the disc type is remembered
+    makemkv.mkv("all", tmp_path / "out")
+    with open(tmp_path / "cache" / "python-makemkv" / "autotune.json") as f:
+        history = json.load(f)
+    assert list(history["discs"].values()) == ["BD"]
+    # the throughput is recorded for the reported disc type
+    [[cache, throughput]] = history["throughput"]["BD"]
+    assert cache == 256
+    assert throughput > 0
+    assert makemkv._command("info")[-1] == "512"
+
+
+def test_auto_disc_number(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    binary = write_simulator(tmp_path / "makemkvcon")
+    makemkv = MakeMKV(0, cache="auto", binary=binary)
+
+    makemkv.mkv(0, tmp_path / "out1")
+    # the type of the last disc in the drive and its history are used
+    assert makemkv._command("mkv")[-1] == "512"
+    makemkv.mkv(0, tmp_path / "out2")
+    with open(tmp_path / "cache" / "python-makemkv" / "autotune.json") as f:
+        history = json.load(f)
+    assert history["discs"] == {"disc:0": "BD"}
+    assert [cache for cache, _ in history["throughput"]["BD"]] == [256, 512]
+    assert autotune._running == 0
+
+
+def test_autotuner_parameter(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon")
+    autotuner = CacheAutotuner(tmp_path / "autotune.json", max_cache=64)
+    makemkv = MakeMKV(0, cache="auto", binary=binary, autotuner=autotuner)
+    assert makemkv._command("info")[-1] == "64"
+    makemkv.mkv(0, tmp_path / "out")
+    assert autotuner.disc_type("disc:0") == "BD"
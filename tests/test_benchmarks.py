@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS = Path(__file__).parent.parent / "benchmarks"
+
+
+@pytest.mark.parametrize(
+    argnames="args",
+    argvalues=[
+        ["parser.py", "--titles=3", "--streams=4", "--progress=100", "--runs=1"],
+        ["importtime.py", "--runs=1", "--tolerance=10"],
+        ["segments.py", "--titles=900", "--runs=1", "--max-seconds=5"],
+    ],
+)
+def test_benchmark(args: list[str]):
+    env = {**os.environ, "PYTHONPATH": str(BENCHMARKS.parent)}
+    result = subprocess.run(
+        [sys.executable, BENCHMARKS / args[0], *args[1:]],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "ERROR" not in result.stderr
@@ -0,0 +1,124 @@
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from makemkv import MakeMKV, MakeMKVOutput
+from makemkv.cache import DiscInfoCache, fingerprint
+from makemkv.types import Disc
+
+FakeMakeMKVCon = Callable[..., Path]
+
+OUTPUT = MakeMKVOutput(drives=[], titles=[], disc=Disc(name="Foo"))
+
+
+def make_iso(path: Path, volume_name: bytes) -> Path:
+    descriptor = b"\x01CD001\x01\x00" + b" " * 32 + volume_name.ljust(32)
+    path.write_bytes(b"\x00" * 16 * 2048 + descriptor.ljust(2048, b"\x00"))
+    return path
+
+
+def test_fingerprint(tmp_path: Path):
+    iso = make_iso(tmp_path / "foo.iso", b"FOO")
+    digest = fingerprint(f"iso:{iso}")
+    assert digest is not None
+    assert fingerprint(f"iso:{iso}") == digest
+
+    make_iso(iso, b"BAR")
+    assert fingerprint(f"iso:{iso}") not in (None, digest)
+
+    assert fingerprint("disc:0") is None
+    assert fingerprint(f"dev:{tmp_path / 'missing'}") is None
+
+
+def test_get_put_invalidate(tmp_path: Path):
+    iso = make_iso(tmp_path / "foo.iso", b"FOO")
+    cache = DiscInfoCache(tmp_path / "cache")
+    assert cache.get(f"iso:{iso}") is None
+
+    cache.put(f"iso:{iso}", OUTPUT)
+    assert cache.get(f"iso:{iso}") == OUTPUT
+    assert cache.get(f"iso:{iso}", minlength=120) is None
+
+    cache.invalidate(f"iso:{iso}")
+    assert cache.get(f"iso:{iso}") is None
+
+
+def test_eviction(tmp_path: Path):
+    a, b, c = (make_iso(tmp_path / f"{i}.iso", str(i).encode()) for i in range(3))
+    cache = DiscInfoCache(tmp_path / "cache")
+
+    cache.put(f"iso:{a}", OUTPUT)
+    (entry,) = (tmp_path / "cache").iterdir()
+    cache.max_size = 2 * entry.stat().st_size
+    os.utime(entry, (1, 1))
+    cache.put(f"iso:{b}", OUTPUT)
+    for path in (tmp_path / "cache").iterdir():
+        if path != entry:
+            os.utime(path, (2, 2))
+    assert cache.get(f"iso:{a}") == OUTPUT  # b is now the least recently used
+    cache.put(f"iso:{c}", OUTPUT)
+
+    assert cache.get(f"iso:{a}") == OUTPUT
+    assert cache.get(f"iso:{b}") is None
+    assert cache.get(f"iso:{c}") == OUTPUT
+
+
+def test_info(tmp_path: Path, fake_makemkvcon: FakeMakeMKVCon):
+    iso = make_iso(tmp_path / "foo.iso", b"FOO")
+    cache = DiscInfoCache(tmp_path / "cache")
+
+    fake_makemkvcon(['CINFO:2,0,"Foo"'])
+    assert MakeMKV(iso, info_cache=cache).info() == OUTPUT
+
+    fake_makemkvcon([], exit_code=1)
+    assert MakeMKV(iso, info_cache=cache).info() == OUTPUT
+
+
+def test_trusted(tmp_path: Path):
+    iso = make_iso(tmp_path / "foo.iso", b"FOO")
+    cache = DiscInfoCache(tmp_path / "cache")
+
+    cache.put(f"iso:{iso}", OUTPUT, trusted=True)
+    assert cache.get(f"iso:{iso}") is None
+    assert cache.get(f"iso:{iso}", trusted=True) == OUTPUT
+
+    validated = MakeMKVOutput(drives=[], titles=[], disc=Disc(name="Bar"))
+    cache.put(f"iso:{iso}", validated)
+    assert cache.get(f"iso:{iso}") == validated
+    assert cache.get(f"iso:{iso}", trusted=True) == validated
+
+
+def test_folder_fingerprint(tmp_path: Path):
+    stream = tmp_path / "disc" / "BDMV" / "STREAM"
+    stream.mkdir(parents=True)
+    (stream / "00000.m2ts").write_bytes(b"a")
+    digest = fingerprint(f"file:{tmp_path / 'disc'}")
+    assert fingerprint(f"file:{tmp_path / 'disc'}") == digest
+
+    # files deeper than two levels are part of the fingerprint
+    (stream / "00000.m2ts").write_bytes(b"ab")
+    assert fingerprint(f"file:{tmp_path / 'disc'}") != digest
+
+
+def test_info_disc_number(tmp_path: Path, fake_makemkvcon: FakeMakeMKVCon):
+    iso = make_iso(tmp_path / "foo.iso", b"FOO")
+    cache = DiscInfoCache(tmp_path / "cache")
+
+    fake_makemkvcon([f'DRV:0,2,999,12,"Drive","Foo","{iso}"', 'CINFO:2,0,"Foo"'])
+    assert MakeMKV(0, info_cache=cache).info()["disc"] == OUTPUT["disc"]
+
+    # only the drives are listed
+    fake_makemkvcon([f'DRV:0,2,999,12,"Drive","Foo","{iso}"'], exit_code=1)
+    assert MakeMKV(0, info_cache=cache).info()["disc"] == OUTPUT["disc"]
+
+
+def test_info_unknown_disc_number(
+    fake_makemkvcon: FakeMakeMKVCon, tmp_path: Path, caplog: pytest.LogCaptureFixture
+):
+    fake_makemkvcon(['CINFO:2,0,"Foo"'])
+    cache = DiscInfoCache(tmp_path / "cache")
+    assert MakeMKV(0, info_cache=cache).info() == OUTPUT
+    assert "disc:0" in caplog.text
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,92 @@
+import tracemalloc
+
+import pytest
+
+from makemkv import CompactOutput, CompactStream, CompactTitle, MakeMKV
+
+LOG = [
+    'DRV:0,2,999,12,"Drive name","Disc name","/dev/sr0"',
+    "TCOUNT:2",
+    'CINFO:1,6209,"Blu-ray disc"',
+    'CINFO:2,0,"Disc name"',
+    'TINFO:0,9,0,"1:42:00"',
+    'TINFO:0,11,0,"12300000"',
+    'SINFO:0,0,1,6201,"Video"',
+    'SINFO:0,0,21,0,"23.976 (24000/1001)"',
+    'SINFO:0,1,1,6202,"Audio"',
+    'SINFO:0,1,3,0,"eng"',
+    'SINFO:1,0,1,6202,"Audio"',
+    'SINFO:1,0,3,0,"eng"',
+]
+
+
+def large_log(titles: int) -> list[str]:
+    lines = []
+    for t in range(titles):
+        lines.append(f'TINFO:{t},2,0,"Title {t}"')
+        lines.append(f'TINFO:{t},11,0,"{t * 1000}"')
+        for s in range(10):
+            lines.append(f'SINFO:{t},{s},1,6202,"Audio"')
+            lines.append(f'SINFO:{t},{s},3,0,"eng"')
+            lines.append(f'SINFO:{t},{s},4,0,"English"')
+            lines.append(f'SINFO:{t},{s},5,0,"A_AC3"')
+            lines.append(f'SINFO:{t},{s},13,0,"{s * 64} Kb/s"')
+    return lines
+
+
+def test_from_events():
+    makemkv = MakeMKV(0)
+    output = makemkv._parse_makemkv_log(LOG)
+    compact = CompactOutput.from_events(makemkv._parse_events(LOG))
+
+    assert compact.title_count == 2
+    assert compact.disc.type == "BD"
+    assert compact.titles[0].streams[0].framerate == 23.976
+    assert compact.titles[1].get("size") is None
+    with pytest.raises(AttributeError):
+        compact.titles[1].size
+
+    assert compact.to_dict() == output
+    assert CompactOutput.from_dict(output) == compact
+
+
+def test_interned_strings():
+    makemkv = MakeMKV(0)
+    compact = CompactOutput.from_events(makemkv._parse_events(LOG))
+    assert (
+        compact.titles[0].streams[1].langcode is compact.titles[1].streams[0].langcode
+    )
+
+
+def test_unknown_key():
+    with pytest.raises(AttributeError):
+        CompactTitle(foo="bar")
+    assert CompactStream(type="audio") != CompactStream(type="video")
+
+
+def test_items():
+    stream = CompactStream(type="audio")
+    assert "type" in stream and "langcode" not in stream and "get" not in stream
+    assert stream["type"] == "audio"
+    with pytest.raises(KeyError):
+        stream["langcode"]
+    stream["langcode"] = "eng"
+    assert stream.langcode == "eng"
+
+
+def test_memory():
+    makemkv = MakeMKV(0)
+    lines = large_log(200)
+
+    tracemalloc.start()
+    output = makemkv._parse_makemkv_log(lines)
+    dict_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    compact = CompactOutput.from_events(makemkv._parse_events(lines))
+    compact_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert compact.to_dict() == output
+    assert compact_size < 0.6 * dict_size
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from makemkv import (
+    AsyncMakeMKV,
+    DiscAttributeEvent,
+    DiscFsFlags,
+    Drive,
+    DriveEvent,
+    DriveState,
+    DriveStatus,
+    MakeMKV,
+    MakeMKVError,
+    MakeMKVEvent,
+    MessageEvent,
+    ProgressTitleEvent,
+    ProgressValueEvent,
+    StreamAttributeEvent,
+    TitleAttributeEvent,
+    TitleCountEvent,
+    list_drives,
+)
+
+FakeMakeMKVCon = Callable[..., Path]
+
+LOG = [
+    'MSG:1005,0,1,"MakeMKV started","%1 started","MakeMKV"',
+    'PRGT:5018,0,"Scanning CD-ROM devices"',
+    'PRGC:5018,0,"Scanning CD-ROM devices"',
+    "PRGV:0,0,65536",
+    'DRV:0,2,999,12,"Drive name","Disc name","/dev/sr0"',
+    "TCOUNT:1",
+    'CINFO:1,6209,"Blu-ray disc"',
+    'TINFO:0,11,0,"12300000"',
+    'SINFO:0,0,3,0,"eng"',
+]
+
+EVENTS: list[MakeMKVEvent] = [
+    MessageEvent(1005, 0, "MakeMKV started"),
+    ProgressTitleEvent(5018, 0, "Scanning CD-ROM devices", total=True),
+    ProgressTitleEvent(5018, 0, "Scanning CD-ROM devices", total=False),
+    ProgressValueEvent(0, 0, 65536),
+    DriveEvent(
+        0,
+        Drive(drive_name="Drive name", disc_name="Disc name", device_path="/dev/sr0"),
+        DriveState.INSERTED,
+        DiscFsFlags.BLURAY_FILES_PRESENT | DiscFsFlags.AACS_FILES_PRESENT,
+    ),
+    TitleCountEvent(1),
+    DiscAttributeEvent("type", "BD"),
+    TitleAttributeEvent(0, "size", 12300000),
+    StreamAttributeEvent(0, 0, "langcode", "en"),
+]
+
+
+def test_parse_events():
+    assert list(MakeMKV(0)._parse_events(LOG)) == EVENTS
+
+
+def test_iter_events(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG)
+    assert list(MakeMKV(0).iter_events("info")) == EVENTS
+
+
+def test_iter_events_non_zero_exit_code(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG, exit_code=1)
+    events = MakeMKV(0).iter_events("info")
+    with pytest.raises(MakeMKVError):
+        for _ in events:
+            pass
+
+
+def test_iter_events_stop_early(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG, sleep=60)
+    makemkv = MakeMKV(0)
+    events = makemkv.iter_events("info")
+    assert next(events) == EVENTS[0]
+    events.close()
+    assert makemkv.process is not None
+    assert makemkv.process.returncode is not None
+
+
+def test_async_iter_events(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(LOG)
+
+    async def main() -> list[MakeMKVEvent]:
+        return [event async for event in AsyncMakeMKV(0).iter_events("info")]
+
+    assert asyncio.run(main()) == EVENTS
+
+
+def test_list_drives(fake_makemkvcon: FakeMakeMKVCon):
+    fake_makemkvcon(
+        [
+            'MSG:1005,0,1,"MakeMKV started","%1 started","MakeMKV"',
+            'DRV:0,2,999,12,"Drive name","Disc name","/dev/sr0"',
+            'DRV:1,0,999,0,"Other drive","","/dev/sr1"',
+            'DRV:2,256,999,0,"","",""',
+            'DRV:3,5,999,0,"Newer drive","",""',
+            'MSG:5010,0,0,"Failed to open disc","Failed to open disc"',
+        ],
+        sleep=60,
+    )
+    start = time.monotonic()
+    assert list_drives() == [
+        DriveStatus(
+            drive_nr=0,
+            state=DriveState.INSERTED,
+            flags=DiscFsFlags.BLURAY_FILES_PRESENT | DiscFsFlags.AACS_FILES_PRESENT,
+            drive_name="Drive name",
+            disc_name="Disc name",
+            device_path="/dev/sr0",
+        ),
+        DriveStatus(
+            drive_nr=1,
+            state=DriveState.EMPTY_CLOSED,
+            flags=DiscFsFlags(0),
+            drive_name="Other drive",
+            device_path="/dev/sr1",
+        ),
+        # states that aren't known yet are kept
+        DriveStatus(
+            drive_nr=3,
+            state=DriveState(5),
+            flags=DiscFsFlags(0),
+            drive_name="Newer drive",
+        ),
+    ]
+    assert time.monotonic() - start < 10
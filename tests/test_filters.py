@@ -0,0 +1,124 @@
+import asyncio
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from makemkv import AsyncMakeMKV, MakeMKV, MakeMKVOutput, OutputFilter
+from makemkv.types import Stream, Title
+
+LOG = [
+    "TCOUNT:3",
+    'CINFO:1,6209,"Blu-ray disc"',
+    'TINFO:0,8,0,"12"',
+    'TINFO:0,9,0,"1:42:00"',
+    'TINFO:0,11,0,"30000000000"',
+    'SINFO:0,0,1,6201,"Video"',
+    'SINFO:0,0,5,0,"V_MPEG4/ISO/AVC"',
+    'SINFO:0,1,1,6202,"Audio"',
+    'SINFO:0,1,3,0,"ger"',
+    'SINFO:0,1,5,0,"A_AC3"',
+    'SINFO:0,2,1,6202,"Audio"',
+    'SINFO:0,2,3,0,"eng"',
+    'SINFO:0,2,5,0,"A_DTS"',
+    'SINFO:0,3,1,6203,"Subtitles"',
+    'SINFO:0,3,3,0,"eng"',
+    'SINFO:0,3,5,0,"S_HDMV/PGS"',
+    'TINFO:1,8,0,"1"',
+    'TINFO:1,9,0,"0:00:30"',
+    'TINFO:1,11,0,"10000000"',
+    'SINFO:1,0,1,6201,"Video"',
+    'TINFO:2,8,0,"8"',
+    'TINFO:2,9,0,"0:45:00"',
+    'TINFO:2,11,0,"5000000000"',
+    'SINFO:2,0,1,6202,"Audio"',
+    'SINFO:2,0,3,0,"eng"',
+    'SINFO:2,0,5,0,"A_AC3"',
+]
+
+FILTER = OutputFilter(min_length=600, stream_types={"video", "audio"}, langcodes={"en"})
+
+FILTERED = MakeMKVOutput(
+    drives=[],
+    title_count=3,
+    disc={"type": "BD"},
+    titles=[
+        Title(
+            title_nr=0,
+            chapter_count=12,
+            length="1:42:00",
+            size=30000000000,
+            streams=[
+                Stream(type="video", codec_id="V_MPEG4/ISO/AVC"),
+                Stream(type="audio", langcode="en", codec_id="A_DTS"),
+            ],
+        ),
+        Title(
+            title_nr=2,
+            chapter_count=8,
+            length="0:45:00",
+            size=5000000000,
+            streams=[Stream(type="audio", langcode="en", codec_id="A_AC3")],
+        ),
+    ],
+)
+
+
+def test_filter():
+    assert MakeMKV(0)._parse_makemkv_log(LOG, FILTER) == FILTERED
+
+
+def test_filter_output():
+    makemkv = MakeMKV(0)
+    assert makemkv._filter_output(makemkv._parse_makemkv_log(LOG), FILTER) == FILTERED
+
+
+@pytest.mark.parametrize(
+    argnames=["filter", "title_nrs"],
+    argvalues=[
+        (OutputFilter(), [0, 1, 2]),
+        (OutputFilter(min_size=10**9), [0, 2]),
+        (OutputFilter(max_size=10**9), [1]),
+        (OutputFilter(max_length=3600), [1, 2]),
+        (OutputFilter(min_chapters=10), [0]),
+    ],
+)
+def test_title_predicates(filter: OutputFilter, title_nrs: list[int]):
+    output = MakeMKV(0)._parse_makemkv_log(LOG, filter)
+    assert [title["title_nr"] for title in output["titles"]] == title_nrs
+
+
+def test_keys(monkeypatch: pytest.MonkeyPatch):
+    translated: list[int] = []
+    translate_codes = MakeMKV._translate_codes
+
+    def spy(self: MakeMKV, flag: str, id: int, value: str, code: int):
+        translated.append(id)
+        return translate_codes(self, flag, id, value, code)
+
+    monkeypatch.setattr(MakeMKV, "_translate_codes", spy)
+    filter = OutputFilter(
+        min_size=10**9,
+        langcodes={"en"},
+        title_keys={"length"},
+        stream_keys={"langcode"},
+    )
+    output = MakeMKV(0)._parse_makemkv_log(LOG, filter)
+
+    assert output["titles"] == [
+        Title(
+            title_nr=0,
+            length="1:42:00",
+            streams=[Stream(), Stream(langcode="en"), Stream(langcode="en")],
+        ),
+        Title(title_nr=2, length="0:45:00", streams=[Stream(langcode="en")]),
+    ]
+    # chapter counts and codecs aren't needed
+    assert 8 not in translated
+    assert 5 not in translated
+
+
+def test_async_info(fake_makemkvcon: Callable[..., Path]):
+    fake_makemkvcon(LOG)
+    output = asyncio.run(AsyncMakeMKV(0).info(filter=FILTER))
+    assert output == FILTERED
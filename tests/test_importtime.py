@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = {"asyncio", "click", "iso639", "rich", "typing_extensions"}
+
+
+def imported_modules(statement: str) -> set[str]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stderr
+    return {
+        line.rpartition("|")[2].strip()
+        for line in stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+@pytest.mark.parametrize(
+    argnames=["statement", "allowed"],
+    argvalues=[
+        ("import makemkv", set()),
+        ("from makemkv import MakeMKV, MakeMKVOutput", set()),
+        ("from makemkv import AsyncMakeMKV", {"asyncio"}),
+        ("import makemkv.__main__", {"click"}),
+    ],
+)
+def test_lazy_imports(statement: str, allowed: set[str]):
+    if sys.version_info < (3, 11):
+        allowed = allowed | {"typing_extensions"}
+    assert imported_modules(statement) & HEAVY_MODULES <= allowed
+
+
+def test_exports():
+    import makemkv
+
+    for name in makemkv.__all__:
+        assert getattr(makemkv, name) is not None
+    assert set(makemkv.__all__) <= set(dir(makemkv))
+    with pytest.raises(AttributeError):
+        makemkv.foo
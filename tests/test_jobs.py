@@ -0,0 +1,128 @@
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from makemkv import Job, JobQueue, JobState, MakeMKV
+from makemkv.simulator import write_simulator
+
+GB = 10**9
+
+
+def test_run(tmp_path: Path):
+    binary = write_simulator(
+        tmp_path / "makemkvcon", {"title_sizes": [GB, GB], "rate": 50 * GB}
+    )
+    jobs: set[str] = set()
+
+    def progress_handler(input: str, task_description: str, progress: int, max: int):
+        jobs.add(input)
+
+    with JobQueue(
+        tmp_path / "jobs.db", progress_handler=progress_handler, binary=binary
+    ) as queue:
+        mkv = queue.add_mkv(0, "all", tmp_path / "out")
+        backup = queue.add_backup("dev:/dev/sr0", tmp_path / "backup", decrypt=True)
+        finished = queue.run()
+
+        assert sorted(job.id for job in finished) == [mkv, backup]
+        assert jobs == {f"job {mkv}", f"job {backup}"}
+        assert queue.get(mkv) == Job(
+            mkv,
+            "disc:0",
+            "mkv",
+            "all",
+            tmp_path / "out",
+            False,
+            JobState.DONE,
+            ("SIMULATED_DISC_t00.mkv", "SIMULATED_DISC_t01.mkv"),
+            None,
+            1,
+        )
+        assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+            "SIMULATED_DISC_t00.mkv",
+            "SIMULATED_DISC_t01.mkv",
+        ]
+        assert queue.get(backup).state == JobState.DONE
+        assert (tmp_path / "backup" / "BDMV").is_dir()
+        assert [path.name for path in tmp_path.iterdir() if path.name[0] == "."] == []
+
+
+def test_failed_job(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon", {"critical_error_at": 0.5})
+    with JobQueue(tmp_path / "jobs.db", binary=binary) as queue:
+        job_id = queue.add_mkv(0, 1, tmp_path / "out")
+        queue.run()
+        job = queue.get(job_id)
+        assert job.state == JobState.FAILED
+        assert job.error is not None
+        assert list((tmp_path / "out").iterdir()) == []
+
+        queue.retry(job_id)
+        assert queue.get(job_id).state == JobState.QUEUED
+        assert queue.jobs(JobState.FAILED) == []
+
+
+def test_recover(tmp_path: Path):
+    path = tmp_path / "jobs.db"
+    out = tmp_path / "out"
+    with JobQueue(path) as queue:
+        interrupted = queue.add_mkv(0, 0, out)
+        saved = queue.add_mkv(0, 1, out)
+        queued = queue.add_mkv(0, 2, out)
+        # simulate a worker that died while running two jobs
+        for job_id, name in ((interrupted, "t00.mkv"), (saved, "t01.mkv")):
+            assert queue._claim(set()) is not None
+            queue._set_files(job_id, [name])
+        (out / f".job-{interrupted}.partial").mkdir(parents=True)
+        (out / f".job-{interrupted}.partial" / "t00.mkv").touch()
+        (out / "t01.mkv").touch()
+
+    with JobQueue(path) as queue:
+        assert queue.get(interrupted).state == JobState.QUEUED
+        assert queue.get(saved).state == JobState.DONE
+        assert queue.get(queued).state == JobState.QUEUED
+        assert [job.id for job in queue.jobs(JobState.QUEUED)] == [interrupted, queued]
+        assert sorted(path.name for path in out.iterdir()) == ["t01.mkv"]
+
+
+def test_interrupted_run(tmp_path: Path):
+    path = tmp_path / "jobs.db"
+    binary = write_simulator(tmp_path / "makemkvcon", {"stall_at": 0.5})
+    queue = JobQueue(path, binary=binary)
+    job_id = queue.add_mkv(0, 1, tmp_path / "out")
+    thread = threading.Thread(target=queue.run)
+    thread.start()
+    while not (job_id in queue._running and queue._running[job_id].process):
+        time.sleep(0.01)
+    queue.kill()
+    thread.join()
+    assert queue.get(job_id).state == JobState.QUEUED
+    assert queue.get(job_id).error is None
+    queue.close()
+
+    binary = write_simulator(tmp_path / "makemkvcon")
+    with JobQueue(path, binary=binary) as queue:
+        assert [job.id for job in queue.run()] == [job_id]
+        assert queue.get(job_id).state == JobState.DONE
+        assert queue.get(job_id).attempts == 2
+
+
+def test_kill_before_start(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    binary = write_simulator(tmp_path / "makemkvcon", {"title_sizes": [GB]})
+    command = MakeMKV._command
+
+    def kill_and_command(self: MakeMKV, *args: Any, **kwargs: Any) -> list[str]:
+        # lands after the job was registered, but before makemkvcon starts
+        queue.kill()
+        return command(self, *args, **kwargs)
+
+    monkeypatch.setattr(MakeMKV, "_command", kill_and_command)
+    with JobQueue(tmp_path / "jobs.db", binary=binary) as queue:
+        job_id = queue.add_mkv(0, 0, tmp_path / "out")
+        queue.run()
+        assert queue.get(job_id).state == JobState.QUEUED
+        assert not list((tmp_path / "out").iterdir())
+        assert not queue._running
@@ -1,15 +1,100 @@
-from typing import Iterable
+import asyncio
+import io
+from pathlib import Path
+from typing import Any, Callable, Iterable
 
 import pytest
+from iso639 import Lang  # type: ignore[import]
 from trycast import isassignable  # type: ignore[import]
 
-from makemkv import MakeMKV, MakeMKVOutput
-from makemkv.types import Disc, Drive, Stream, Title
+from makemkv import (
+    AsyncMakeMKV,
+    DiscAttributeEvent,
+    MakeMKV,
+    MakeMKVOutput,
+    ProgressValueEvent,
+)
+from makemkv.makemkv import _open_log, _read_lines, _split_fields, _to_iso639_1
+from makemkv.output_codes import LANGUAGE_CODES
+from makemkv.types import Disc, Drive, Stream, Title, _item_validators
+
+
+@pytest.mark.parametrize(
+    argnames=["data", "fields"],
+    argvalues=[
+        ("42", ["42"]),
+        ("123,456,65536", ["123", "456", "65536"]),
+        ('1,6209,"Blu-ray disc"', ["1", "6209", "Blu-ray disc"]),
+        ('1,256,999,0,"","",""', ["1", "256", "999", "0", "", "", ""]),
+        (
+            '0,30,0,"Foo Bar - 42 chapter(s) , 12.3 MB"',
+            ["0", "30", "0", "Foo Bar - 42 chapter(s) , 12.3 MB"],
+        ),
+        ('0,26,0,"1,(2,4,6),11-22"', ["0", "26", "0", "1,(2,4,6),11-22"]),
+        ('"foo",1,"bar"', ["foo", "1", "bar"]),
+    ],
+)
+def test_split_fields(data: str, fields: list[str]):
+    assert _split_fields(data) == fields
+
+
+@pytest.mark.parametrize(
+    argnames=["td", "key", "value", "is_valid"],
+    argvalues=[
+        (Disc, "type", "BD", True),
+        (Disc, "type", "Blu-ray disc", False),
+        (Title, "size", 12300000, True),
+        (Title, "size", "12300000", False),
+        (Title, "streams", [Stream(type="video")], True),
+        (Title, "streams", ["video"], False),
+        (Stream, "framerate", 25, True),
+        (Stream, "framerate", 23.976, True),
+        (Stream, "framerate", "23.976", False),
+    ],
+)
+def test_item_validators(td: type, key: str, value: object, is_valid: bool):
+    assert _item_validators(td)[key](value) is is_valid
+
+
+def test_language_codes():
+    for code, pt1 in LANGUAGE_CODES.items():
+        assert Lang(code).pt1 == pt1
+
+
+@pytest.mark.parametrize(
+    argnames=["code", "pt1"],
+    argvalues=[
+        ("eng", "en"),
+        ("afr", "af"),
+        # no ISO 639-1 code
+        ("und", "und"),
+        # reserved for local use
+        ("qaa", "qaa"),
+        ("", ""),
+    ],
+)
+def test_to_iso639_1(code: str, pt1: str):
+    assert _to_iso639_1(code) == pt1
 
 
 class TestParser:
     parse = staticmethod(MakeMKV(0)._parse_makemkv_log)
 
+    @pytest.mark.parametrize(
+        argnames="line",
+        argvalues=[
+            'M:1005,0,1,"Foo","%1","Foo"',
+            'SG:1005,0,1,"Foo","%1","Foo"',
+            "FOO:1,2,3",
+            "no flag",
+        ],
+    )
+    def test_unknown_flag(self, line: str, caplog: pytest.LogCaptureFixture):
+        output = self.parse([line])
+        assert output == MakeMKVOutput(drives=[], titles=[])
+        assert [r.name for r in caplog.records] == ["makemkv"]
+        assert caplog.records[0].levelname == "ERROR"
+
     @pytest.mark.parametrize(
         argnames=["log", "expected_output"],
         argvalues=[
@@ -204,3 +289,100 @@ class TestParser:
         )
         assert output == expected_output
         assert isassignable(output, MakeMKVOutput)
+
+    @pytest.mark.parametrize(
+        argnames=["trusted", "disc"],
+        argvalues=[
+            (False, Disc(name="Foo")),
+            (True, Disc(name="Foo", type="Foo")),  # type: ignore[typeddict-item]
+        ],
+    )
+    def test_trusted(self, trusted: bool, disc: Disc):
+        output = MakeMKV(0, trusted=trusted)._parse_makemkv_log(
+            ['CINFO:2,0,"Foo"', 'CINFO:1,0,"Foo"']
+        )
+        assert output == MakeMKVOutput(drives=[], titles=[], disc=disc)
+
+
+PROGRESS_LOG = [
+    'PRGC:5018,0,"Scanning"',
+    *(f"PRGV:{i},{i},100" for i in range(0, 51, 5)),
+    'PRGC:5017,0,"Saving"',
+    *(f"PRGV:{i},{i},100" for i in range(0, 101, 5)),
+]
+
+
+@pytest.mark.parametrize(
+    argnames=["kwargs", "updates"],
+    argvalues=[
+        (
+            {},
+            [("Scanning", i, 100) for i in range(0, 51, 5)]
+            + [("Saving", i, 100) for i in range(0, 101, 5)],
+        ),
+        (
+            {"progress_delta": 20},
+            [("Scanning", i, 100) for i in (0, 20, 40, 50)]
+            + [("Saving", i, 100) for i in (0, 20, 40, 60, 80, 100)],
+        ),
+        (
+            {"progress_interval": 3600},
+            [("Scanning", 0, 100), ("Scanning", 50, 100)]
+            + [("Saving", 0, 100), ("Saving", 100, 100)],
+        ),
+    ],
+)
+def test_progress_coalescing(
+    kwargs: dict[str, Any], updates: list[tuple[str, int, int]]
+):
+    received: list[tuple[str, int, int]] = []
+
+    def progress_handler(task_description: str, progress: int, max: int):
+        received.append((task_description, progress, max))
+
+    makemkv = MakeMKV(0, progress_handler=progress_handler, **kwargs)
+    makemkv._parse_makemkv_log(PROGRESS_LOG)
+    assert received == updates
+
+
+@pytest.mark.parametrize(argnames="name", argvalues=["makemkv.log", "makemkv.log.gz"])
+def test_log_file(fake_makemkvcon: Callable[..., Path], tmp_path: Path, name: str):
+    fake_makemkvcon(PROGRESS_LOG + ['TINFO:0,11,0,"12300000"'])
+    log_file = tmp_path / name
+    output = MakeMKV(0, log_file=log_file).info()
+    assert MakeMKV.from_log(log_file) == output
+
+    # the output of later commands is appended
+    asyncio.run(AsyncMakeMKV(0, log_file=log_file).info())
+    with _open_log(log_file, "rt") as lines:
+        assert [line.rstrip("\n") for line in lines] == 2 * [
+            *PROGRESS_LOG,
+            'TINFO:0,11,0,"12300000"',
+        ]
+
+
+def test_read_lines(monkeypatch: pytest.MonkeyPatch):
+    # blocks end in the middle of lines and of multi-byte characters
+    monkeypatch.setattr("makemkv.makemkv._READ_SIZE", 3)
+    data = 'CINFO:2,0,"Café"\nPRGV:1,2,3\r\nTCOUNT:1'.encode()
+    assert list(_read_lines(io.BytesIO(data))) == [
+        'CINFO:2,0,"Café"'.encode(),
+        b"PRGV:1,2,3\r",
+        b"TCOUNT:1",
+    ]
+
+
+def test_parse_raw_events():
+    makemkv = MakeMKV(0)
+    lines = [
+        b'CINFO:2,0,"Caf\xe9 \xff"',
+        b"PRGV:10,20,65536",
+        b"PRGV:10,20",
+        *(line.encode() for line in PROGRESS_LOG),
+    ]
+    events = list(makemkv._parse_raw_events(lines))
+    assert events[:2] == [
+        DiscAttributeEvent("name", "Caf\ufffd \ufffd"),
+        ProgressValueEvent(10, 20, 65536),
+    ]
+    assert events[2:] == list(makemkv._parse_events(PROGRESS_LOG))
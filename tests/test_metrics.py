@@ -0,0 +1,71 @@
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from makemkv import MakeMKV, MakeMKVError, Metrics
+
+LOG = [
+    'MSG:5000,0,0,"Warning","Warning"',
+    'MSG:5003,0,0,"Error","Error"',
+    'TINFO:0,11,0,"1000"',
+    'PRGT:5017,0,"Saving to MKV file"',
+    "PRGV:0,0,100",
+    "PRGV:0,50,100",
+    "PRGV:0,100,100",
+]
+
+
+def test_job_metrics(fake_makemkvcon: Callable[..., Path]):
+    metrics = Metrics()
+    fake_makemkvcon(LOG)
+    MakeMKV(0, metrics=metrics).mkv(0, "/tmp")
+    fake_makemkvcon([], exit_code=2)
+    with pytest.raises(MakeMKVError):
+        MakeMKV(0, metrics=metrics).info()
+
+    lines = metrics.render().splitlines()
+    assert "# TYPE makemkv_jobs_total counter" in lines
+    assert 'makemkv_jobs_active{command="mkv"} 0' in lines
+    assert 'makemkv_jobs_total{command="mkv",exit_code="0"} 1' in lines
+    assert 'makemkv_jobs_total{command="info",exit_code="2"} 1' in lines
+    assert 'makemkv_job_duration_seconds_count{command="mkv"} 1' in lines
+    assert 'makemkv_ripped_bytes_total{input="disc:0"} 1000' in lines
+    assert 'makemkv_messages_total{level="warning"} 1' in lines
+    assert 'makemkv_messages_total{level="error"} 1' in lines
+
+
+def test_critical_error(fake_makemkvcon: Callable[..., Path]):
+    metrics = Metrics()
+    fake_makemkvcon(['MSG:5010,0,0,"Failed to open disc","Failed to open disc"'])
+    with pytest.raises(MakeMKVError, match="Failed to open disc"):
+        MakeMKV(0, metrics=metrics).info()
+    assert 'makemkv_messages_total{level="critical"} 1' in metrics.render()
+
+
+def test_serve():
+    metrics = Metrics()
+    metrics.job('dev:/dev/sr"0', "info").finish(0)
+    server = metrics.serve(0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    try:
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode()
+        assert 'makemkv_throughput_bytes_per_second{input="dev:/dev/sr\\"0"} 0' in body
+
+        request = urllib.request.Request(
+            url, headers={"Accept": "application/openmetrics-text"}
+        )
+        with urllib.request.urlopen(request) as response:
+            body = response.read().decode()
+        assert "# TYPE makemkv_jobs counter" in body
+        assert body.endswith("# EOF\n")
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url.replace("/metrics", "/"))
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,60 @@
+import stat
+import time
+from pathlib import Path
+
+import pytest
+
+from makemkv import MakeMKVError
+from makemkv.orchestrator import Orchestrator
+
+SCRIPT = """#!/bin/sh
+[ $# -eq 0 ] && echo "  -r --robot" && exit 1
+echo 'PRGC:5018,0,"Scanning"'
+echo "PRGV:1,1,1"
+echo 'CINFO:2,0,"'"$2"'"'
+case "$2" in
+  disc:1) exit 1;;
+esac
+sleep 1
+"""
+
+
+@pytest.fixture(autouse=True)
+def fake_makemkvcon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    script = tmp_path / "makemkvcon"
+    script.write_text(SCRIPT)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr("makemkv.makemkv.MAKEMKVCON_BINARIES", [str(script)])
+
+
+def test_info():
+    updates: list[tuple[str, str, int, int]] = []
+
+    def progress_handler(input: str, task_description: str, progress: int, max: int):
+        updates.append((input, task_description, progress, max))
+
+    orchestrator = Orchestrator([0, 1, "disc:2", 3], progress_handler=progress_handler)
+    start = time.monotonic()
+    results = orchestrator.info()
+    assert time.monotonic() - start < 3
+
+    assert list(results) == ["disc:0", "disc:1", "disc:2", "disc:3"]
+    for input in ["disc:0", "disc:2", "disc:3"]:
+        assert results[input].error is None
+        assert results[input].output == {
+            "drives": [],
+            "titles": [],
+            "disc": {"name": input},
+        }
+    assert results["disc:1"].output is None
+    assert isinstance(results["disc:1"].error, MakeMKVError)
+    assert sorted(updates) == [
+        (input, "Scanning", 1, 1) for input in ["disc:0", "disc:1", "disc:2", "disc:3"]
+    ]
+
+
+def test_backup_output_dirs(tmp_path: Path):
+    results = Orchestrator([0, "dev:/dev/sr1"], max_workers=1).backup(tmp_path)
+    assert all(result.error is None for result in results.values())
+    assert (tmp_path / "disc_0").is_dir()
+    assert (tmp_path / "dev__dev_sr1").is_dir()
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from makemkv import MakeMKVError, RemuxPipeline
+from makemkv.simulator import write_simulator
+
+GB = 10**9
+
+
+def test_run(tmp_path: Path):
+    binary = write_simulator(
+        tmp_path / "makemkvcon", {"title_sizes": [GB, GB, GB], "rate": 50 * GB}
+    )
+    staging_dir = tmp_path / "staging"
+    staging_dir.mkdir()
+    released: list[str] = []
+    jobs: set[str] = set()
+
+    def progress_handler(input: str, task_description: str, progress: int, max: int):
+        jobs.add(input)
+
+    pipeline = RemuxPipeline(
+        0,
+        staging_dir,
+        max_workers=2,
+        progress_handler=progress_handler,
+        backup_done=released.append,
+        binary=binary,
+    )
+    result = pipeline.run("all", tmp_path / "out")
+
+    assert released == ["disc:0"]
+    assert jobs == {"backup", "title 0", "title 1", "title 2"}
+    assert list(result.titles) == [0, 1, 2]
+    assert all(title.error is None for title in result.titles.values())
+    assert len(list((tmp_path / "out").iterdir())) == 3
+    # the backup was removed
+    assert result.backup_dir is None
+    assert list(staging_dir.iterdir()) == []
+
+
+def test_keep_backup(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon")
+    pipeline = RemuxPipeline(0, tmp_path, keep_backup=True, binary=binary)
+    result = pipeline.run([1], tmp_path / "out")
+    assert list(result.titles) == [1]
+    assert result.backup_dir is not None
+    assert (result.backup_dir / "BDMV").is_dir()
+
+
+def test_failed_backup(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon", {"critical_error_at": 0.5})
+    staging_dir = tmp_path / "staging"
+    staging_dir.mkdir()
+    with pytest.raises(MakeMKVError):
+        RemuxPipeline(0, staging_dir, binary=binary).run("all", tmp_path / "out")
+    assert list(staging_dir.iterdir()) == []
@@ -0,0 +1,103 @@
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+
+from makemkv import MakeMKV, MakeMKVError, list_drives, probe_makemkvcon
+from makemkv.probe import _probe
+
+
+def test_probe(fake_makemkvcon: Callable[..., Path]):
+    script = fake_makemkvcon([])
+
+    info = probe_makemkvcon()
+    assert info.path == str(script)
+    assert info.version == "1.17.5"
+    assert info.commands == {"info", "mkv", "backup"}
+    assert {"robot", "noscan", "cache", "minlength", "decrypt"} <= info.options
+    assert probe_makemkvcon() is info
+
+
+def test_version_from_banner(tmp_path: Path):
+    script = tmp_path / "makemkvcon"
+    script.write_text(
+        "#!/bin/sh\n"
+        "[ $# -eq 0 ] && exit 1\n"
+        """echo 'MSG:1005,0,1,"MakeMKV v1.16.4 linux(x64-release) started"'\n"""
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    info = probe_makemkvcon(script)
+    assert info.version == "1.16.4"
+    assert not info.options
+
+
+def test_cache_file(fake_makemkvcon: Callable[..., Path], tmp_path: Path):
+    cache_file = tmp_path / "cache" / "makemkvcon.json"
+    script = fake_makemkvcon([])
+    stat_result = script.stat()
+    assert probe_makemkvcon(cache_file=cache_file).version == "1.17.5"
+    assert cache_file.exists()
+
+    # a different process would read the result from the cache file
+    script.write_text("#!/bin/sh\nexit 1\n")
+    os.utime(script, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+    _probe.cache_clear()
+    assert probe_makemkvcon(cache_file=cache_file).version == "1.17.5"
+
+    # changing the binary invalidates the cache
+    os.utime(script, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+    assert probe_makemkvcon(cache_file=cache_file).version is None
+
+
+def test_binary(fake_makemkvcon: Callable[..., Path], tmp_path: Path):
+    script = fake_makemkvcon(['DRV:0,2,999,1,"BD-RE","Disc","/dev/sr0"'])
+    script = script.rename(tmp_path / "makemkvcon-1.17")
+    with pytest.raises(FileNotFoundError):
+        list_drives()
+    assert list_drives(binary=script)[0]["device_path"] == "/dev/sr0"
+    assert MakeMKV(0, binary=script)._command("info")[0] == str(script)
+
+
+def test_binary_name(
+    fake_makemkvcon: Callable[..., Path],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    script = fake_makemkvcon([])
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+    script = script.rename(tmp_path / "a" / "makemkvcon-test")
+    monkeypatch.setenv("PATH", f"{tmp_path / 'a'}{os.pathsep}{tmp_path / 'b'}")
+    searches: list[str] = []
+    which = shutil.which
+
+    def search(cmd: str) -> Optional[str]:
+        searches.append(cmd)
+        return which(cmd)
+
+    monkeypatch.setattr("shutil.which", search)
+
+    # the name is searched once, unless the binary was moved
+    assert probe_makemkvcon("makemkvcon-test").path == str(script)
+    assert probe_makemkvcon("makemkvcon-test").path == str(script)
+    assert searches == ["makemkvcon-test"]
+    script = script.rename(tmp_path / "b" / "makemkvcon-test")
+    assert probe_makemkvcon("makemkvcon-test").path == str(script)
+    assert searches == ["makemkvcon-test"] * 2
+
+
+def test_incompatible(fake_makemkvcon: Callable[..., Path]):
+    script = fake_makemkvcon([])
+    script.write_text(
+        "#!/bin/sh\n"
+        "echo 'Use: makemkvcon [switches] Command [Parameters]'\n"
+        "echo '  info <source>'\n"
+        "echo '  --noscan'\n"
+    )
+
+    with pytest.raises(MakeMKVError, match="--robot"):
+        MakeMKV(0).info()
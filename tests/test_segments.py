@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from makemkv import SegmentIndex, SegmentRange, parse_segments_map
+from makemkv.types import Title
+
+
+@pytest.mark.parametrize(
+    argnames=["segments_map", "segments"],
+    argvalues=[
+        ("42", [(42, 42)]),
+        ("174,175,175,175,448", [(174, 175), (175, 175), (175, 175), (448, 448)]),
+        ("1,(2,4,6),11-22,23-44", [(1, 2), (4, 4), (6, 6), (11, 44)]),
+        ("3-5,1", [(3, 5), (1, 1)]),
+    ],
+)
+def test_parse_segments_map(segments_map: str, segments: list[tuple[int, int]]):
+    assert parse_segments_map(segments_map) == tuple(
+        SegmentRange(*segment) for segment in segments
+    )
+
+
+@pytest.mark.parametrize(argnames="segments_map", argvalues=["a", "5-3", "1-2-3"])
+def test_parse_invalid_segments_map(segments_map: str):
+    with pytest.raises(ValueError):
+        parse_segments_map(segments_map)
+
+
+TITLES = [
+    Title(streams=[], segments_map="1-10"),
+    Title(streams=[], segments_map="1-5,6-10"),
+    Title(streams=[], segments_map="3-4"),
+    Title(streams=[], segments_map="9-12"),
+    Title(streams=[], segments_map="20,(21,22)"),
+    Title(streams=[], segments_map="6-10,1-5"),
+    Title(streams=[], original_title_id=1, video_angle=2, segments_map="31"),
+    Title(streams=[], original_title_id=1, video_angle=1, segments_map="30"),
+    Title(streams=[]),
+]
+
+
+def test_segment_index():
+    index = SegmentIndex(TITLES)
+    assert index.duplicates() == [[0, 1]]
+    assert index.overlapping(3) == {0: 2, 1: 2, 5: 2}
+    assert index.overlapping(4) == {}
+    assert index.supersets(2) == [0, 1, 5]
+    assert index.subsets(0) == [1, 2, 5]
+    assert index.candidates() == [0, 3, 4, 6, 7]
+    assert index.angles() == {1: [7, 6]}
+
+
+def test_segment_index_filtered_titles():
+    titles = [Title(streams=[], title_nr=3, segments_map="1-2")] + [
+        Title(streams=[], title_nr=7, segments_map="2")
+    ]
+    index = SegmentIndex(titles)
+    assert index.supersets(7) == [3]
+
+
+def test_segment_index_random_titles():
+    rng = random.Random(0)
+    titles = [
+        Title(
+            streams=[],
+            segments_map=",".join(
+                f"{start}-{start + rng.randrange(5)}"
+                for start in rng.sample(range(60), rng.randint(1, 4))
+            ),
+        )
+        for _ in range(60)
+    ]
+    titles += titles[:5]
+    index = SegmentIndex(titles)
+    sets = {
+        title_nr: {
+            segment
+            for start, end in parse_segments_map(title["segments_map"])
+            for segment in range(start, end + 1)
+        }
+        for title_nr, title in enumerate(titles)
+    }
+    for title_nr, segments in sets.items():
+        assert index.overlapping(title_nr) == {
+            other: len(segments & other_segments)
+            for other, other_segments in sets.items()
+            if other != title_nr and segments & other_segments
+        }
+    assert index.candidates() == [
+        title_nr
+        for title_nr, segments in sets.items()
+        if not any(
+            segments <= other_segments
+            and (len(other_segments) > len(segments) or other < title_nr)
+            for other, other_segments in sets.items()
+            if other != title_nr
+        )
+    ]
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+
+from makemkv import AsyncMakeMKV, MakeMKV, MakeMKVError, list_drives
+from makemkv.simulator import Scenario, write_simulator
+from makemkv.types import ProgressValueEvent
+
+GB = 10**9
+
+
+def simulator(tmp_path: Path, **scenario: Any) -> Path:
+    return write_simulator(tmp_path / "makemkvcon", cast(Scenario, scenario))
+
+
+def test_info(tmp_path: Path):
+    binary = simulator(tmp_path, title_sizes=[3 * GB, GB])
+    output = MakeMKV(0, binary=binary).info()
+    assert output["title_count"] == 2
+    assert [title["size"] for title in output["titles"]] == [3 * GB, GB]
+    assert output["titles"][0]["streams"][1]["langcode"] == "en"
+
+
+def test_mkv(tmp_path: Path):
+    binary = simulator(tmp_path, title_sizes=[GB, GB], rate=50 * GB)
+    updates: list[tuple[str, int, int]] = []
+
+    def progress_handler(task_description: str, progress: int, max: int):
+        updates.append((task_description, progress, max))
+
+    MakeMKV(0, progress_handler=progress_handler, binary=binary).mkv(
+        "all", tmp_path / "out"
+    )
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+        "SIMULATED_DISC_t00.mkv",
+        "SIMULATED_DISC_t01.mkv",
+    ]
+    assert updates[-1] == ("Saving to MKV file", 65536, 65536)
+
+
+def test_list_drives(tmp_path: Path):
+    drives = list_drives(binary=simulator(tmp_path))
+    assert [drive["device_path"] for drive in drives] == ["/dev/sr0"]
+
+
+@pytest.mark.parametrize(
+    argnames="scenario",
+    argvalues=[
+        {"critical_error_at": 0.5},
+        {"exit_code": 3},
+        {"lines": ['MSG:5010,0,0,"Failed to open disc","Failed to open disc"']},
+    ],
+)
+def test_failures(tmp_path: Path, scenario: dict[str, Any]):
+    with pytest.raises(MakeMKVError):
+        MakeMKV(0, binary=simulator(tmp_path, **scenario)).mkv(0, tmp_path)
+
+
+def test_kill_stalled(tmp_path: Path):
+    makemkv = MakeMKV(0, binary=simulator(tmp_path, stall_at=0.5))
+    progress: list[float] = []
+    timer = threading.Timer(1, makemkv.kill)
+    timer.start()
+    try:
+        with pytest.raises(MakeMKVError):
+            for event in makemkv.iter_events("mkv", "all", tmp_path):
+                if isinstance(event, ProgressValueEvent):
+                    progress.append(event.total / event.max)
+    finally:
+        timer.cancel()
+    # nothing was printed after the simulator stalled
+    assert 0 < progress[-1] < 0.5
+
+
+def test_concurrency(tmp_path: Path):
+    binary = simulator(tmp_path, title_sizes=[GB], rate=10 * GB, scan_time=0.1)
+
+    async def main():
+        makemkvs = [AsyncMakeMKV(0, binary=binary) for _ in range(8)]
+        return await asyncio.gather(*(m.mkv(0, tmp_path / "out") for m in makemkvs))
+
+    outputs = asyncio.run(main())
+    assert [output["title_count"] for output in outputs] == [1] * 8
@@ -0,0 +1,93 @@
+import pytest
+
+from makemkv import MakeMKV, ProgressTelemetry
+from makemkv.telemetry import PhaseTiming
+
+GB = 10**9
+
+LOG = [
+    'PRGT:5018,0,"Opening disc"',
+    'PRGC:5018,0,"Processing title sets"',
+    "PRGV:0,0,100",
+    "PRGV:50,50,100",
+    "TCOUNT:2",
+    'TINFO:0,11,0,"4000000000"',
+    'TINFO:1,11,0,"1000000000"',
+    'PRGT:5017,0,"Saving to MKV file"',
+    'PRGC:5017,0,"Saving to MKV file"',
+]
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def feed(telemetry: ProgressTelemetry, clock: Clock, lines: list[str]) -> None:
+    makemkv = MakeMKV(0)
+    for event in makemkv._parse_events(lines):
+        clock.now += 1
+        telemetry.update(event)
+
+
+def test_scanning():
+    clock = Clock()
+    telemetry = ProgressTelemetry(clock=clock)
+    feed(telemetry, clock, LOG[:4])
+
+    snapshot = telemetry.snapshot()
+    assert snapshot.phase == "Processing title sets"
+    assert snapshot.bytes_total == 0
+    assert snapshot.title_nr is None
+    # half of the task took 3 seconds
+    assert snapshot.eta == pytest.approx(3)
+
+
+def test_saving():
+    clock = Clock()
+    telemetry = ProgressTelemetry(clock=clock)
+    feed(telemetry, clock, LOG)
+    feed(telemetry, clock, [f"PRGV:0,{i},100" for i in range(0, 51, 10)])
+
+    snapshot = telemetry.snapshot()
+    assert snapshot.phase == "Saving to MKV file"
+    assert snapshot.phases == (
+        PhaseTiming("Opening disc", True, 7),
+        PhaseTiming("Processing title sets", False, 7),
+    )
+    assert snapshot.bytes_total == 5 * GB
+    assert snapshot.bytes_done == 2.5 * GB
+    assert snapshot.title_nr == 0
+    assert snapshot.throughput == pytest.approx(0.5 * GB)
+    assert snapshot.smoothed_throughput == pytest.approx(0.5 * GB)
+    assert snapshot.eta == pytest.approx(5)
+
+    feed(telemetry, clock, ["PRGV:0,90,100"])
+    assert telemetry.snapshot().title_nr == 1
+
+
+def test_selected_titles():
+    clock = Clock()
+    telemetry = ProgressTelemetry(titles=[1], clock=clock)
+    feed(telemetry, clock, [*LOG, "PRGV:0,0,100", "PRGV:0,10,100"])
+
+    snapshot = telemetry.snapshot()
+    assert snapshot.bytes_total == GB
+    assert snapshot.bytes_done == 0.1 * GB
+    assert snapshot.title_nr == 1
+    assert snapshot.eta == pytest.approx(9)
+
+    feed(telemetry, clock, ['TINFO:1,11,0,"2000000000"'])
+    assert telemetry.bytes_total == 2 * GB
+    telemetry.titles = [0, 1]
+    assert telemetry.bytes_total == 6 * GB
+
+
+def test_makemkv_updates_telemetry():
+    telemetry = ProgressTelemetry()
+    MakeMKV(0, telemetry=telemetry)._parse_makemkv_log(LOG)
+    assert telemetry.bytes_total == 5 * GB
+    assert telemetry.snapshot().phase == "Saving to MKV file"
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from makemkv import (
+    AsyncMakeMKV,
+    MakeMKV,
+    MakeMKVStallError,
+    OutputFilter,
+    ProgressValueEvent,
+    Watchdog,
+)
+from makemkv.simulator import write_simulator
+from makemkv.watchdog import _Monitor
+
+# ignores SIGTERM and stops printing after the first progress update
+STUBBORN = """#!/bin/sh
+[ $# -eq 0 ] && echo "  -r --robot" && exit 1
+trap '' TERM
+echo 'TCOUNT:1'
+echo 'PRGV:1,1,10'
+while true; do sleep 0.1; done
+"""
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_monitor():
+    clock = FakeClock()
+    monitor = _Monitor(Watchdog(progress_timeout=10, output_timeout=5), clock)
+
+    clock.now = 4
+    monitor.update(ProgressValueEvent(1, 1, 10))
+    clock.now = 8
+    monitor.update(ProgressValueEvent(1, 1, 10))
+    assert monitor.check() is None
+    # the same progress value again doesn't count as progress
+    clock.now = 12
+    monitor.update(ProgressValueEvent(1, 1, 10))
+    assert monitor.check() is None
+    clock.now = 14
+    assert monitor.check() == "no progress for 10 seconds"
+    clock.now = 17
+    assert monitor.check() == "no output for 5 seconds"
+
+
+def test_stall(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon", {"stall_at": 0.5})
+    makemkv = MakeMKV(0, binary=binary, watchdog=Watchdog(output_timeout=0.5))
+    start = time.monotonic()
+    with pytest.raises(MakeMKVStallError) as exc_info:
+        makemkv.mkv("all", tmp_path / "out")
+    assert time.monotonic() - start < 5
+    assert "no output" in str(exc_info.value)
+    # the titles were scanned before the stall
+    assert exc_info.value.output is not None
+    assert len(exc_info.value.output["titles"]) == 3
+
+
+def test_kill(tmp_path: Path):
+    binary = tmp_path / "makemkvcon"
+    binary.write_text(STUBBORN)
+    binary.chmod(0o755)
+    makemkv = MakeMKV(
+        0, binary=binary, watchdog=Watchdog(progress_timeout=0.3, kill_timeout=0.3)
+    )
+    with pytest.raises(MakeMKVStallError) as exc_info:
+        makemkv.info(filter=OutputFilter())
+    assert exc_info.value.output is not None
+    assert exc_info.value.output["title_count"] == 1
+    assert makemkv.process is not None
+    assert makemkv.process.returncode == -9
+
+
+def test_async_stall(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon", {"stall_at": 0.5})
+    makemkv = AsyncMakeMKV(0, binary=binary, watchdog=Watchdog(progress_timeout=0.5))
+    with pytest.raises(MakeMKVStallError) as exc_info:
+        asyncio.run(makemkv.backup(tmp_path / "backup"))
+    assert exc_info.value.output is not None
+    assert exc_info.value.output["title_count"] == 3
+
+
+def test_no_stall(tmp_path: Path):
+    binary = write_simulator(tmp_path / "makemkvcon")
+    makemkv = MakeMKV(0, binary=binary, watchdog=Watchdog(1, 1))
+    assert len(makemkv.info()["titles"]) == 3
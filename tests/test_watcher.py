@@ -0,0 +1,179 @@
+from pathlib import Path
+
+import pytest
+
+from makemkv import DriveResult, DriveWatcher, MakeMKVDeviceSource
+from makemkv.simulator import write_simulator
+
+
+class FakeDeviceSource:
+    def __init__(self) -> None:
+        self.discs: dict[str, bool] = {"dev:/dev/sr0": False, "dev:/dev/sr1": False}
+
+    def poll(self) -> dict[str, bool]:
+        return dict(self.discs)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def binary(tmp_path: Path) -> Path:
+    return write_simulator(tmp_path / "makemkvcon", {"scan_time": 0})
+
+
+def test_debounce_and_cooldown(binary: Path):
+    source = FakeDeviceSource()
+    clock = FakeClock()
+    results: list[DriveResult] = []
+    watcher = DriveWatcher(
+        source,
+        result_handler=results.append,
+        debounce=3,
+        cooldown=30,
+        binary=binary,
+        clock=clock,
+    )
+
+    source.discs["dev:/dev/sr0"] = True
+    assert watcher.poll() == []
+    clock.now = 2
+    assert watcher.poll() == []
+    clock.now = 3
+    assert watcher.poll() == ["dev:/dev/sr0"]
+    watcher.wait()
+    assert [result.input for result in results] == ["dev:/dev/sr0"]
+    assert results[0].output is not None
+    assert results[0].output["disc"]["name"] == "SIMULATED_DISC"
+
+    # the same disc isn't scanned again
+    clock.now = 10
+    assert watcher.poll() == []
+
+    # a new disc is ignored until the cooldown is over
+    source.discs["dev:/dev/sr0"] = False
+    watcher.poll()
+    source.discs["dev:/dev/sr0"] = True
+    watcher.poll()
+    clock.now = 20
+    assert watcher.poll() == []
+    clock.now = 33
+    assert watcher.poll() == ["dev:/dev/sr0"]
+    watcher.wait()
+    assert len(results) == 2
+
+
+def test_bouncing_tray(binary: Path):
+    source = FakeDeviceSource()
+    clock = FakeClock()
+    watcher = DriveWatcher(source, debounce=3, binary=binary, clock=clock)
+    for now in range(6):
+        clock.now = now
+        source.discs["dev:/dev/sr1"] = now % 2 == 0
+        assert watcher.poll() == []
+
+
+def test_mkv(tmp_path: Path, binary: Path):
+    source = FakeDeviceSource()
+    results: list[DriveResult] = []
+    watcher = DriveWatcher(
+        source,
+        "mkv",
+        lambda input: tmp_path / "out",
+        title=1,
+        result_handler=results.append,
+        debounce=0,
+        binary=binary,
+    )
+    source.discs["dev:/dev/sr0"] = True
+    assert watcher.poll() == ["dev:/dev/sr0"]
+    watcher.wait()
+    assert results[0].error is None
+    assert [path.name for path in (tmp_path / "out").iterdir()] == [
+        "SIMULATED_DISC_t01.mkv"
+    ]
+
+
+def test_failing_action(tmp_path: Path):
+    source = FakeDeviceSource()
+    results: list[DriveResult] = []
+    watcher = DriveWatcher(
+        source,
+        result_handler=results.append,
+        debounce=0,
+        cooldown=0,
+        binary=tmp_path / "missing",
+    )
+    for _ in range(100):
+        source.discs["dev:/dev/sr0"] = True
+        assert watcher.poll() == ["dev:/dev/sr0"]
+        watcher.wait()
+        source.discs["dev:/dev/sr0"] = False
+        watcher.poll()
+    assert len(results) == 100
+    assert all(isinstance(result.error, FileNotFoundError) for result in results)
+    assert watcher._running == {}
+
+
+def test_failing_result_handler(binary: Path, caplog: pytest.LogCaptureFixture):
+    def result_handler(result: DriveResult):
+        raise RuntimeError("handler failed")
+
+    source = FakeDeviceSource()
+    source.discs["dev:/dev/sr0"] = True
+    watcher = DriveWatcher(
+        source, result_handler=result_handler, debounce=0, binary=binary
+    )
+    watcher.poll()
+    watcher.wait()
+    assert "result handler failed" in caplog.text
+
+
+def test_run(binary: Path):
+    source = FakeDeviceSource()
+    source.discs["dev:/dev/sr0"] = True
+    results: list[DriveResult] = []
+
+    def result_handler(result: DriveResult):
+        results.append(result)
+        watcher.stop()
+
+    watcher = DriveWatcher(
+        source,
+        result_handler=result_handler,
+        poll_interval=0.01,
+        debounce=0.05,
+        cooldown=0,
+        binary=binary,
+    )
+    watcher.run()
+    assert [result.input for result in results] == ["dev:/dev/sr0"]
+
+    # the watcher can be run again after it was stopped
+    source.discs["dev:/dev/sr0"] = False
+    watcher.poll()
+    source.discs["dev:/dev/sr0"] = True
+    watcher.run()
+    assert [result.input for result in results] == ["dev:/dev/sr0"] * 2
+
+
+def test_makemkv_device_source(binary: Path):
+    assert MakeMKVDeviceSource(binary).poll() == {"dev:/dev/sr0": True}
+
+
+def test_makemkv_device_source_without_path(tmp_path: Path):
+    binary = write_simulator(
+        tmp_path / "makemkvcon",
+        {"lines": ['DRV:0,2,999,12,"BD-ROM","DISC",""', 'DRV:1,0,999,0,"DVD","",""']},
+    )
+    assert MakeMKVDeviceSource(binary).poll() == {"disc:0": True, "disc:1": False}
+
+
+def test_missing_output_dir():
+    with pytest.raises(ValueError):
+        DriveWatcher(FakeDeviceSource(), "backup")